@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Blofin Dashboard — endpoint benchmark
+Runs every GET /api/* view of server.py in-process (Flask test client, no
+HTTP) against a database directory from gen_synthetic_db.py and reports, per
+endpoint:
+
+    first      one call on a fresh process (builds rollups / report index / live counters)
+    cold       response cache cleared and connection pool drained before each call,
+               so every query starts on an empty SQLite page cache (the OS cache stays warm)
+    warm       response cache cleared before each call, pooled connections kept
+    cached     plain repeated calls (what a dashboard poll usually gets)
+
+with p50/p95/p99 latency for cold/warm/cached, plus from one extra profiled
+warm call: statements run, rows returned, SQLite VM steps (a proxy for rows
+scanned, counted with a progress handler), tables read by full scan, and peak
+Python allocation (tracemalloc, measured separately so it doesn't skew timings).
+
+Results go to a JSON artifact; with --baseline the run fails (exit 1) if any
+endpoint's warm or cold p95 regressed by more than --tolerance.
+
+Usage:
+    python gen_synthetic_db.py /tmp/blofin-synth
+    python bench_endpoints.py /tmp/blofin-synth --out bench.json
+    python bench_endpoints.py /tmp/blofin-synth --baseline bench.json --tolerance 1.3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import server  # noqa: E402
+
+VM_STEP_GRANULARITY = 1000     # progress handler fires every N VM instructions
+REGRESSION_FLOOR_MS = 1.0      # ignore p95 changes smaller than this
+
+_main_thread = threading.get_ident()
+_vm_calls = [0]
+
+
+def _count_vm_steps():
+    if threading.get_ident() == _main_thread:   # not the live tailer's connection
+        _vm_calls[0] += 1
+    return 0
+
+
+def _point_server_at(data_dir):
+    data_dir = Path(data_dir)
+    server.DATA_DIR = data_dir
+    server.DB_PATH = data_dir / "blofin_monitor.db"
+    server.REPORTS_DIR = data_dir / "reports"
+    server.STRATEGIES_DIR = data_dir / "strategies"
+    server.ROLLUP_DB_PATH = data_dir / "dashboard_rollups.db"
+    server._strategy_files_cache = None
+    open_connection = server.get_db_connection
+
+    def _counting_connection():
+        conn = open_connection()
+        conn.set_progress_handler(_count_vm_steps, VM_STEP_GRANULARITY)
+        return conn
+
+    server.get_db_connection = _counting_connection
+
+
+def _endpoints():
+    paths = []
+    for rule in server.app.url_map.iter_rules():
+        if ("GET" in rule.methods and rule.rule.startswith("/api/") and not rule.arguments
+                and not rule.rule.startswith("/api/_") and rule.rule != "/api/stream"):
+            paths.append(rule.rule)
+    return sorted(paths)
+
+
+def _percentiles(samples_ms):
+    s = sorted(samples_ms)
+    if not s:
+        return None
+
+    def _rank(q):
+        return round(s[min(len(s) - 1, max(0, int(q * len(s) + 0.5) - 1))], 3)
+
+    return {"n": len(s), "p50": _rank(0.50), "p95": _rank(0.95), "p99": _rank(0.99),
+            "mean": round(sum(s) / len(s), 3), "max": round(s[-1], 3)}
+
+
+def _timed_get(client, path):
+    t0 = time.perf_counter()
+    resp = client.get(path)
+    return (time.perf_counter() - t0) * 1000, resp
+
+
+def _row_counts(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+    counts = {t: conn.execute(f"SELECT MAX(rowid) FROM {t}").fetchone()[0] or 0 for t in tables
+              if not t.startswith("sqlite_")}
+    conn.close()
+    return counts
+
+
+def run(data_dir, iterations=20, cold_iterations=10, only=None):
+    _point_server_at(data_dir)
+    client = server.app.test_client()
+    paths = [p for p in _endpoints() if not only or p in only]
+    results = {}
+
+    for path in paths:
+        ms, resp = _timed_get(client, path)
+        results[path] = {"status": resp.status_code, "bytes": len(resp.get_data()), "first_ms": round(ms, 3)}
+
+    for path in paths:
+        cold, warm, cached = [], [], []
+        for _ in range(cold_iterations):
+            server.clear_response_cache()
+            server._db_pool.clear()
+            cold.append(_timed_get(client, path)[0])
+        for _ in range(iterations):
+            server.clear_response_cache()
+            warm.append(_timed_get(client, path)[0])
+        for _ in range(iterations):
+            cached.append(_timed_get(client, path)[0])
+        results[path].update(cold=_percentiles(cold), warm=_percentiles(warm), cached=_percentiles(cached))
+
+    # one profiled warm call per endpoint: statements, rows, VM steps, full scans
+    slow_ms = server.SQL_PROFILE_SLOW_MS
+    profiler = server._profiler
+    server.SQL_PROFILE_SLOW_MS = 0.0
+    server._profiler = server.SqlProfiler(sample=1)
+    try:
+        for path in paths:
+            server.clear_response_cache()
+            _vm_calls[0] = 0
+            with contextlib.redirect_stdout(io.StringIO()):
+                client.get(path)
+            results[path]["vm_steps"] = _vm_calls[0] * VM_STEP_GRANULARITY
+        report = server._profiler.report(top=10_000)
+    finally:
+        server.SQL_PROFILE_SLOW_MS = slow_ms
+        server._profiler = profiler
+    for path in paths:
+        view = server.app.url_map.bind("").match(path)[0]
+        ep = report["endpoints"].get(view, {})
+        scans = sorted({d.split()[-1] for st in report["statements"] if view in st["endpoints"]
+                        for d in (st["plan"] or []) if server._PLAN_SCAN_RE.match(d)})
+        results[path].update(statements=ep.get("statements", 0), rows_returned=ep.get("rows", 0),
+                             full_scans=scans)
+
+    # peak Python allocation per endpoint (separate pass: tracemalloc slows everything down)
+    tracemalloc.start()
+    for path in paths:
+        server.clear_response_cache()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        client.get(path)
+        results[path]["peak_kb"] = round((tracemalloc.get_traced_memory()[1] - base) / 1024, 1)
+    tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Endpoints whose cold or warm p95 grew by more than `tolerance`× (and REGRESSION_FLOOR_MS)."""
+    regressions = []
+    for path, cur in results.items():
+        old = baseline.get("endpoints", {}).get(path)
+        if not old:
+            continue
+        for mode in ("cold", "warm"):
+            a, b = (old.get(mode) or {}).get("p95"), (cur.get(mode) or {}).get("p95")
+            if a is None or b is None:
+                continue
+            if b > a * tolerance and b - a > REGRESSION_FLOOR_MS:
+                regressions.append({"endpoint": path, "mode": mode, "baseline_p95_ms": a, "p95_ms": b,
+                                    "ratio": round(b / a, 2) if a else None})
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark dashboard endpoints against a synthetic DB")
+    ap.add_argument("data_dir", help="directory made by gen_synthetic_db.py")
+    ap.add_argument("--iterations", type=int, default=20, help="warm / cached calls per endpoint")
+    ap.add_argument("--cold-iterations", type=int, default=10)
+    ap.add_argument("--endpoint", action="append", help="only these paths (repeatable)")
+    ap.add_argument("--out", default="bench_endpoints.json")
+    ap.add_argument("--baseline", help="previous artifact to compare against")
+    ap.add_argument("--tolerance", type=float, default=1.3)
+    args = ap.parse_args()
+
+    db_path = Path(args.data_dir) / "blofin_monitor.db"
+    if not db_path.exists():
+        sys.exit(f"{db_path} not found (run gen_synthetic_db.py first)")
+    t0 = time.time()
+    results = run(args.data_dir, iterations=args.iterations, cold_iterations=args.cold_iterations,
+                  only=args.endpoint)
+    artifact = {
+        "meta": {
+            "ts": datetime.utcnow().isoformat() + "Z",
+            "data_dir": str(Path(args.data_dir).resolve()),
+            "db_bytes": db_path.stat().st_size,
+            "rows": _row_counts(db_path),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "cold_iterations": args.cold_iterations,
+            "elapsed_s": round(time.time() - t0, 1),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "endpoints": results,
+    }
+
+    print(f"{'endpoint':28s} {'st':>3s} {'first':>9s} {'cold p50/p95':>17s} {'warm p50/p95':>17s} "
+          f"{'cached p50':>10s} {'rows':>8s} {'vm steps':>11s} {'peak KB':>9s}  full scans")
+    for path, r in results.items():
+        print(f"{path:28s} {r['status']:3d} {r['first_ms']:9.1f} "
+              f"{r['cold']['p50']:8.2f}/{r['cold']['p95']:<8.2f} {r['warm']['p50']:8.2f}/{r['warm']['p95']:<8.2f} "
+              f"{r['cached']['p50']:10.3f} {r['rows_returned']:8d} {r['vm_steps']:11,d} {r['peak_kb']:9.1f}  "
+              f"{', '.join(r['full_scans'])}")
+    print(f"max RSS {artifact['meta']['max_rss_mb']} MB, {artifact['meta']['elapsed_s']}s")
+
+    if args.baseline:
+        artifact["baseline"] = args.baseline
+        artifact["regressions"] = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+    Path(args.out).write_text(json.dumps(artifact, indent=2))
+    print(f"wrote {args.out}")
+    if artifact.get("regressions"):
+        for reg in artifact["regressions"]:
+            print("REGRESSION {endpoint} {mode}: p95 {baseline_p95_ms} → {p95_ms} ms".format(**reg))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
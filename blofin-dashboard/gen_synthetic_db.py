@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Blofin Dashboard — synthetic blofin_monitor.db generator
+Builds a database with every table and column server.py reads, at a chosen
+scale, plus the strategies/ and reports/ directories the dashboard looks at:
+
+    <out>/blofin_monitor.db
+    <out>/strategies/<name>.py      (empty: the ghost-strategy filter only checks names)
+    <out>/reports/YYYY-MM-DD.json
+
+The large append-only tables (ticks, signals, strategy_scores, paper_trades)
+are generated inside SQLite with recursive CTEs, so 100M ticks is a matter of
+minutes. Values come from multiplicative hashes of the row number, so a given
+--seed always produces the same database. Timestamps are spread evenly over the
+last --days, ending now, so the live windows and 24h/7d queries see data.
+Indexes are the ones the ingest side is assumed to keep (ts_ms on the tailed
+tables, the pair keys); pass --no-indexes to measure without them.
+
+Usage:
+    python gen_synthetic_db.py /tmp/blofin-synth                      # 1M ticks, 200 strategies
+    python gen_synthetic_db.py /tmp/blofin-100m --ticks 100000000 --strategies 3000
+    python bench_endpoints.py /tmp/blofin-synth
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+COINS = ["BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "AVAX", "LINK", "DOT", "MATIC", "LTC", "BCH",
+         "ATOM", "NEAR", "APT", "ARB", "OP", "SUI", "INJ", "TIA", "SEI", "PEPE", "WIF", "BONK"]
+STRATEGY_KINDS = ["momentum", "breakout", "mean_reversion", "vwap", "rsi_divergence", "orderflow",
+                  "volume_spike", "bollinger", "ema_cross", "ml_ensemble"]
+SERVICES = ["ingestor", "signal_engine", "paper_trader", "scorer", "backtester", "optimizer"]
+
+SCHEMA = """
+CREATE TABLE ticks (
+    id INTEGER PRIMARY KEY, ts_ms INTEGER NOT NULL, ts_iso TEXT NOT NULL,
+    symbol TEXT NOT NULL, price REAL, volume REAL
+);
+CREATE TABLE signals (
+    id INTEGER PRIMARY KEY, ts_ms INTEGER NOT NULL, ts_iso TEXT NOT NULL, symbol TEXT,
+    signal TEXT, strategy TEXT, confidence REAL, price REAL
+);
+CREATE TABLE service_heartbeats (
+    id INTEGER PRIMARY KEY, service TEXT NOT NULL, ts_ms INTEGER NOT NULL, ts_iso TEXT NOT NULL
+);
+CREATE TABLE paper_trades (
+    id INTEGER PRIMARY KEY, opened_ts_ms INTEGER, opened_ts_iso TEXT, closed_ts_ms INTEGER, closed_ts_iso TEXT,
+    symbol TEXT, side TEXT, entry_price REAL, exit_price REAL, qty REAL, status TEXT, pnl_pct REAL,
+    leverage_used INTEGER
+);
+CREATE TABLE strategy_scores (
+    id INTEGER PRIMARY KEY, ts_ms INTEGER, ts_iso TEXT, strategy TEXT, symbol TEXT, score REAL,
+    win_rate REAL, sharpe_ratio REAL, avg_pnl_pct REAL, total_pnl_pct REAL, max_drawdown_pct REAL,
+    trades INTEGER
+);
+CREATE TABLE strategy_backtest_results (
+    id INTEGER PRIMARY KEY, ts_iso TEXT, strategy TEXT, symbol TEXT, win_rate REAL, sharpe_ratio REAL,
+    max_drawdown_pct REAL, total_pnl_pct REAL, total_trades INTEGER, status TEXT
+);
+CREATE TABLE optimizer_runs (id INTEGER PRIMARY KEY, ts_iso TEXT, raw_json TEXT);
+CREATE TABLE daily_reports (id INTEGER PRIMARY KEY, date TEXT UNIQUE, full_report_json TEXT, summary TEXT);
+CREATE TABLE ml_model_results (
+    id INTEGER PRIMARY KEY, ts_iso TEXT, model_name TEXT, model_type TEXT, symbol TEXT,
+    train_accuracy REAL, test_accuracy REAL, precision_score REAL, recall_score REAL, f1_score REAL,
+    roc_auc REAL, archived INTEGER DEFAULT 0
+);
+CREATE TABLE ml_ensembles (
+    id INTEGER PRIMARY KEY, ts_iso TEXT, ensemble_name TEXT, test_accuracy REAL, archived INTEGER DEFAULT 0
+);
+CREATE TABLE strategy_registry (
+    strategy_name TEXT PRIMARY KEY, tier INTEGER, file_path TEXT, strategy_type TEXT, source TEXT,
+    description TEXT, bt_win_rate REAL, bt_sharpe REAL, bt_pnl_pct REAL, bt_max_dd REAL, bt_trades INTEGER,
+    bt_profit_factor REAL, ft_win_rate REAL, ft_sharpe REAL, ft_pnl_pct REAL, ft_max_dd REAL,
+    ft_trades INTEGER, ft_profit_factor REAL, gate_status TEXT, gate_failures TEXT, pnl_rank INTEGER,
+    archived INTEGER DEFAULT 0, archive_reason TEXT
+);
+CREATE TABLE strategy_coin_eligibility (
+    strategy_name TEXT, symbol TEXT, total_trades INTEGER, wins INTEGER, win_rate REAL, avg_pnl_pct REAL,
+    sum_pnl_pct REAL, status TEXT, reason TEXT, leverage INTEGER, ft_profit_factor REAL, ft_trades INTEGER,
+    ft_win_rate REAL, ft_pnl_pct REAL,
+    PRIMARY KEY (strategy_name, symbol)
+);
+CREATE TABLE strategy_coin_performance (
+    strategy_name TEXT, symbol TEXT, tier INTEGER, bt_trades INTEGER, bt_win_rate REAL, bt_pnl_pct REAL,
+    bt_profit_factor REAL, ft_trades INTEGER, ft_win_rate REAL, ft_pnl_pct REAL, ft_profit_factor REAL,
+    leverage INTEGER,
+    PRIMARY KEY (strategy_name, symbol)
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_ticks_ts_ms ON ticks(ts_ms);
+CREATE INDEX idx_signals_ts_ms ON signals(ts_ms);
+CREATE INDEX idx_heartbeats_ts_ms ON service_heartbeats(ts_ms);
+CREATE INDEX idx_paper_trades_opened ON paper_trades(opened_ts_ms);
+CREATE INDEX idx_strategy_scores_ts ON strategy_scores(ts_iso);
+CREATE INDEX idx_ml_model_results_name ON ml_model_results(model_name, ts_iso);
+"""
+
+_HASH_MULTIPLIERS = [2654435761, 2246822519, 3266489917, 668265263, 374761393, 3323258327, 1935289751,
+                     2869860233, 1103515245, 4093082899]
+
+
+def _u(k, seed):
+    """SQL expression: a value in [0, 1) hashed from the CTE row number i (column salt k)."""
+    m = _HASH_MULTIPLIERS[k % len(_HASH_MULTIPLIERS)]
+    return f"((((i + {seed * 7919 + k * 104729}) * {m}) % 4294967296) / 4294967296.0)"
+
+
+def _iso_expr(ms_expr):
+    return f"strftime('%Y-%m-%dT%H:%M:%f', ({ms_expr}) / 1000.0, 'unixepoch')"
+
+
+def _symbols(n):
+    return [f"{COINS[i]}-USDT" if i < len(COINS) else f"ALT{i:03d}-USDT" for i in range(n)]
+
+
+def _strategies(n):
+    return [f"{STRATEGY_KINDS[i % len(STRATEGY_KINDS)]}_v{i // len(STRATEGY_KINDS) + 1}" for i in range(n)]
+
+
+def _values_table(conn, name, values):
+    conn.execute(f"CREATE TEMP TABLE {name} (idx INTEGER PRIMARY KEY, value TEXT)")
+    conn.executemany(f"INSERT INTO {name} (idx, value) VALUES (?, ?)", enumerate(values))
+
+
+def _fill(conn, table, n, columns, exprs, label, chunk=1_000_000):
+    """INSERT n rows via a recursive CTE over i in [0, n), in chunks."""
+    done = 0
+    t0 = time.time()
+    while done < n:
+        hi = min(n, done + chunk)
+        conn.execute(f"""
+            WITH RECURSIVE seq(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < ?)
+            INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(exprs)} FROM seq
+        """, (done, hi))
+        conn.commit()
+        done = hi
+        print(f"  {label}: {done:,}/{n:,} ({time.time() - t0:.1f}s)", file=sys.stderr, end="\r")
+    if n:
+        print(file=sys.stderr)
+
+
+def generate(out_dir, ticks=1_000_000, signals=None, strategies=200, symbols=24, scores=None,
+             paper_trades=50_000, days=30, seed=1, indexes=True):
+    """Build <out_dir>/blofin_monitor.db (replacing any existing one) and its side directories."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    db_path = out / "blofin_monitor.db"
+    for p in [*out.glob("blofin_monitor.db*"), *out.glob("dashboard_rollups.db*")]:
+        p.unlink(missing_ok=True)
+    signals = ticks // 100 if signals is None else signals
+    scores = strategies * 500 if scores is None else scores
+    rnd = random.Random(seed)
+    sym_names = _symbols(symbols)
+    strat_names = _strategies(strategies)
+    now_ms = int(time.time() * 1000)
+    start_ms = now_ms - days * 86_400_000
+    span_ms = now_ms - start_ms
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.executescript(SCHEMA)
+    _values_table(conn, "syms", sym_names)
+    _values_table(conn, "strats", strat_names)
+    _values_table(conn, "kinds", ["BUY", "SELL", "HOLD"])
+    u = lambda k: _u(k, seed)  # noqa: E731
+
+    # ── append-only tables, generated in SQL ──
+    step = f"({span_ms} * i / {max(ticks, 1)})"
+    _fill(conn, "ticks", ticks, ["ts_ms", "ts_iso", "symbol", "price", "volume"], [
+        f"{start_ms} + {step}", _iso_expr(f"{start_ms} + {step}"),
+        f"(SELECT value FROM syms WHERE idx = i % {symbols})",
+        f"100 + 900 * {u(1)}", f"{u(2)} * 50",
+    ], "ticks")
+    step = f"({span_ms} * i / {max(signals, 1)})"
+    _fill(conn, "signals", signals, ["ts_ms", "ts_iso", "symbol", "signal", "strategy", "confidence", "price"], [
+        f"{start_ms} + {step}", _iso_expr(f"{start_ms} + {step}"),
+        f"(SELECT value FROM syms WHERE idx = i % {symbols})",
+        f"(SELECT value FROM kinds WHERE idx = CAST({u(3)} * 3 AS INTEGER))",
+        f"(SELECT value FROM strats WHERE idx = CAST({u(4)} * {strategies} AS INTEGER))",
+        f"{u(5)}", f"100 + 900 * {u(6)}",
+    ], "signals")
+    step = f"({span_ms} * i / {max(scores, 1)})"
+    _fill(conn, "strategy_scores", scores, [
+        "ts_ms", "ts_iso", "strategy", "symbol", "score", "win_rate", "sharpe_ratio", "avg_pnl_pct",
+        "total_pnl_pct", "max_drawdown_pct", "trades",
+    ], [
+        f"{start_ms} + {step}", _iso_expr(f"{start_ms} + {step}"),
+        f"(SELECT value FROM strats WHERE idx = i % {strategies})",
+        f"(SELECT value FROM syms WHERE idx = CAST({u(7)} * {symbols} AS INTEGER))",
+        f"100 * {u(8)}", f"0.3 + 0.4 * {u(9)}", f"-1 + 4 * {u(0)}", f"-0.5 + 1.2 * {u(1)}",
+        f"-20 + 60 * {u(2)}", f"30 * {u(3)}", f"CAST(80 * {u(4)} AS INTEGER)",
+    ], "strategy_scores")
+    step = f"({span_ms} * i / {max(paper_trades, 1)})"
+    _fill(conn, "paper_trades", paper_trades, [
+        "opened_ts_ms", "opened_ts_iso", "closed_ts_ms", "closed_ts_iso", "symbol", "side", "entry_price",
+        "exit_price", "qty", "status", "pnl_pct", "leverage_used",
+    ], [
+        f"{start_ms} + {step}", _iso_expr(f"{start_ms} + {step}"),
+        # the newest ~2% are still open
+        f"CASE WHEN i < {paper_trades * 0.98:.0f} THEN {start_ms} + {step} + 3600000 END",
+        f"CASE WHEN i < {paper_trades * 0.98:.0f} THEN {_iso_expr(f'{start_ms} + {step} + 3600000')} END",
+        f"(SELECT value FROM syms WHERE idx = i % {symbols})",
+        f"CASE WHEN {u(5)} < 0.5 THEN 'BUY' ELSE 'SELL' END",
+        f"100 + 900 * {u(6)}",
+        f"CASE WHEN i < {paper_trades * 0.98:.0f} THEN 100 + 900 * {u(7)} END",
+        f"0.01 + {u(8)}",
+        f"CASE WHEN i < {paper_trades * 0.98:.0f} THEN 'CLOSED' ELSE 'OPEN' END",
+        f"CASE WHEN i < {paper_trades * 0.98:.0f} THEN -3 + 6.4 * {u(9)} END",
+        f"CASE CAST({u(10)} * 6 AS INTEGER) WHEN 3 THEN 2 WHEN 4 THEN 3 WHEN 5 THEN 5 ELSE 1 END",
+    ], "paper_trades")
+
+    # ── small tables, generated in Python ──
+    def _iso(ms):
+        return datetime.utcfromtimestamp(ms / 1000).isoformat()
+
+    conn.executemany("INSERT INTO service_heartbeats (service, ts_ms, ts_iso) VALUES (?, ?, ?)",
+                     [(svc, ms, _iso(ms)) for ms in range(now_ms - 6 * 3_600_000, now_ms, 60_000)
+                      for svc in SERVICES])
+    bt_rows = []
+    for _ in range(strategies * 4):
+        ms = start_ms + rnd.randrange(span_ms)
+        bt_rows.append((_iso(ms), rnd.choice(strat_names), rnd.choice(sym_names), rnd.uniform(0.3, 0.7),
+                        rnd.uniform(-1, 3), rnd.uniform(0, 30), rnd.uniform(-20, 60), rnd.randint(10, 500), "done"))
+    conn.executemany("""
+        INSERT INTO strategy_backtest_results (ts_iso, strategy, symbol, win_rate, sharpe_ratio,
+                                               max_drawdown_pct, total_pnl_pct, total_trades, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, bt_rows)
+    for d in range(min(days, 60)):
+        run_ts = (datetime.utcnow() - timedelta(days=d)).isoformat()
+        top = [{"strategy": rnd.choice(strat_names), "symbol": rnd.choice(sym_names),
+                "win_rate": rnd.uniform(0.4, 0.7), "sharpe_ratio": rnd.uniform(0, 3),
+                "max_drawdown_pct": rnd.uniform(0, 20), "total_pnl_pct": rnd.uniform(-5, 40),
+                "num_trades": rnd.randint(10, 300)} for _ in range(20)]
+        conn.execute("INSERT INTO optimizer_runs (ts_iso, raw_json) VALUES (?, ?)",
+                     (run_ts, json.dumps({"run_timestamp": run_ts, "top_strategies": top})))
+    reports_dir = out / "reports"
+    reports_dir.mkdir(exist_ok=True)
+    for d in range(min(days, 60)):
+        day = (datetime.utcnow() - timedelta(days=d)).date().isoformat()
+        report = {"date": day, "strategies": {s: {"pnl_pct": rnd.uniform(-3, 5), "trades": rnd.randint(0, 40)}
+                                              for s in rnd.sample(strat_names, min(50, strategies))},
+                  "notes": "synthetic"}
+        conn.execute("INSERT INTO daily_reports (date, full_report_json, summary) VALUES (?, ?, ?)",
+                     (day, json.dumps(report), f"Synthetic report for {day}"))
+        (reports_dir / f"{day}.json").write_text(json.dumps(report))
+    models = [f"{kind}_{sym.split('-')[0].lower()}" for kind in ("xgb", "lgbm", "rf", "lstm")
+              for sym in sym_names[:10]]
+    conn.executemany("""
+        INSERT INTO ml_model_results (ts_iso, model_name, model_type, symbol, train_accuracy, test_accuracy,
+                                      precision_score, recall_score, f1_score, roc_auc, archived)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(_iso(start_ms + rnd.randrange(span_ms)), m, m.split("_")[0], m.split("_")[1].upper() + "-USDT",
+           rnd.uniform(0.5, 0.99), rnd.uniform(0.45, 0.7), rnd.uniform(0.4, 0.8), rnd.uniform(0.4, 0.8),
+           rnd.uniform(0.3, 0.8), rnd.uniform(0.5, 0.8), int(rnd.random() < 0.1))
+          for m in models for _ in range(30)])
+    conn.executemany("INSERT INTO ml_ensembles (ts_iso, ensemble_name, test_accuracy, archived) VALUES (?, ?, ?, 0)",
+                     [(_iso(start_ms + rnd.randrange(span_ms)), f"ensemble_{i}", rnd.uniform(0.5, 0.7))
+                      for i in range(100)])
+    conn.executemany(f"""
+        INSERT INTO strategy_registry VALUES ({', '.join('?' * 23)})
+    """, [(name, rnd.choice([0, 1, 2]), f"strategies/{name}.py", name.rsplit("_v", 1)[0], "synthetic", "",
+           rnd.uniform(0.3, 0.7), rnd.uniform(-1, 3), rnd.uniform(-20, 60), rnd.uniform(0, 30),
+           rnd.randint(10, 500), rnd.uniform(0.5, 2.5), rnd.uniform(0.3, 0.7), rnd.uniform(-1, 3),
+           rnd.uniform(-20, 60), rnd.uniform(0, 30), rnd.randint(0, 300), rnd.uniform(0.5, 2.5),
+           rnd.choice(["pass", "fail"]), "", i + 1 if rnd.random() < 0.5 else None, int(rnd.random() < 0.05), None)
+          for i, name in enumerate(strat_names)])
+    pairs = [(s, sym) for s in strat_names for sym in sym_names]
+    conn.executemany("INSERT INTO strategy_coin_eligibility VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (s, sym, n, int(n * wr), wr, rnd.uniform(-1, 1.5), rnd.uniform(-20, 40),
+         rnd.choice(["active", "active", "active", "paused"]), "", rnd.choice([1, 1, 1, 2, 3, 5]),
+         rnd.uniform(0.5, 2.5), n, wr, rnd.uniform(-20, 40))
+        for s, sym in pairs for n, wr in [(rnd.randint(0, 120), rnd.uniform(0.3, 0.7))]])
+    conn.executemany("INSERT INTO strategy_coin_performance VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (s, sym, rnd.choice([0, 1, 2]), rnd.randint(0, 500), rnd.uniform(0.3, 0.7), rnd.uniform(-20, 60),
+         rnd.uniform(0.5, 2.5), rnd.randint(0, 120), rnd.uniform(0.3, 0.7), rnd.uniform(-20, 40),
+         rnd.uniform(0.5, 2.5), rnd.choice([1, 1, 1, 2, 3, 5]))
+        for s, sym in pairs])
+    conn.commit()
+
+    if indexes:
+        t0 = time.time()
+        conn.executescript(INDEXES)
+        print(f"  indexes: {time.time() - t0:.1f}s", file=sys.stderr)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    strategies_dir = out / "strategies"
+    strategies_dir.mkdir(exist_ok=True)
+    for name in strat_names:
+        (strategies_dir / f"{name}.py").touch()
+    return db_path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic blofin_monitor.db for benchmarks")
+    ap.add_argument("out", help="output directory (blofin_monitor.db, strategies/, reports/)")
+    ap.add_argument("--ticks", type=int, default=1_000_000)
+    ap.add_argument("--signals", type=int, default=None, help="default: ticks / 100")
+    ap.add_argument("--strategies", type=int, default=200)
+    ap.add_argument("--symbols", type=int, default=24)
+    ap.add_argument("--scores", type=int, default=None, help="strategy_scores rows (default: 500 per strategy)")
+    ap.add_argument("--paper-trades", type=int, default=50_000)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--no-indexes", action="store_true")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    db_path = generate(args.out, ticks=args.ticks, signals=args.signals, strategies=args.strategies,
+                       symbols=args.symbols, scores=args.scores, paper_trades=args.paper_trades,
+                       days=args.days, seed=args.seed, indexes=not args.no_indexes)
+    size_mb = db_path.stat().st_size / 1e6
+    print(f"{db_path}: {size_mb:,.1f} MB in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
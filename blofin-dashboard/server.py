@@ -4,40 +4,199 @@ Blofin Dashboard Server
 Serves live ML trading pipeline metrics via REST API and static HTML dashboard.
 """
 
+import calendar
+import hashlib
 import json
 import os
+import random
+import re
 import sqlite3
+import sys
+import threading
 import time
+import zlib
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from pathlib import Path
 from functools import wraps
-from flask import Flask, jsonify, send_file
+from flask import Flask, Response, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)
 
-# Global response cache with TTL
-_response_cache = {}
-_cache_timestamps = {}
+# ── Response cache ────────────────────────────────────────────────────────────
+# Entries are keyed by endpoint + normalized query args and hold the encoded
+# response body. Concurrent misses on one key share a single computation; an
+# expired entry keeps being served (for up to ttl × CACHE_STALE_FACTOR) while one
+# background thread recomputes it. Total size is bounded by LRU eviction.
+
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_STALE_FACTOR = 10
+CACHE_IGNORED_ARGS = {'_', 't', 'ts'}   # client cache-busters
+
+_response_cache = OrderedDict()   # key → (body, status, mimetype, created_at, ttl)
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+_cache_inflight = {}              # key → threading.Event, set when the computation finishes
+_cache_stats = {}                 # endpoint → counters
+
+
+def _endpoint_stats(endpoint):
+    st = _cache_stats.get(endpoint)
+    if st is None:
+        st = _cache_stats[endpoint] = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                                       "refreshes": 0, "evictions": 0, "errors": 0,
+                                       "compute_ms_total": 0.0, "compute_ms_max": 0.0}
+    return st
+
+
+def cache_key(endpoint, args):
+    """(endpoint, sorted (name, values) pairs) — order, repeats and cache-busters don't split entries."""
+    items = []
+    for name in sorted(set(args.keys()) - CACHE_IGNORED_ARGS):
+        values = tuple(sorted(v for v in args.getlist(name) if v != ''))
+        if values:
+            items.append((name, values))
+    return (endpoint, tuple(items))
+
+
+def _cache_store(key, body, status, mimetype, ttl):
+    global _cache_bytes
+    with _cache_lock:
+        old = _response_cache.pop(key, None)
+        if old is not None:
+            _cache_bytes -= len(old[0])
+        _response_cache[key] = (body, status, mimetype, time.time(), ttl)
+        _cache_bytes += len(body)
+        while _response_cache and (len(_response_cache) > CACHE_MAX_ENTRIES or _cache_bytes > CACHE_MAX_BYTES):
+            old_key, old = _response_cache.popitem(last=False)
+            _cache_bytes -= len(old[0])
+            _endpoint_stats(old_key[0])["evictions"] += 1
+
+
+def _cache_compute(key, f, ttl, args, kwargs):
+    """Run the view once for `key`, store a successful result, and wake any waiters."""
+    endpoint = key[0]
+    t0 = time.perf_counter()
+    try:
+        rv = f(*args, **kwargs)
+        resp = app.make_response(rv)
+        ms = (time.perf_counter() - t0) * 1000
+        with _cache_lock:
+            st = _endpoint_stats(endpoint)
+            st["compute_ms_total"] += ms
+            st["compute_ms_max"] = max(st["compute_ms_max"], ms)
+            if resp.status_code >= 400:
+                st["errors"] += 1
+        if resp.status_code < 400:
+            _cache_store(key, resp.get_data(), resp.status_code, resp.mimetype, ttl)
+        return resp
+    finally:
+        with _cache_lock:
+            done = _cache_inflight.pop(key, None)
+        if done is not None:
+            done.set()
+
+
+def _cache_refresh(key, f, ttl, path, query_string, args, kwargs):
+    with app.test_request_context(path, query_string=query_string):
+        try:
+            _cache_compute(key, f, ttl, args, kwargs)
+            with _cache_lock:
+                _endpoint_stats(key[0])["refreshes"] += 1
+        except Exception as e:
+            print(f"Cache refresh failed for {key[0]}: {e}")
+
+
+def _cached_response(entry, state):
+    body, status, mimetype, created_at, _ = entry
+    resp = Response(body, status=status, mimetype=mimetype)
+    resp.headers['X-Cache'] = state
+    resp.headers['Age'] = str(int(time.time() - created_at))
+    return resp
+
 
 def cache_response(ttl_seconds=15):
-    """Decorator to cache endpoint responses"""
+    """Decorator to cache endpoint responses per query args (single-flight, stale-while-revalidate)."""
     def decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            cache_key = f.__name__
-            now = time.time()
-            if cache_key in _response_cache:
-                if now - _cache_timestamps.get(cache_key, 0) < ttl_seconds:
-                    return _response_cache[cache_key]
-            result = f(*args, **kwargs)
-            _response_cache[cache_key] = result
-            _cache_timestamps[cache_key] = now
-            return result
+            key = cache_key(f.__name__, request.args)
+            while True:
+                now = time.time()
+                with _cache_lock:
+                    st = _endpoint_stats(key[0])
+                    entry = _response_cache.get(key)
+                    if entry is not None:
+                        age = now - entry[3]
+                        if age < ttl_seconds:
+                            _response_cache.move_to_end(key)
+                            st["hits"] += 1
+                            return _cached_response(entry, 'HIT')
+                        if age < ttl_seconds * CACHE_STALE_FACTOR:
+                            _response_cache.move_to_end(key)
+                            st["stale_hits"] += 1
+                            refresh = key not in _cache_inflight
+                            if refresh:
+                                _cache_inflight[key] = threading.Event()
+                        else:
+                            entry = None
+                    if entry is None:
+                        waiter = _cache_inflight.get(key)
+                        if waiter is None:
+                            _cache_inflight[key] = threading.Event()
+                            st["misses"] += 1
+                        else:
+                            st["coalesced"] += 1
+                if entry is not None:
+                    if refresh:
+                        threading.Thread(
+                            target=_cache_refresh,
+                            args=(key, f, ttl_seconds, request.path, request.query_string, args, kwargs),
+                            daemon=True, name=f"cache-refresh-{key[0]}",
+                        ).start()
+                    return _cached_response(entry, 'STALE')
+                if waiter is None:
+                    resp = _cache_compute(key, f, ttl_seconds, args, kwargs)
+                    resp.headers['X-Cache'] = 'MISS'
+                    return resp
+                # Another request is computing this key: wait for it, then re-check the cache.
+                # (If it failed there's still no entry, and this request computes on the next pass.)
+                waiter.wait(timeout=60)
         return wrapper
     return decorator
 
+
+def response_cache_stats():
+    with _cache_lock:
+        endpoints = {}
+        for name, st in _cache_stats.items():
+            lookups = st["hits"] + st["stale_hits"] + st["misses"] + st["coalesced"]
+            computes = st["misses"] + st["refreshes"]
+            endpoints[name] = dict(st,
+                                   hit_rate=round((st["hits"] + st["stale_hits"]) / lookups, 3) if lookups else None,
+                                   compute_ms_avg=round(st["compute_ms_total"] / computes, 2) if computes else None,
+                                   compute_ms_total=round(st["compute_ms_total"], 2),
+                                   compute_ms_max=round(st["compute_ms_max"], 2))
+        return {
+            "entries": len(_response_cache),
+            "bytes": _cache_bytes,
+            "max_entries": CACHE_MAX_ENTRIES,
+            "max_bytes": CACHE_MAX_BYTES,
+            "inflight": len(_cache_inflight),
+            "endpoints": endpoints,
+        }
+
+
+def clear_response_cache():
+    """Drop every cached response (counters are kept)."""
+    global _cache_bytes
+    with _cache_lock:
+        _response_cache.clear()
+        _cache_bytes = 0
+
 # Configuration
 DATA_DIR = Path("/home/rob/.openclaw/workspace/blofin-stack/data")
 DB_PATH = DATA_DIR / "blofin_monitor.db"
@@ -78,13 +237,156 @@ def infer_tier_fallback(strategy_name, has_ft_data, has_bt_data):
     return 0
 
 
+# ── Read-only connection pool ────────────────────────────────────────────────
+# The dashboard only reads blofin_monitor.db, so it opens it with mode=ro and
+# query_only (it can never take a write lock against the ingest writer) and
+# keeps the connections: each one keeps its page cache, parsed schema and
+# prepared statements between requests, and the mmap'd file is shared through
+# the OS page cache.
+
+DB_POOL_SIZE = 8
+DB_POOL_WAIT_S = 10.0
+DB_POOL_CHECK_S = 30        # idle connections are health-checked before reuse after this long
+DB_MMAP_BYTES = 4 * 1024 ** 3
+DB_CACHE_KIB = 65536        # per-connection page cache (PRAGMA cache_size = -KiB)
+DB_CACHED_STATEMENTS = 256
+
+
+def _db_file_id():
+    try:
+        st = os.stat(DB_PATH)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return None
+
+
+class _ReadConnection(sqlite3.Connection):
+    file_id = None      # (st_dev, st_ino) of DB_PATH when opened
+
+
 def get_db_connection():
-    """Get a database connection with proper settings."""
-    conn = sqlite3.connect(str(DB_PATH), timeout=10.0)
+    """Open a read-only database connection with proper settings."""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=10.0, factory=_ReadConnection,
+                           check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS)
+    conn.file_id = _db_file_id()
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_BYTES}")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # load the schema now, not on first query
     return conn
 
 
+class ReadPool:
+    """Bounded LIFO pool of read-only connections (hot connections are reused first)."""
+
+    def __init__(self, size=DB_POOL_SIZE):
+        self.size = size
+        self._idle = []                 # [(conn, released_at)]
+        self._cond = threading.Condition()
+        self._open = 0
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "health_checks": 0,
+                      "waits": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0}
+
+    def acquire(self):
+        deadline = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn = None
+                    break
+                if deadline is None:
+                    t0 = time.perf_counter()
+                    deadline = t0 + DB_POOL_WAIT_S
+                    self.stats["waits"] += 1
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.stats["timeouts"] += 1
+                    raise TimeoutError(f"no database connection free after {DB_POOL_WAIT_S:.0f}s")
+                self._cond.wait(remaining)
+            if deadline is not None:
+                ms = (time.perf_counter() - t0) * 1000
+                self.stats["wait_ms_total"] += ms
+                self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], ms)
+
+        if conn is not None:
+            if time.time() - released_at <= DB_POOL_CHECK_S or self._healthy(conn):
+                with self._cond:
+                    self.stats["reused"] += 1
+                return conn
+            self._close(conn)   # replaced below; the slot stays counted in _open
+        try:
+            conn = get_db_connection()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats["created"] += 1
+        return conn
+
+    def _healthy(self, conn):
+        self.stats["health_checks"] += 1
+        # the ingest side may have replaced the file (restore / vacuum into): reopen then
+        if conn.file_id != _db_file_id():
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _close(self, conn):
+        self.stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def release(self, conn, check=False):
+        """Return `conn` to the pool; with check=True (after an error) it's verified first."""
+        broken = check and not self._healthy(conn)
+        if not broken and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                broken = True
+        with self._cond:
+            if broken:
+                self._open -= 1
+            else:
+                self._idle.append((conn, time.time()))
+            self._cond.notify()
+        if broken:
+            self._close(conn)
+
+    def clear(self):
+        """Close idle connections (in-use ones come back normally); later acquires open fresh ones."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+        return len(idle)
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, size=self.size, open=self._open, idle=len(self._idle),
+                        in_use=self._open - len(self._idle),
+                        wait_ms_total=round(self.stats["wait_ms_total"], 2),
+                        wait_ms_max=round(self.stats["wait_ms_max"], 2))
+
+
+_db_pool = ReadPool()
+
+
 def table_columns(conn, table_name):
     """Return column names for a table (empty set if table is missing)."""
     try:
@@ -94,21 +396,1202 @@ def table_columns(conn, table_name):
         return set()
 
 
+# ── SQL profiler ─────────────────────────────────────────────────────────────
+# Opt-in: a sampled fraction of @safe_query requests (BLOFIN_SQL_PROFILE=0.02,
+# or /api/_profile?sample=0.02 at runtime) get their connection wrapped so every
+# statement records normalized text, time spent in execute + fetch, and rows
+# returned. Aggregates are kept per endpoint and per statement; a statement
+# slower than SQL_PROFILE_SLOW_MS goes to the slow log and has its
+# EXPLAIN QUERY PLAN captured once, which feeds the missing-index hints.
+# Unsampled requests pay one random() call.
+
+SQL_PROFILE_SAMPLE = float(os.environ.get("BLOFIN_SQL_PROFILE", "0") or 0)
+SQL_PROFILE_SLOW_MS = float(os.environ.get("BLOFIN_SQL_SLOW_MS", "50") or 50)
+SQL_PROFILE_MAX_STATEMENTS = 500
+SQL_PROFILE_SLOW_LOG = 100
+SQL_PROFILE_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST_RE = re.compile(r"\bIN \(\s*\?(?:\s*,\s*\?)+\s*\)", re.I)
+_SQL_SPACE_RE = re.compile(r"\s+")
+_PLAN_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$")
+_SQL_WHERE_RE = re.compile(r"\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)", re.I)
+_SQL_COMPARED_RE = re.compile(r"(?:\b(\w+)\.)?\b([a-z_]\w*)\s*(?:=|<>|!=|>=|<=|>|<|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)", re.I)
+_SQL_NOT_COLUMNS = {"and", "or", "not", "select", "where", "case", "when", "then", "else", "end", "null"}
+
+
+def normalize_sql(sql):
+    """Statement text with literals and IN lists replaced by placeholders, whitespace collapsed."""
+    s = _SQL_SPACE_RE.sub(" ", sql).strip()
+    s = _SQL_LITERAL_RE.sub("?", s)
+    return _SQL_IN_LIST_RE.sub("IN (?...)", s)
+
+
+def _histogram_add(hist, ms):
+    for i, edge in enumerate(SQL_PROFILE_BUCKETS_MS):
+        if ms <= edge:
+            hist[i] += 1
+            return
+    hist[-1] += 1
+
+
+def _histogram_percentile(hist, q):
+    """Upper bound (ms) of the bucket holding the q-th percentile; None past the last edge."""
+    total = sum(hist)
+    if not total:
+        return None
+    seen = 0
+    for i, n in enumerate(hist):
+        seen += n
+        if seen >= q * total:
+            return SQL_PROFILE_BUCKETS_MS[i] if i < len(SQL_PROFILE_BUCKETS_MS) else None
+    return None
+
+
+class _ProfiledCursor:
+    """Cursor proxy charging execute and fetch time, and rows fetched, to one statement record."""
+
+    def __init__(self, cursor, profiled):
+        self._cursor = cursor
+        self._profiled = profiled
+        self._rec = None
+
+    def _run(self, method, sql, params, many=False):
+        t0 = time.perf_counter()
+        method(sql, params)
+        self._rec = [sql, None if many else params, time.perf_counter() - t0, 0]
+        self._profiled.statements.append(self._rec)
+        return self
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq):
+        return self._run(self._cursor.executemany, sql, seq, many=True)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = self._cursor.fetchone()
+        if self._rec is not None:
+            self._rec[2] += time.perf_counter() - t0
+            self._rec[3] += row is not None
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        if self._rec is not None:
+            self._rec[2] += time.perf_counter() - t0
+            self._rec[3] += len(rows)
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = self._cursor.fetchall()
+        if self._rec is not None:
+            self._rec[2] += time.perf_counter() - t0
+            self._rec[3] += len(rows)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            row = next(self._cursor)
+        finally:
+            if self._rec is not None:
+                self._rec[2] += time.perf_counter() - t0
+        if self._rec is not None:
+            self._rec[3] += 1
+        return row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ProfiledConnection:
+    """Connection proxy handed to a sampled @safe_query view instead of the pooled connection."""
+
+    def __init__(self, conn, endpoint):
+        self._conn = conn
+        self.endpoint = endpoint
+        self.statements = []    # [sql, params (None for executemany), seconds, rows]
+
+    def cursor(self):
+        return _ProfiledCursor(self._conn.cursor(), self)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class SqlProfiler:
+    def __init__(self, sample=None):
+        self.sample = SQL_PROFILE_SAMPLE if sample is None else sample
+        self._lock = threading.Lock()
+        self._normalized = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.statements = {}
+            self.slow = deque(maxlen=SQL_PROFILE_SLOW_LOG)
+            self.started_at = time.time()
+
+    def begin(self, conn, endpoint):
+        """A profiling proxy for this request's connection, or None if the request is not sampled."""
+        if self.sample <= 0 or random.random() >= self.sample:
+            return None
+        return _ProfiledConnection(conn, endpoint)
+
+    def _normalize(self, sql):
+        norm = self._normalized.get(sql)
+        if norm is None:
+            norm = normalize_sql(sql)
+            if len(self._normalized) < 4 * SQL_PROFILE_MAX_STATEMENTS:
+                self._normalized[sql] = norm
+        return norm
+
+    def end(self, profiled, error=None):
+        """Fold a finished request's statements into the aggregates; EXPLAIN new slow statements."""
+        explain = []
+        with self._lock:
+            ep = self.endpoints.get(profiled.endpoint)
+            if ep is None:
+                ep = self.endpoints[profiled.endpoint] = {
+                    "requests": 0, "errors": 0, "statements": 0, "rows": 0, "sql_ms": 0.0,
+                    "hist": [0] * (len(SQL_PROFILE_BUCKETS_MS) + 1)}
+            request_ms = 0.0
+            for sql, params, secs, rows in profiled.statements:
+                ms = secs * 1000
+                norm = self._normalize(sql)
+                st = self.statements.get(norm)
+                if st is None:
+                    if len(self.statements) >= SQL_PROFILE_MAX_STATEMENTS:
+                        norm = "(other statements)"
+                        st = self.statements.get(norm)
+                    if st is None:
+                        st = self.statements[norm] = {
+                            "calls": 0, "ms": 0.0, "max_ms": 0.0, "rows": 0, "endpoints": set(),
+                            "hist": [0] * (len(SQL_PROFILE_BUCKETS_MS) + 1), "plan": None}
+                st["calls"] += 1
+                st["ms"] += ms
+                st["max_ms"] = max(st["max_ms"], ms)
+                st["rows"] += rows
+                st["endpoints"].add(profiled.endpoint)
+                _histogram_add(st["hist"], ms)
+                if ms >= SQL_PROFILE_SLOW_MS:
+                    self.slow.append({"ts": datetime.utcnow().isoformat() + "Z", "endpoint": profiled.endpoint,
+                                      "sql": norm, "ms": round(ms, 2), "rows": rows})
+                    if st["plan"] is None and params is not None:
+                        st["plan"] = []   # claimed; filled in below
+                        explain.append((st, sql, params))
+                request_ms += ms
+                ep["statements"] += 1
+                ep["rows"] += rows
+            ep["requests"] += 1
+            ep["errors"] += error is not None
+            ep["sql_ms"] += request_ms
+            _histogram_add(ep["hist"], request_ms)
+        for st, sql, params in explain:
+            try:
+                plan = [row[3] for row in profiled._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            except Exception as e:
+                plan = [f"(explain failed: {e})"]
+            with self._lock:
+                st["plan"] = plan
+            print(f"Slow query in {profiled.endpoint} ({SQL_PROFILE_SLOW_MS:g} ms+): {normalize_sql(sql)[:200]}")
+
+    def index_hints(self):
+        """Full-table scans and temp B-tree sorts seen in captured plans, heaviest first."""
+        hints = []
+        with self._lock:
+            items = [(norm, dict(st)) for norm, st in self.statements.items() if st["plan"]]
+        for norm, st in items:
+            where = _SQL_WHERE_RE.search(norm)
+            compared = []
+            if where:
+                for qual, col in _SQL_COMPARED_RE.findall(where.group(1)):
+                    if col.lower() not in _SQL_NOT_COLUMNS and (qual, col) not in compared:
+                        compared.append((qual, col))
+            for detail in st["plan"]:
+                scan = _PLAN_SCAN_RE.match(detail)
+                if scan:
+                    table, alias = scan.group(1), scan.group(2)
+                    cols = [c for q, c in compared if not q or q in (table, alias)]
+                    hint = {"table": table, "problem": "full table scan", "sql": norm,
+                            "calls": st["calls"], "ms": round(st["ms"], 1)}
+                    if cols:
+                        hint["suggest"] = f"CREATE INDEX idx_{table}_{'_'.join(cols)} ON {table}({', '.join(cols)})"
+                    else:
+                        hint["suggest"] = "no filter to index: consider a rollup or a narrower query"
+                    hints.append(hint)
+                elif detail.startswith("USE TEMP B-TREE FOR"):
+                    hints.append({"problem": detail.lower(), "sql": norm, "calls": st["calls"],
+                                  "ms": round(st["ms"], 1),
+                                  "suggest": "an index matching the GROUP BY / ORDER BY columns avoids the sort"})
+        hints.sort(key=lambda h: h["ms"], reverse=True)
+        return hints
+
+    def report(self, top=50):
+        def _hist(hist):
+            labels = [f"<={edge:g}ms" for edge in SQL_PROFILE_BUCKETS_MS] + [f">{SQL_PROFILE_BUCKETS_MS[-1]:g}ms"]
+            return {label: n for label, n in zip(labels, hist) if n}
+
+        with self._lock:
+            endpoints = {}
+            for name, ep in sorted(self.endpoints.items(), key=lambda kv: kv[1]["sql_ms"], reverse=True):
+                endpoints[name] = {
+                    "requests": ep["requests"], "errors": ep["errors"], "statements": ep["statements"],
+                    "rows": ep["rows"], "sql_ms_total": round(ep["sql_ms"], 2),
+                    "sql_ms_avg": round(ep["sql_ms"] / ep["requests"], 3) if ep["requests"] else 0,
+                    "p50_ms": _histogram_percentile(ep["hist"], 0.50),
+                    "p95_ms": _histogram_percentile(ep["hist"], 0.95),
+                    "p99_ms": _histogram_percentile(ep["hist"], 0.99),
+                    "histogram": _hist(ep["hist"]),
+                }
+            statements = []
+            for norm, st in sorted(self.statements.items(), key=lambda kv: kv[1]["ms"], reverse=True)[:top]:
+                statements.append({
+                    "sql": norm, "calls": st["calls"], "ms_total": round(st["ms"], 2),
+                    "ms_avg": round(st["ms"] / st["calls"], 3), "ms_max": round(st["max_ms"], 2),
+                    "rows": st["rows"], "rows_per_call": round(st["rows"] / st["calls"], 1),
+                    "endpoints": sorted(st["endpoints"]), "p95_ms": _histogram_percentile(st["hist"], 0.95),
+                    "plan": st["plan"],
+                })
+            slow = list(self.slow)
+        return {
+            "sample": self.sample,
+            "slow_ms": SQL_PROFILE_SLOW_MS,
+            "since": datetime.utcfromtimestamp(self.started_at).isoformat() + "Z",
+            "endpoints": endpoints,
+            "statements": statements,
+            "slow": slow,
+            "index_hints": self.index_hints(),
+        }
+
+
+_profiler = SqlProfiler()
+
+
 def safe_query(query_func):
     """Decorator for safe database queries with error handling."""
     @wraps(query_func)
     def wrapper(*args, **kwargs):
+        conn = None
+        profiled = None
         try:
-            conn = get_db_connection()
-            result = query_func(conn, *args, **kwargs)
-            conn.close()
+            conn = _db_pool.acquire()
+            profiled = _profiler.begin(conn, query_func.__name__)
+            result = query_func(profiled or conn, *args, **kwargs)
+            if profiled is not None:
+                _profiler.end(profiled)
+            _db_pool.release(conn)
             return result
         except Exception as e:
+            if profiled is not None:
+                try:
+                    _profiler.end(profiled, error=str(e))
+                except Exception:
+                    pass
+            if conn is not None:
+                _db_pool.release(conn, check=True)
             print(f"Database error in {query_func.__name__}: {e}")
             return jsonify({"error": str(e)}), 500
     return wrapper
 
 
+# ── Keyset pages and streamed row lists ──────────────────────────────────────
+# The row-list endpoints (/api/coin_performance, /api/leverage_pairs,
+# /api/leverage_trades, /api/registry) read their rows from a source generator
+# yielding (key, row) in key order, with `WHERE key > after ... LIMIT n` pushed
+# into SQL. ?limit=N[&after=<key>] returns one page plus `next_after` (the key
+# to pass as `after` for the next page, null on the last one), so each page is
+# one index range scan whatever the table size. ?stream=ndjson (one row per
+# line, then a {"count", "next_after", "timestamp"} line) or ?stream=json (the
+# usual {"<rows>": [...], "count", "timestamp"} document) encodes rows as they
+# come off the cursor instead of building the list. A stream bypasses the
+# response cache and the pool: it opens its own connection (at most
+# STREAM_MAX_CONCURRENT at once, 503 beyond that) and reads STREAM_WINDOW_ROWS
+# per keyset query, so its memory does not grow with the table and slow
+# clients can neither starve @safe_query endpoints nor pin a WAL snapshot.
+
+PAGE_LIMIT_MAX = 5000
+STREAM_WINDOW_ROWS = 500
+STREAM_MAX_CONCURRENT = 4
+
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_CONCURRENT)
+
+
+def parse_page_args(key_types):
+    """(after, limit) from ?after=<k1,k2,..>&limit=N; each part of `after` is cast by `key_types`."""
+    after = request.args.get("after")
+    if after is not None:
+        parts = after.split(",", len(key_types) - 1)
+        if len(parts) != len(key_types):
+            raise ValueError(f"after takes {len(key_types)} comma-separated value(s)")
+        after = tuple(cast(part) for cast, part in zip(key_types, parts))
+    limit = request.args.get("limit")
+    if limit is not None:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+    return after, limit
+
+
+def _format_key(key):
+    return ",".join(str(k) for k in key)
+
+
+def keyset_page(rows, limit):
+    """One page from a (key, row) iterator asked for limit + 1 rows → (rows, next_after)."""
+    page = []
+    last = None
+    for key, row in rows:
+        if limit is not None and len(page) == limit:
+            return page, _format_key(last)
+        page.append(row)
+        last = key
+    return page, None
+
+
+def keyset_clause(columns, after, op=">"):
+    """SQL condition (and params) for rows whose `columns` come after `after`; "1" on the first page."""
+    if after is None:
+        return "1", ()
+    return f"({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})", tuple(after)
+
+
+def is_paged():
+    return "limit" in request.args or "after" in request.args
+
+
+def read_page(source, conn, key_types, default_limit=None, **kwargs):
+    """This request's ?after=&limit= page of `source` (every row without ?limit=) → (rows, next_after)."""
+    after, limit = parse_page_args(key_types)
+    limit = min(limit or default_limit or 0, PAGE_LIMIT_MAX) or None
+    return keyset_page(source(conn, after=after, limit=None if limit is None else limit + 1, **kwargs), limit)
+
+
+def _encode_rows(rows, fmt, first):
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for _, row in rows)
+    return ("" if first else ",") + ",".join(json.dumps(row) for _, row in rows)
+
+
+def _stream_rows(source, list_key, fmt, after, limit):
+    conn = None
+    count = 0
+    next_after = None
+    try:
+        if fmt == "json":
+            yield f'{{"{list_key}": ['
+        conn = get_db_connection()
+        key = after
+        while True:
+            # One statement per window (asking for one extra row when near `limit`), so no read
+            # snapshot stays open while a slow client downloads and the writer can checkpoint.
+            want = STREAM_WINDOW_ROWS if limit is None else min(STREAM_WINDOW_ROWS, limit - count + 1)
+            window = list(source(conn, after=key, limit=want))
+            last_window = len(window) < want
+            if limit is not None and count + len(window) > limit:
+                window = window[:limit - count]
+                next_after = _format_key(window[-1][0])
+                last_window = True
+            if window:
+                yield _encode_rows(window, fmt, count == 0)
+                count += len(window)
+                key = window[-1][0]
+            if last_window:
+                break
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        if fmt == "ndjson":
+            yield json.dumps({"count": count, "next_after": next_after, "timestamp": timestamp}) + "\n"
+        else:
+            yield f'], "count": {count}, "next_after": {json.dumps(next_after)}, "timestamp": "{timestamp}"}}'
+    except Exception as e:
+        # Headers are gone by now: end with an error line (NDJSON) or a truncated document (JSON).
+        print(f"Stream error in {list_key}: {e}")
+        if fmt == "ndjson":
+            yield json.dumps({"error": str(e)}) + "\n"
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def streamable(source, list_key, key_types):
+    """Serve ?stream=ndjson|json straight from `source(conn, after=, limit=)`; other requests go to the view."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            fmt = request.args.get("stream")
+            if not fmt:
+                return f(*args, **kwargs)
+            if fmt not in ("ndjson", "json"):
+                return jsonify({"error": "stream must be ndjson or json"}), 400
+            try:
+                after, limit = parse_page_args(key_types)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if not _stream_slots.acquire(blocking=False):
+                return jsonify({"error": "too many concurrent streams"}), 503, {"Retry-After": "5"}
+            resp = Response(_stream_rows(source, list_key, fmt, after, limit),
+                            mimetype="application/x-ndjson" if fmt == "ndjson" else "application/json",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+            resp.call_on_close(_stream_slots.release)
+            return resp
+        return wrapper
+    return decorator
+
+
+# ── Live counters (rowid tailer) ─────────────────────────────────────────────
+# ticks and signals are append-only, so a background thread remembers the last
+# rowid it read from each and only reads newer rows. Rows are counted into
+# per-second buckets covering the last LIVE_WINDOW_S, from which the
+# 10s / 30s / 60s / 1h windows are summed; /api/live-data and /api/summary read
+# those in-memory counters instead of running COUNT(*) over ts_iso ranges.
+# On start the last hour is re-read from the rowid where it begins (found by
+# bisecting rowids), so the windows are correct right after a restart.
+# The signals `total` is one COUNT(*) at start plus the rows appended since, so
+# it drifts if the ingest side ever prunes or deletes signals (until a restart).
+# /api/summary falls back to SQL while the tailer has no snapshot.
+
+LIVE_TAIL_INTERVAL_S = 1.0
+LIVE_STALE_S = 5 * LIVE_TAIL_INTERVAL_S   # an older snapshot means the tailer is stuck or failing
+LIVE_WINDOW_S = 3600
+LIVE_WINDOWS = {"10s": 10, "30s": 30, "60s": 60, "1h": 3600}
+LIVE_BATCH = 50000
+
+
+def _iso_to_epoch(ts_iso, _cache={}):
+    """UTC epoch second of an ts_iso value (naive values are UTC, like datetime.utcnow())."""
+    key = ts_iso[:19]
+    sec = _cache.get(key)
+    if sec is None:
+        if len(_cache) > 4096:
+            _cache.clear()
+        sec = _cache[key] = calendar.timegm(time.strptime(key.replace(' ', 'T'), "%Y-%m-%dT%H:%M:%S"))
+    return sec
+
+
+class _TableTail:
+    def __init__(self, table, kind_col=None, count_total=False):
+        self.table = table
+        self.kind_col = kind_col          # also bucket counts by this column (e.g. signals.signal)
+        self.count_total = count_total    # one COUNT(*) after the first rebuild, then a running total
+        self.last_rowid = 0
+        self.total = None
+        self.last_ts_iso = None
+        self.buckets = {}                 # epoch second → [count, {kind: count}]
+
+    def _first_rowid_since(self, conn, ts_iso):
+        lo, hi = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {self.table}").fetchone()
+        if lo is None:
+            return None
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = conn.execute(f"SELECT rowid, ts_iso FROM {self.table} WHERE rowid >= ? ORDER BY rowid LIMIT 1",
+                               (mid,)).fetchone()
+            if row[1] is not None and row[1] >= ts_iso:
+                hi = mid
+            else:
+                lo = row[0] + 1
+        return lo
+
+    def rebuild(self, conn, now):
+        self.total = None
+        cutoff = datetime.utcfromtimestamp(now - LIVE_WINDOW_S).isoformat()
+        start = self._first_rowid_since(conn, cutoff)
+        self.buckets.clear()
+        self.last_ts_iso = conn.execute(f"SELECT ts_iso FROM {self.table} ORDER BY rowid DESC LIMIT 1").fetchone()
+        self.last_ts_iso = self.last_ts_iso[0] if self.last_ts_iso else None
+        if start is None:
+            self.last_rowid = 0
+            return
+        self.last_rowid = start - 1
+        self.tail(conn, now)
+
+    def count_rows(self, conn):
+        """Running total: every row up to the current watermark, counted once; tail() adds the rest."""
+        self.total = conn.execute(f"SELECT COUNT(*) FROM {self.table} WHERE rowid <= ?",
+                                  (self.last_rowid,)).fetchone()[0]
+
+    def tail(self, conn, now):
+        """Read rows past the watermark into the buckets (and the running total, once counted)."""
+        cols = "rowid, ts_iso" + (f", {self.kind_col}" if self.kind_col else "")
+        new = 0
+        while True:
+            rows = conn.execute(f"SELECT {cols} FROM {self.table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                (self.last_rowid, LIVE_BATCH)).fetchall()
+            for row in rows:
+                ts_iso = row[1]
+                if not ts_iso:
+                    continue
+                bucket = self.buckets.get(sec := _iso_to_epoch(ts_iso))
+                if bucket is None:
+                    bucket = self.buckets[sec] = [0, {}]
+                bucket[0] += 1
+                if self.kind_col:
+                    kind = row[2]
+                    bucket[1][kind] = bucket[1].get(kind, 0) + 1
+                if self.last_ts_iso is None or ts_iso > self.last_ts_iso:
+                    self.last_ts_iso = ts_iso
+            if rows:
+                self.last_rowid = rows[-1][0]
+                new += len(rows)
+            if len(rows) < LIVE_BATCH:
+                break
+        if self.total is not None:
+            self.total += new
+        cutoff = now - LIVE_WINDOW_S
+        for sec in [s for s in self.buckets if s <= cutoff]:
+            del self.buckets[sec]
+        return new
+
+    def snapshot(self, now):
+        counts = dict.fromkeys(LIVE_WINDOWS, 0)
+        kinds_1h = {}
+        for sec, (n, kinds) in self.buckets.items():
+            age = now - sec
+            for name, width in LIVE_WINDOWS.items():
+                if age < width:
+                    counts[name] += n
+            for kind, k in kinds.items():
+                kinds_1h[kind] = kinds_1h.get(kind, 0) + k
+        out = {"counts": counts, "total": self.total, "last_ts_iso": self.last_ts_iso, "last_rowid": self.last_rowid}
+        if self.kind_col:
+            out["by_" + self.kind_col + "_1h"] = kinds_1h
+        return out
+
+
+class LiveCounters:
+    """Background tailer over append-only tables; snapshot() never touches the DB."""
+
+    def __init__(self):
+        self.tails = {"ticks": _TableTail("ticks"),
+                      "signals": _TableTail("signals", kind_col="signal", count_total=True)}
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._thread = None
+        self.error = None
+        self.updated_at = 0.0
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="live-tailer")
+                self._thread.start()
+
+    def _run(self):
+        conn = None
+        while True:
+            try:
+                if conn is None:
+                    conn = get_db_connection()
+                    now = time.time()
+                    for t in self.tails.values():
+                        t.rebuild(conn, now)
+                    self.refresh(conn)   # windows are servable from here on
+                    for t in self.tails.values():
+                        if t.count_total:
+                            t.count_rows(conn)
+                self.refresh(conn)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                print(f"Live tailer error: {e}")
+                if conn is not None:
+                    conn.close()
+                conn = None
+                time.sleep(5)
+            time.sleep(LIVE_TAIL_INTERVAL_S)
+
+    def refresh(self, conn, now=None):
+        now = now or time.time()
+        for t in self.tails.values():
+            t.tail(conn, now)
+        self._snapshot = {name: t.snapshot(now) for name, t in self.tails.items()}
+        self.updated_at = now
+
+    def snapshot(self, wait=5.0):
+        """
+        Latest counters; on first use waits (up to `wait` s) for the tailer's initial rebuild.
+        Raises RuntimeError while there is no snapshot or the last one is older than LIVE_STALE_S,
+        since its window counts are frozen at that refresh.
+        """
+        self.ensure_started()
+        deadline = time.time() + wait
+        while not self._fresh() and self.error is None and time.time() < deadline:
+            time.sleep(0.02)
+        if not self._fresh():
+            raise RuntimeError(self.error or ("live counters stale" if self._snapshot else "live counters not ready"))
+        return self._snapshot
+
+    def _fresh(self):
+        return self._snapshot is not None and time.time() - self.updated_at <= LIVE_STALE_S
+
+
+_live = LiveCounters()
+
+
+# ── strategy_scores hourly rollups ───────────────────────────────────────────
+# strategy_scores is append-only, so per (strategy, UTC hour) sums / counts /
+# maxima are maintained in a dashboard-owned SQLite file (blofin_monitor.db is
+# opened read-only) from a rowid watermark. A 24h or 7d window then combines a
+# few dozen bucket rows per strategy instead of scanning raw scores. Windows are
+# whole hours: "24h" is the current hour plus the 24 before it. Rows without a
+# ts_iso land in hour '' so they only count towards all-time windows. A fresh or
+# far-behind rollup file is caught up on a background thread; until then the
+# same window metrics are computed from the raw table.
+#   python server.py --rebuild-rollups   drop and rebuild from strategy_scores
+#   python server.py --check-rollups     compare against the raw GROUP BY
+
+ROLLUP_DB_PATH = DATA_DIR / "dashboard_rollups.db"
+ROLLUP_REFRESH_S = 5
+ROLLUP_BATCH = 200000
+ROLLUP_INLINE_ROWS = 50000   # larger backlogs are folded by a background thread
+
+# rollup column → raw expression; "_n" = non-NULL count, "_sum" = total, "_max" = maximum
+_ROLLUP_AGGS = [
+    ("n", "COUNT(*)"), ("last_ts", "MAX(ts_iso)"),
+    ("score_n", "COUNT(score)"), ("score_sum", "TOTAL(score)"), ("score_max", "MAX(score)"),
+    ("win_rate_n", "COUNT(win_rate)"), ("win_rate_sum", "TOTAL(win_rate)"),
+    ("sharpe_n", "COUNT(sharpe_ratio)"), ("sharpe_sum", "TOTAL(sharpe_ratio)"), ("sharpe_max", "MAX(sharpe_ratio)"),
+    ("avg_pnl_n", "COUNT(avg_pnl_pct)"), ("avg_pnl_sum", "TOTAL(avg_pnl_pct)"),
+    ("total_pnl_n", "COUNT(total_pnl_pct)"), ("total_pnl_sum", "TOTAL(total_pnl_pct)"),
+    ("dd_n", "COUNT(max_drawdown_pct)"), ("dd_sum", "TOTAL(max_drawdown_pct)"), ("dd_max", "MAX(max_drawdown_pct)"),
+    ("trades_n", "COUNT(trades)"), ("trades_sum", "TOTAL(trades)"), ("pnl_trades_sum", "TOTAL(avg_pnl_pct * trades)"),
+]
+_ROLLUP_HOUR_EXPR = "replace(substr(ts_iso, 1, 13), ' ', 'T')"
+_SCORE_ROLLUP_FORMAT = 2     # bump to rebuild score_hourly from scratch on the next open
+
+# combined window metrics, same names the raw queries used
+_ROLLUP_WINDOW_SELECT = """
+    SUM(n) AS score_count,
+    MAX(last_ts) AS last_update,
+    MAX(score_max) AS best_score,
+    SUM(score_sum) / NULLIF(SUM(score_n), 0) AS avg_score,
+    SUM(win_rate_sum) / NULLIF(SUM(win_rate_n), 0) AS avg_win_rate,
+    SUM(sharpe_sum) / NULLIF(SUM(sharpe_n), 0) AS avg_sharpe,
+    MAX(sharpe_max) AS max_sharpe,
+    SUM(avg_pnl_sum) / NULLIF(SUM(avg_pnl_n), 0) AS avg_pnl,
+    SUM(total_pnl_sum) / NULLIF(SUM(total_pnl_n), 0) AS avg_total_pnl,
+    SUM(dd_sum) / NULLIF(SUM(dd_n), 0) AS avg_drawdown,
+    MAX(dd_max) AS max_drawdown,
+    SUM(trades_sum) / NULLIF(SUM(trades_n), 0) AS avg_trades,
+    SUM(trades_sum) AS total_trades,
+    SUM(pnl_trades_sum) / NULLIF(SUM(trades_sum), 0) AS trade_weighted_pnl
+"""
+
+
+def _open_rollup_db(path, schema):
+    """Writable connection to the dashboard-owned rollup file, shared across threads under the caller's lock."""
+    conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(schema + """
+        CREATE TABLE IF NOT EXISTS rollup_state (name TEXT PRIMARY KEY, value INTEGER);
+    """)
+    return conn
+
+
+def _rollup_watermark(db, name):
+    row = db.execute("SELECT value FROM rollup_state WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def _set_rollup_watermark(db, name, value):
+    db.execute("INSERT INTO rollup_state (name, value) VALUES (?, ?) "
+               "ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value))
+
+
+def _max_expr(col):
+    # scalar MAX() is NULL if either side is NULL
+    return f"{col} = COALESCE(MAX({col}, excluded.{col}), {col}, excluded.{col})"
+
+
+class ScoreRollups:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._checked_at = 0.0
+        self._catching_up = False
+        self.caught_up = False
+        self.stats = {"refreshes": 0, "rows_applied": 0, "buckets_upserted": 0, "rebuilds": 0, "catch_ups": 0}
+
+    def _db(self):
+        if self._conn is None:
+            cols = ", ".join(f"{name} {'TEXT' if name == 'last_ts' else 'REAL'}" for name, _ in _ROLLUP_AGGS)
+            self._conn = _open_rollup_db(self.path or ROLLUP_DB_PATH, f"""
+                CREATE TABLE IF NOT EXISTS score_hourly (
+                    strategy TEXT NOT NULL,
+                    hour TEXT NOT NULL,          -- UTC 'YYYY-MM-DDTHH', '' for rows without ts_iso
+                    {cols},
+                    PRIMARY KEY (strategy, hour)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_score_hourly_hour ON score_hourly(hour, strategy);
+            """)
+            if _rollup_watermark(self._conn, "score_hourly_format") != _SCORE_ROLLUP_FORMAT:
+                self._clear()
+        return self._conn
+
+    def _clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM score_hourly")
+            self._conn.execute("DELETE FROM rollup_state WHERE name = 'strategy_scores'")
+            _set_rollup_watermark(self._conn, "score_hourly_format", _SCORE_ROLLUP_FORMAT)
+
+    def watermark(self):
+        return _rollup_watermark(self._db(), "strategy_scores")
+
+    def refresh(self, src, force=False):
+        """Fold strategy_scores rows past the watermark into their hour buckets. Returns rows applied.
+
+        A backlog over ROLLUP_INLINE_ROWS (first start, long downtime, recreated table) is handed
+        to start_catch_up() instead of being folded inside the request; force=True folds inline.
+        """
+        if self._catching_up and not force:
+            return 0
+        with self._lock:
+            if not force and time.time() - self._checked_at < ROLLUP_REFRESH_S:
+                return 0
+            self._checked_at = time.time()
+            if not force:
+                mark = self.watermark()
+                top = src.execute("SELECT MAX(rowid) FROM strategy_scores").fetchone()[0] or 0
+                if top < mark or top - mark > ROLLUP_INLINE_ROWS:
+                    self.start_catch_up()
+                    return 0
+            applied, self.caught_up = self._fold(src)
+            self.stats["refreshes"] += 1
+            return applied
+
+    def _fold(self, src, batches=None):
+        """Apply up to `batches` ROLLUP_BATCH rowid ranges (caller holds the lock). Returns (rows, caught up)."""
+        db = self._db()
+        mark = self.watermark()
+        top = src.execute("SELECT MAX(rowid) FROM strategy_scores").fetchone()[0] or 0
+        if top < mark:   # source table was recreated
+            self._clear()
+            mark = 0
+        names = [name for name, _ in _ROLLUP_AGGS]
+        select = ", ".join(f"{expr} AS {name}" for name, expr in _ROLLUP_AGGS)
+        upsert = (f"INSERT INTO score_hourly (strategy, hour, {', '.join(names)}) "
+                  f"VALUES ({', '.join('?' * (len(names) + 2))}) ON CONFLICT (strategy, hour) DO UPDATE SET "
+                  + ", ".join(_max_expr(c) if c.endswith("_max") or c == "last_ts" else f"{c} = {c} + excluded.{c}"
+                              for c in names))
+        applied = 0
+        while mark < top and batches != 0:
+            hi = min(top, mark + ROLLUP_BATCH)
+            buckets = src.execute(
+                f"SELECT strategy, COALESCE({_ROLLUP_HOUR_EXPR}, '') AS hour, {select} FROM strategy_scores "
+                f"WHERE rowid > ? AND rowid <= ? GROUP BY strategy, hour",
+                (mark, hi)).fetchall()
+            with db:
+                db.executemany(upsert, [tuple(b) for b in buckets])
+                _set_rollup_watermark(db, "strategy_scores", hi)
+            applied += sum(b["n"] for b in buckets)
+            self.stats["buckets_upserted"] += len(buckets)
+            mark = hi
+            if batches:
+                batches -= 1
+        self.stats["rows_applied"] += applied
+        return applied, mark >= top
+
+    def start_catch_up(self):
+        """Fold the backlog on a daemon thread with its own connection, taking the lock one batch at a time.
+
+        Until it finishes `caught_up` is False and by_strategy()/overall() read the raw table.
+        """
+        with self._lock:
+            if self._catching_up:
+                return
+            self._catching_up = True
+            self.caught_up = False
+        threading.Thread(target=self._catch_up, name="score-rollups", daemon=True).start()
+
+    def _catch_up(self):
+        src = None
+        try:
+            src = get_db_connection()
+            done = False
+            while not done:
+                with self._lock:
+                    _, done = self._fold(src, batches=1)
+            self.caught_up = True
+            self.stats["catch_ups"] += 1
+        except Exception as e:
+            print(f"Score rollup catch-up failed: {e}")
+        finally:
+            if src is not None:
+                src.close()
+            self._catching_up = False
+
+    def rebuild(self, src):
+        with self._lock:
+            self._db()
+            self._clear()
+            self.stats["rebuilds"] += 1
+            return self.refresh(src, force=True)
+
+    @staticmethod
+    def since_hour(hours):
+        """Bucket key of the oldest hour in a window of `hours` (None = all time)."""
+        if hours is None:
+            return ""
+        return (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%dT%H")
+
+    @staticmethod
+    def _raw_source(since):
+        """strategy_scores reduced to one bucket per strategy, for reads before the rollups catch up."""
+        select = ", ".join(f"{expr} AS {name}" for name, expr in _ROLLUP_AGGS)
+        where, params = f"COALESCE({_ROLLUP_HOUR_EXPR}, '') >= ?", (since,)
+        if since:   # the day prefix can use an ts_iso index; the hour expression trims the rest
+            where, params = f"ts_iso >= ? AND {where}", (since[:10], since)
+        return f"(SELECT strategy, {select} FROM strategy_scores WHERE {where} GROUP BY strategy)", params
+
+    def by_strategy(self, hours=None, order_by="best_score DESC", limit=None, src=None):
+        """Per-strategy window metrics (see _ROLLUP_WINDOW_SELECT) over the last `hours`.
+
+        Pass the request's connection as `src` so a cold start reads the raw table instead.
+        """
+        since = self.since_hour(hours)
+        tail = f"GROUP BY strategy ORDER BY {order_by}" + (" LIMIT ?" if limit else "")
+        extra = (limit,) if limit else ()
+        if src is not None and not self.caught_up:
+            table, params = self._raw_source(since)
+            return src.execute(f"SELECT strategy, {_ROLLUP_WINDOW_SELECT} FROM {table} {tail}",
+                               params + extra).fetchall()
+        with self._lock:
+            return self._db().execute(f"SELECT strategy, {_ROLLUP_WINDOW_SELECT} FROM score_hourly "
+                                      f"WHERE hour >= ? {tail}", (since,) + extra).fetchall()
+
+    def overall(self, hours=None, src=None):
+        since = self.since_hour(hours)
+        if src is not None and not self.caught_up:
+            table, params = self._raw_source(since)
+            return src.execute(f"SELECT {_ROLLUP_WINDOW_SELECT} FROM {table}", params).fetchone()
+        with self._lock:
+            return self._db().execute(f"SELECT {_ROLLUP_WINDOW_SELECT} FROM score_hourly WHERE hour >= ?",
+                                      (since,)).fetchone()
+
+    def check(self, src, hours=None, tolerance=1e-6):
+        """Compare every rollup column against a raw GROUP BY over the same window. Returns mismatches."""
+        self.refresh(src, force=True)
+        since = self.since_hour(hours)
+        mark = self.watermark()
+        select = ", ".join(f"{expr} AS {name}" for name, expr in _ROLLUP_AGGS)
+        raw = {r["strategy"]: dict(r) for r in src.execute(
+            f"SELECT strategy, {select} FROM strategy_scores "
+            f"WHERE rowid <= ? AND COALESCE({_ROLLUP_HOUR_EXPR}, '') >= ? GROUP BY strategy", (mark, since))}
+        sums = ", ".join(f"{'MAX' if n.endswith('_max') or n == 'last_ts' else 'SUM'}({n}) AS {n}" for n, _ in _ROLLUP_AGGS)
+        with self._lock:
+            rolled = {r["strategy"]: dict(r) for r in self._db().execute(
+                f"SELECT strategy, {sums} FROM score_hourly WHERE hour >= ? GROUP BY strategy", (since,))}
+        mismatches = []
+        for strategy in sorted(set(raw) | set(rolled)):
+            a, b = raw.get(strategy), rolled.get(strategy)
+            if a is None or b is None:
+                mismatches.append({"strategy": strategy, "missing_from": "rollup" if b is None else "raw"})
+                continue
+            for name, _ in _ROLLUP_AGGS:
+                x, y = a[name], b[name]
+                same = x == y if isinstance(x, str) or x is None or y is None else abs(x - y) <= tolerance * max(1, abs(x))
+                if not same:
+                    mismatches.append({"strategy": strategy, "column": name, "raw": x, "rollup": y})
+        return {"window_hours": hours, "watermark": mark, "strategies": len(raw), "mismatches": mismatches}
+
+
+_score_rollups = ScoreRollups()
+
+
+# ── Latest backtest per strategy/symbol, parsed optimizer run ────────────────
+# strategy_backtest_results only grows, and the dashboard only ever wants the
+# newest row per strategy. New rows past a rowid watermark are reduced to their
+# newest per (strategy, symbol) and upserted into backtest_latest (same rollup
+# file), so readers touch one row per pair instead of the whole history.
+# The newest optimizer_runs row is parsed once and kept until a newer run lands.
+
+_BACKTEST_COLS = ("strategy", "symbol", "win_rate", "sharpe_ratio", "max_drawdown_pct",
+                  "total_pnl_pct", "total_trades", "ts_iso", "status")
+
+
+class LatestBacktests:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._checked_at = 0.0
+        self.stats = {"refreshes": 0, "rows_seen": 0, "pairs_upserted": 0, "rebuilds": 0}
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = _open_rollup_db(self.path or ROLLUP_DB_PATH, """
+                CREATE TABLE IF NOT EXISTS backtest_latest (
+                    strategy TEXT NOT NULL,
+                    symbol_key TEXT NOT NULL,    -- IFNULL(symbol, '')
+                    symbol TEXT, win_rate REAL, sharpe_ratio REAL, max_drawdown_pct REAL,
+                    total_pnl_pct REAL, total_trades INTEGER, ts_iso TEXT, status TEXT,
+                    src_rowid INTEGER NOT NULL,
+                    PRIMARY KEY (strategy, symbol_key)
+                ) WITHOUT ROWID;
+            """)
+        return self._conn
+
+    def watermark(self):
+        return _rollup_watermark(self._db(), "strategy_backtest_results")
+
+    def refresh(self, src, force=False):
+        """Fold strategy_backtest_results rows past the watermark into backtest_latest. Returns rows seen."""
+        with self._lock:
+            if not force and time.time() - self._checked_at < ROLLUP_REFRESH_S:
+                return 0
+            self._checked_at = time.time()
+            db = self._db()
+            mark = self.watermark()
+            top = src.execute("SELECT MAX(rowid) FROM strategy_backtest_results").fetchone()[0] or 0
+            if top < mark:   # source table was recreated
+                return self.rebuild(src)
+            cols = ", ".join(_BACKTEST_COLS)
+            seen = 0
+            while mark < top:
+                hi = min(top, mark + ROLLUP_BATCH)
+                seen += src.execute("SELECT COUNT(*) FROM strategy_backtest_results WHERE rowid > ? AND rowid <= ?",
+                                    (mark, hi)).fetchone()[0]
+                newest = src.execute(f"""
+                    SELECT {cols}, src_rowid FROM (
+                        SELECT {cols}, rowid AS src_rowid,
+                               ROW_NUMBER() OVER (PARTITION BY strategy, IFNULL(symbol, '')
+                                                  ORDER BY IFNULL(ts_iso, '') DESC, rowid DESC) AS rn
+                        FROM strategy_backtest_results
+                        WHERE rowid > ? AND rowid <= ? AND strategy IS NOT NULL
+                    ) WHERE rn = 1
+                """, (mark, hi)).fetchall()
+                with db:
+                    db.executemany(f"""
+                        INSERT INTO backtest_latest (symbol_key, {cols}, src_rowid)
+                        VALUES (IFNULL(?2, ''), {', '.join(f'?{i + 1}' for i in range(len(_BACKTEST_COLS) + 1))})
+                        ON CONFLICT (strategy, symbol_key) DO UPDATE SET
+                            {', '.join(f'{c} = excluded.{c}' for c in _BACKTEST_COLS[1:])},
+                            src_rowid = excluded.src_rowid
+                        WHERE (IFNULL(excluded.ts_iso, ''), excluded.src_rowid)
+                              > (IFNULL(backtest_latest.ts_iso, ''), backtest_latest.src_rowid)
+                    """, [tuple(r) for r in newest])
+                    _set_rollup_watermark(db, "strategy_backtest_results", hi)
+                self.stats["pairs_upserted"] += len(newest)
+                mark = hi
+            self.stats["refreshes"] += 1
+            self.stats["rows_seen"] += seen
+            return seen
+
+    def rebuild(self, src):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM backtest_latest")
+                db.execute("DELETE FROM rollup_state WHERE name = 'strategy_backtest_results'")
+            self.stats["rebuilds"] += 1
+            return self.refresh(src, force=True)
+
+    def by_strategy(self):
+        """Newest result per strategy (across symbols), newest first — same rows as the
+        first-row-per-strategy of `ORDER BY ts_iso DESC` over the full table."""
+        with self._lock:
+            return self._db().execute(f"""
+                SELECT {', '.join(_BACKTEST_COLS)} FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY strategy
+                                                 ORDER BY IFNULL(ts_iso, '') DESC, src_rowid DESC) AS rn
+                    FROM backtest_latest
+                ) WHERE rn = 1
+                ORDER BY IFNULL(ts_iso, '') DESC, src_rowid DESC
+            """).fetchall()
+
+    def check(self, src):
+        """Compare backtest_latest against a window-function query over the raw table. Returns mismatches."""
+        self.refresh(src, force=True)
+        mark = self.watermark()
+        cols = ", ".join(_BACKTEST_COLS)
+        raw = {(r["strategy"], r["symbol"]): tuple(r) for r in src.execute(f"""
+            SELECT {cols} FROM (
+                SELECT {cols}, ROW_NUMBER() OVER (PARTITION BY strategy, IFNULL(symbol, '')
+                                                  ORDER BY IFNULL(ts_iso, '') DESC, rowid DESC) AS rn
+                FROM strategy_backtest_results WHERE rowid <= ? AND strategy IS NOT NULL
+            ) WHERE rn = 1
+        """, (mark,))}
+        with self._lock:
+            kept = {(r["strategy"], r["symbol"]): tuple(r)
+                    for r in self._db().execute(f"SELECT {cols} FROM backtest_latest")}
+        mismatches = [{"strategy": k[0], "symbol": k[1], "raw": raw.get(k), "latest": kept.get(k)}
+                      for k in sorted(set(raw) | set(kept), key=str) if raw.get(k) != kept.get(k)]
+        return {"watermark": mark, "pairs": len(raw), "mismatches": mismatches}
+
+
+_latest_backtests = LatestBacktests()
+
+
+class LatestOptimizerRun:
+    """Newest optimizer_runs row (by ts_iso), its raw_json parsed once per run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rowid = None
+        self.ts_iso = None
+        self.data = None
+        self._scanned = 0   # rows up to this rowid have been considered
+        self.stats = {"parses": 0, "parse_errors": 0}
+
+    def get(self, src):
+        """Parsed raw_json of the newest run (None if there is none or it does not parse)."""
+        with self._lock:
+            top = src.execute("SELECT MAX(rowid) FROM optimizer_runs").fetchone()[0] or 0
+            if top < self._scanned:   # table was recreated
+                self.rowid = self.ts_iso = self.data = None
+                self._scanned = 0
+            if top == self._scanned:
+                return self.data
+            row = src.execute("""
+                SELECT rowid, ts_iso FROM optimizer_runs WHERE rowid > ? AND rowid <= ?
+                ORDER BY ts_iso DESC, rowid DESC LIMIT 1
+            """, (self._scanned, top)).fetchone()
+            self._scanned = top
+            if row is None or (self.rowid is not None and (row[1] or "") < (self.ts_iso or "")):
+                return self.data
+            raw = src.execute("SELECT raw_json FROM optimizer_runs WHERE rowid = ?", (row[0],)).fetchone()[0]
+            self.rowid, self.ts_iso, self.data = row[0], row[1], None
+            if raw:
+                self.stats["parses"] += 1
+                try:
+                    self.data = json.loads(raw)
+                except Exception as e:
+                    self.stats["parse_errors"] += 1
+                    print(f"Error parsing optimizer_runs: {e}")
+            return self.data
+
+
+_latest_optimizer = LatestOptimizerRun()
+
+
+# ── Daily report index ───────────────────────────────────────────────────────
+# Reports change about once a day. /api/reports is served from parsed,
+# pre-serialized bytes that are rebuilt only when the reports directory (its
+# mtime, then the newest YYYY-MM-DD.json's mtime and size) or daily_reports
+# (max rowid, row count) changes. Per request only the timestamp is appended;
+# gzip clients get the body compressed once up to the timestamp and finished
+# from a copy of that compressor.
+
+REPORT_FILE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}\.json$')   # not optimizer_results files
+REPORTS_RECENT = 7
+REPORTS_GZIP_MIN_BYTES = 1024
+
+
+class ReportIndex:
+    def __init__(self, reports_dir=None):
+        self.reports_dir = reports_dir
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        self._latest_file = None
+        self._key = None
+        self._prefix = b""       # serialized body up to the timestamp value
+        self._gzip = None        # (header bytes, compressobj primed with _prefix)
+        self.latest_report = None
+        self.recent_reports = []
+        self.stats = {"builds": 0, "dir_scans": 0, "hits": 0, "gzip_responses": 0}
+
+    def _latest_path(self):
+        reports_dir = Path(self.reports_dir or REPORTS_DIR)
+        try:
+            mtime = reports_dir.stat().st_mtime_ns
+        except OSError:
+            self._dir_mtime = self._latest_file = None
+            return None
+        if mtime != self._dir_mtime:
+            names = [e.name for e in os.scandir(reports_dir) if REPORT_FILE_RE.match(e.name)]
+            self._latest_file = reports_dir / max(names) if names else None
+            self._dir_mtime = mtime
+            self.stats["dir_scans"] += 1
+        return self._latest_file
+
+    def _fingerprint(self, conn):
+        path = self._latest_path()
+        file_key = None
+        if path is not None:
+            try:
+                st = path.stat()
+                file_key = (path.name, st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        db_key = tuple(conn.execute("SELECT MAX(rowid), COUNT(*) FROM daily_reports").fetchone())
+        return path, file_key, db_key
+
+    def _build(self, conn, path):
+        latest_report = None
+        if path is not None:
+            try:
+                with open(path, 'r') as f:
+                    latest_report = json.load(f)
+            except Exception as e:
+                print(f"Error reading report file: {e}")
+
+        db_reports = []
+        for row in conn.execute("""
+            SELECT date, full_report_json, summary
+            FROM daily_reports
+            ORDER BY date DESC
+            LIMIT ?
+        """, (REPORTS_RECENT,)):
+            try:
+                report_data = json.loads(row['full_report_json']) if row['full_report_json'] else {}
+            except json.JSONDecodeError:
+                continue
+            db_reports.append({"date": row['date'], "summary": row['summary'], "data": report_data})
+
+        body = jsonify({"latest_report": latest_report, "recent_reports": db_reports}).get_data().rstrip()
+        self._prefix = body[:-1] + b',"timestamp":"'
+        self._gzip = None
+        if len(self._prefix) >= REPORTS_GZIP_MIN_BYTES:
+            gz = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self._gzip = (gz.compress(self._prefix), gz)
+        self.latest_report, self.recent_reports = latest_report, db_reports
+        self.stats["builds"] += 1
+
+    def response(self, conn):
+        with self._lock:
+            path, *key = self._fingerprint(conn)
+            if key != self._key:
+                self._build(conn, path)
+                self._key = key
+            else:
+                self.stats["hits"] += 1
+            prefix, gzip = self._prefix, self._gzip
+        tail = (datetime.utcnow().isoformat() + 'Z"}\n').encode()
+        if gzip is not None and request.accept_encodings["gzip"]:
+            head, gz = gzip
+            gz = gz.copy()
+            resp = Response(head + gz.compress(tail) + gz.flush(), mimetype="application/json")
+            resp.headers["Content-Encoding"] = "gzip"
+            self.stats["gzip_responses"] += 1
+        else:
+            resp = Response(prefix + tail, mimetype="application/json")
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+    def snapshot(self):
+        return {"latest_file": self._latest_file.name if self._latest_file else None,
+                "body_bytes": len(self._prefix), "gzip": self._gzip is not None, **self.stats}
+
+
+_report_index = ReportIndex()
+
+
 def classify_leakage(train_acc, test_acc, f1_score=None):
     """Classify likely leakage using strict, near-perfect criteria to avoid false positives."""
     train = float(train_acc) if train_acc is not None else None
@@ -216,48 +1699,36 @@ def api_status(conn):
 
 
 @app.route('/api/live-data')
+def api_live_data():
+    """Get real-time data flow status (in-memory counters; SQL while the tailer isn't ready)."""
+    try:
+        live = _live.snapshot(wait=0)
+    except RuntimeError:
+        return _live_data_from_sql()
+    ticks = live["ticks"]["counts"]
+    return jsonify({
+        "ticks_10s": ticks["10s"],
+        "signals_1m": live["signals"]["counts"]["60s"],
+        "last_tick_iso": live["ticks"]["last_ts_iso"],
+        "is_flowing": ticks["30s"] > 0,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    })
+
+
 @cache_response(ttl_seconds=5)
 @safe_query
-def api_live_data(conn):
-    """Get real-time data flow status (lightweight, fast endpoint)."""
-    cursor = conn.cursor()
+def _live_data_from_sql(conn):
     now = datetime.utcnow()
-    
-    # Recent ticks (last 10 seconds)
-    ten_sec_ago = (now - timedelta(seconds=10)).isoformat()
-    cursor.execute(
-        "SELECT COUNT(*) as count FROM ticks WHERE ts_iso > ?",
-        (ten_sec_ago,)
-    )
-    ticks_10s = cursor.fetchone()['count']
-    
-    # Recent signals (last 60 seconds)
-    one_min_ago = (now - timedelta(seconds=60)).isoformat()
-    cursor.execute(
-        "SELECT COUNT(*) as count FROM signals WHERE ts_iso > ?",
-        (one_min_ago,)
-    )
-    signals_1m = cursor.fetchone()['count']
-    
-    # Last tick timestamp
-    cursor.execute(
-        "SELECT MAX(ts_iso) as last_ts FROM ticks"
-    )
-    last_tick = cursor.fetchone()['last_ts']
-    
-    # Check if data is flowing (any ticks in last 30 seconds)
-    thirty_sec_ago = (now - timedelta(seconds=30)).isoformat()
-    cursor.execute(
-        "SELECT COUNT(*) as count FROM ticks WHERE ts_iso > ?",
-        (thirty_sec_ago,)
-    )
-    is_flowing = cursor.fetchone()['count'] > 0
-    
+    since = {s: (now - timedelta(seconds=s)).isoformat() for s in (10, 30, 60)}
+    ticks_10s = conn.execute("SELECT COUNT(*) FROM ticks WHERE ts_iso > ?", (since[10],)).fetchone()[0]
+    ticks_30s = conn.execute("SELECT COUNT(*) FROM ticks WHERE ts_iso > ?", (since[30],)).fetchone()[0]
+    signals_1m = conn.execute("SELECT COUNT(*) FROM signals WHERE ts_iso > ?", (since[60],)).fetchone()[0]
+    last_tick = conn.execute("SELECT MAX(ts_iso) FROM ticks").fetchone()[0]
     return jsonify({
         "ticks_10s": ticks_10s,
         "signals_1m": signals_1m,
         "last_tick_iso": last_tick,
-        "is_flowing": is_flowing,
+        "is_flowing": ticks_30s > 0,
         "timestamp": now.isoformat() + "Z"
     })
 
@@ -267,26 +1738,15 @@ def api_live_data(conn):
 @safe_query
 def api_strategies(conn):
     """Get top strategies with scores and win rates. Filters out ghost strategies (no .py file)."""
-    cursor = conn.cursor()
     valid_files = get_strategy_file_names()
 
-    # Get top strategies from the last 24 hours
-    cursor.execute("""
-        SELECT
-            strategy,
-            MAX(score) as best_score,
-            AVG(score) as avg_score,
-            COUNT(*) as score_count,
-            MAX(ts_iso) as last_update
-        FROM strategy_scores
-        WHERE ts_iso > datetime('now', '-24 hours')
-        GROUP BY strategy
-        ORDER BY best_score DESC
-        LIMIT 20
-    """)
+    # Top strategies from the last 24 hours (hourly rollups of strategy_scores)
+    _score_rollups.refresh(conn)
+    top_rows = _score_rollups.by_strategy(hours=24, order_by="best_score DESC", limit=20, src=conn)
 
     strategies = []
-    for row in cursor.fetchall():
+    active_strategies = []
+    for row in top_rows:
         # Skip ghost strategies (no .py file on disk)
         if row['strategy'] not in valid_files:
             continue
@@ -294,36 +1754,16 @@ def api_strategies(conn):
             "strategy": row['strategy'],
             "best_score": round(row['best_score'], 2) if row['best_score'] else 0,
             "avg_score": round(row['avg_score'], 2) if row['avg_score'] else 0,
-            "score_count": row['score_count'],
+            "score_count": int(row['score_count']),
             "last_update": row['last_update']
         })
-
-    # Get strategy performance from live strategy_scores table (real backtested data)
-    cursor.execute("""
-        SELECT
-            strategy,
-            AVG(win_rate) as avg_win_rate,
-            AVG(sharpe_ratio) as avg_sharpe,
-            AVG(avg_pnl_pct) as avg_pnl,
-            COUNT(*) as total_evals,
-            MAX(ts_iso) as last_update
-        FROM strategy_scores
-        WHERE ts_iso > datetime('now', '-24 hours')
-        GROUP BY strategy
-        ORDER BY MAX(score) DESC
-        LIMIT 20
-    """)
-
-    active_strategies = []
-    for row in cursor.fetchall():
-        if row['strategy'] not in valid_files:
-            continue
+        # Strategy performance from live strategy_scores (real backtested data)
         active_strategies.append({
             "name": row['strategy'],
             "win_rate": round(row['avg_win_rate'], 4) if row['avg_win_rate'] else 0,
             "sharpe_ratio": round(row['avg_sharpe'], 2) if row['avg_sharpe'] else 0,
             "total_pnl_pct": round(row['avg_pnl'], 2) if row['avg_pnl'] else 0,
-            "trades": int(row['total_evals']) if row['total_evals'] else 0,
+            "trades": int(row['score_count']) if row['score_count'] else 0,
             "updated": row['last_update']
         })
 
@@ -358,33 +1798,34 @@ def api_strategies(conn):
     })
 
 
-@app.route('/api/registry')
-@cache_response(ttl_seconds=30)
-@safe_query
-def api_registry(conn):
-    """
-    Strategy registry endpoint.
+_REGISTRY_RANK_ORDER = """
+                CASE WHEN r.pnl_rank IS NOT NULL THEN 0 ELSE 1 END,
+                r.pnl_rank ASC,
+                r.bt_pnl_pct DESC NULLS LAST"""
+
+
+def registry_exists(conn):
+    return conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='strategy_registry'"
+    ).fetchone() is not None
 
-    Returns per-strategy tier, backtest metrics, and forward-test metrics.
+
+def registry_rows(conn, after=None, limit=None, ranked=False):
+    """
+    (name,) → registry strategy in name order, or ranked (pnl_rank, or tier then
+    FT P&L in the fallback) with ranked=True.
     If strategy_registry table exists: reads tier from it.
     Otherwise: infers tier from strategy_scores + strategy_backtest_results.
-    Ghost strategies (no .py file on disk) are excluded.
-    Also returns Tier 2 aggregate for headline metrics.
+    Ghost strategies (no .py file on disk) are excluded from the fallback.
     """
     cursor = conn.cursor()
     valid_files = get_strategy_file_names()
 
-    # Check if strategy_registry table exists
-    cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='strategy_registry'"
-    )
-    registry_exists = cursor.fetchone() is not None
-
-    strategies = []
-
-    if registry_exists:
+    if registry_exists(conn):
         # Use strategy_registry as source of truth for tiers + metrics
-        cursor.execute("""
+        after_sql, params = keyset_clause(("r.strategy_name",), after)
+        order = _REGISTRY_RANK_ORDER if ranked else "r.strategy_name"
+        cursor.execute(f"""
             SELECT
                 r.strategy_name,
                 r.tier,
@@ -410,16 +1851,14 @@ def api_registry(conn):
                 r.archived,
                 r.archive_reason
             FROM strategy_registry r
-            WHERE r.archived = 0
-            ORDER BY
-                CASE WHEN r.pnl_rank IS NOT NULL THEN 0 ELSE 1 END,
-                r.pnl_rank ASC,
-                r.bt_pnl_pct DESC NULLS LAST
-        """)
-        for row in cursor.fetchall():
+            WHERE r.archived = 0 AND {after_sql}
+            ORDER BY {order}
+            LIMIT ?
+        """, params + (-1 if limit is None else limit,))
+        for row in cursor:
             name = row['strategy_name']
             has_file = name in valid_files
-            strategies.append({
+            yield (name,), {
                 "name": name,
                 "tier": row['tier'],
                 "has_file": has_file,
@@ -441,43 +1880,37 @@ def api_registry(conn):
                 "gate_status": row['gate_status'] or 'fail',
                 "gate_failures": row['gate_failures'] or '',
                 "pnl_rank": row['pnl_rank'],
-            })
+            }
     else:
+        strategies = []
         # Fallback: build from strategy_scores + strategy_backtest_results
-        # Fetch forward-test data from strategy_scores
-        cursor.execute("""
-            SELECT
-                strategy,
-                AVG(win_rate)          AS ft_win_rate,
-                AVG(sharpe_ratio)      AS ft_sharpe,
-                SUM(avg_pnl_pct * trades) / NULLIF(SUM(trades), 0) AS ft_pnl_pct,
-                AVG(max_drawdown_pct)  AS ft_max_dd,
-                SUM(trades)            AS ft_trades,
-                MAX(score)             AS best_score
-            FROM strategy_scores
-            GROUP BY strategy
-        """)
+        # (in memory, but bounded by the number of strategies, not by table size)
+        # Forward-test data: all-time strategy_scores rollups
+        _score_rollups.refresh(conn)
         ft_data = {}
-        for row in cursor.fetchall():
-            ft_data[row['strategy']] = dict(row)
-
-        # Fetch backtest data from strategy_backtest_results
-        cursor.execute("""
-            SELECT
-                strategy,
-                win_rate  AS bt_win_rate,
-                sharpe_ratio AS bt_sharpe,
-                total_pnl_pct AS bt_pnl_pct,
-                max_drawdown_pct AS bt_max_dd,
-                total_trades AS bt_trades
-            FROM strategy_backtest_results
-            ORDER BY ts_iso DESC
-        """)
+        for row in _score_rollups.by_strategy(order_by="strategy", src=conn):
+            ft_data[row['strategy']] = {
+                "strategy": row['strategy'],
+                "ft_win_rate": row['avg_win_rate'],
+                "ft_sharpe": row['avg_sharpe'],
+                "ft_pnl_pct": row['trade_weighted_pnl'],
+                "ft_max_dd": row['avg_drawdown'],
+                "ft_trades": row['total_trades'],
+                "best_score": row['best_score'],
+            }
+
+        # Fetch backtest data: newest strategy_backtest_results row per strategy
+        _latest_backtests.refresh(conn)
         bt_data = {}
-        for row in cursor.fetchall():
-            name = row['strategy']
-            if name not in bt_data:
-                bt_data[name] = dict(row)
+        for row in _latest_backtests.by_strategy():
+            bt_data[row['strategy']] = {
+                "strategy": row['strategy'],
+                "bt_win_rate": row['win_rate'],
+                "bt_sharpe": row['sharpe_ratio'],
+                "bt_pnl_pct": row['total_pnl_pct'],
+                "bt_max_dd": row['max_drawdown_pct'],
+                "bt_trades": row['total_trades'],
+            }
 
         all_names = set(list(ft_data.keys()) + list(bt_data.keys()))
         for name in sorted(all_names):
@@ -505,35 +1938,71 @@ def api_registry(conn):
                 "source": "fallback",
             })
         # Sort: T2 first, then by ft_pnl_pct
-        strategies.sort(key=lambda s: (-s['tier'], -s['ft_pnl_pct']))
-
-    # Compute Tier 2 aggregates for headline metrics
-    t2 = [s for s in strategies if s['tier'] == 2]
-    t2_count = len(t2)
-    if t2_count > 0:
-        t2_avg_wr = round(sum(s['ft_win_rate'] for s in t2) / t2_count, 2)
-        t2_avg_sharpe = round(sum(s['ft_sharpe'] for s in t2) / t2_count, 3)
-        t2_total_pnl = round(sum(s['ft_pnl_pct'] for s in t2), 2)
-        t2_avg_dd = round(sum(s['ft_max_dd'] for s in t2) / t2_count, 2)
-        t2_total_trades = sum(s['ft_trades'] for s in t2)
-    else:
-        t2_avg_wr = t2_avg_sharpe = t2_total_pnl = t2_avg_dd = 0
-        t2_total_trades = 0
+        if ranked:
+            strategies.sort(key=lambda s: (-s['tier'], -s['ft_pnl_pct']))
+        elif after is not None:
+            strategies = [s for s in strategies if s['name'] > after[0]]
+        for s in strategies[:limit]:
+            yield (s['name'],), s
+
+
+def tier2_summary(strategies):
+    """Tier 2 aggregates for headline metrics, accumulated over any iterable of registry rows."""
+    t2_count = 0
+    wr = sharpe = pnl = dd = 0.0
+    trades = 0
+    for s in strategies:
+        if s['tier'] == 2:
+            t2_count += 1
+            wr += s['ft_win_rate']
+            sharpe += s['ft_sharpe']
+            pnl += s['ft_pnl_pct']
+            dd += s['ft_max_dd']
+            trades += s['ft_trades']
+    if t2_count == 0:
+        return {"count": 0, "avg_win_rate": 0, "avg_sharpe": 0, "total_pnl_pct": 0, "avg_max_dd": 0,
+                "total_trades": 0}
+    return {
+        "count": t2_count,
+        "avg_win_rate": round(wr / t2_count, 2),
+        "avg_sharpe": round(sharpe / t2_count, 3),
+        "total_pnl_pct": round(pnl, 2),
+        "avg_max_dd": round(dd / t2_count, 2),
+        "total_trades": trades,
+    }
 
-    return jsonify({
+
+@app.route('/api/registry')
+@streamable(registry_rows, "strategies", (str,))
+@cache_response(ttl_seconds=30)
+@safe_query
+def api_registry(conn):
+    """
+    Strategy registry endpoint.
+
+    Returns per-strategy tier, backtest metrics, and forward-test metrics
+    (see registry_rows), plus a Tier 2 aggregate for headline metrics.
+    ?limit=&after=<name> pages strategies in name order; the Tier 2 aggregate
+    comes with the first page only.
+    """
+    try:
+        strategies, next_after = read_page(registry_rows, conn, (str,), ranked=not is_paged())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = {
         "strategies": strategies,
         "count": len(strategies),
-        "registry_exists": registry_exists,
-        "tier2_summary": {
-            "count": t2_count,
-            "avg_win_rate": t2_avg_wr,
-            "avg_sharpe": t2_avg_sharpe,
-            "total_pnl_pct": t2_total_pnl,
-            "avg_max_dd": t2_avg_dd,
-            "total_trades": t2_total_trades,
-        },
+        "registry_exists": registry_exists(conn),
         "timestamp": datetime.utcnow().isoformat() + "Z",
-    })
+    }
+    if not is_paged():
+        body["tier2_summary"] = tier2_summary(strategies)
+    else:
+        body["next_after"] = next_after
+        if "after" not in request.args:
+            body["tier2_summary"] = tier2_summary(row for _, row in registry_rows(conn))
+    return jsonify(body)
 
 
 @app.route('/api/models')
@@ -640,61 +2109,10 @@ def api_models(conn):
 
 
 @app.route('/api/reports')
-@cache_response(ttl_seconds=30)
 @safe_query
 def api_reports(conn):
-    """Get latest hourly/daily reports."""
-    cursor = conn.cursor()
-    
-    # Get the latest DAILY report from filesystem
-    # P4 FIX: Only match date-pattern files (YYYY-MM-DD.json), not optimizer_results files
-    latest_report_file = None
-    if REPORTS_DIR.exists():
-        import re as _re
-        date_pattern = _re.compile(r'^\d{4}-\d{2}-\d{2}\.json$')
-        report_files = sorted(
-            [f for f in REPORTS_DIR.glob("*.json") if date_pattern.match(f.name)],
-            reverse=True
-        )
-        if report_files:
-            latest_report_file = report_files[0]
-    
-    latest_report = None
-    if latest_report_file and latest_report_file.exists():
-        try:
-            with open(latest_report_file, 'r') as f:
-                latest_report = json.load(f)
-        except Exception as e:
-            print(f"Error reading report file: {e}")
-    
-    # Get recent reports from database
-    cursor.execute("""
-        SELECT 
-            date,
-            full_report_json,
-            summary
-        FROM daily_reports
-        ORDER BY date DESC
-        LIMIT 7
-    """)
-    
-    db_reports = []
-    for row in cursor.fetchall():
-        try:
-            report_data = json.loads(row['full_report_json']) if row['full_report_json'] else {}
-            db_reports.append({
-                "date": row['date'],
-                "summary": row['summary'],
-                "data": report_data
-            })
-        except json.JSONDecodeError:
-            continue
-    
-    return jsonify({
-        "latest_report": latest_report,
-        "recent_reports": db_reports,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    })
+    """Get latest hourly/daily reports (prebuilt by the report index, not the response cache)."""
+    return _report_index.response(conn)
 
 
 @app.route('/api/advanced_metrics')
@@ -733,20 +2151,9 @@ def api_advanced_metrics(conn):
     pf_data = cursor.fetchone()
     profit_factor = (pf_data['total_profit'] / pf_data['total_loss']) if pf_data['total_loss'] > 0 else 0
     
-    # Get strategy performance metrics
-    cursor.execute("""
-        SELECT 
-            AVG(sharpe_ratio) as avg_sharpe,
-            MAX(sharpe_ratio) as max_sharpe,
-            AVG(max_drawdown_pct) as avg_drawdown,
-            MAX(max_drawdown_pct) as max_drawdown,
-            AVG(win_rate) as avg_win_rate,
-            AVG(score) as avg_score
-        FROM strategy_scores
-        WHERE ts_iso > datetime('now', '-7 days')
-    """)
-    
-    strat_metrics = cursor.fetchone()
+    # Get strategy performance metrics (7d, from the hourly strategy_scores rollups)
+    _score_rollups.refresh(conn)
+    strat_metrics = _score_rollups.overall(hours=7 * 24, src=conn)
     
     # Calculate Sortino ratio (simplified - using downside deviation)
     cursor.execute("""
@@ -767,32 +2174,20 @@ def api_advanced_metrics(conn):
     expectancy = trade_stats['avg_pnl'] if trade_stats['avg_pnl'] else 0
     
     # Top 3 strategies by score — used for headline metrics
-    cursor.execute("""
-        SELECT strategy, MAX(score) as score, 
-               AVG(win_rate) as win_rate, AVG(sharpe_ratio) as sharpe_ratio, 
-               AVG(max_drawdown_pct) as max_drawdown_pct,
-               AVG(avg_pnl_pct) as avg_pnl_pct, AVG(total_pnl_pct) as total_pnl_pct, 
-               AVG(trades) as trades
-        FROM strategy_scores
-        WHERE ts_iso > datetime('now', '-7 days')
-        GROUP BY strategy
-        ORDER BY score DESC
-        LIMIT 3
-    """)
-    top3 = cursor.fetchall()
+    top3 = _score_rollups.by_strategy(hours=7 * 24, order_by="best_score DESC", limit=3, src=conn)
 
     top3_info = []
     t3_wr_sum = 0; t3_sharpe_sum = 0; t3_dd_sum = 0; t3_pnl_sum = 0; t3_exp_sum = 0; t3_trades_sum = 0
     for r in (top3 or []):
-        wr = round((r['win_rate'] or 0) * 100, 1)
-        sharpe = round(r['sharpe_ratio'] or 0, 2)
-        dd = round(r['max_drawdown_pct'] or 0, 1)
-        pnl = round(r['total_pnl_pct'] or 0, 2)
-        exp = round(r['avg_pnl_pct'] or 0, 4)
-        trades = r['trades'] or 0
+        wr = round((r['avg_win_rate'] or 0) * 100, 1)
+        sharpe = round(r['avg_sharpe'] or 0, 2)
+        dd = round(r['avg_drawdown'] or 0, 1)
+        pnl = round(r['avg_total_pnl'] or 0, 2)
+        exp = round(r['avg_pnl'] or 0, 4)
+        trades = r['avg_trades'] or 0
         top3_info.append({
             "strategy": r['strategy'],
-            "score": round(r['score'], 1),
+            "score": round(r['best_score'], 1),
             "win_rate": wr, "sharpe": sharpe, "max_dd": dd
         })
         t3_wr_sum += wr; t3_sharpe_sum += sharpe; t3_dd_sum += dd
@@ -854,26 +2249,16 @@ def api_backtest_comparison(conn):
     """
     cursor = conn.cursor()
     
-    # ─── 1. Fetch backtest results ─────────────────────────────────────────
-    cursor.execute("""
-        SELECT strategy, symbol, win_rate, sharpe_ratio,
-               max_drawdown_pct, total_pnl_pct, total_trades,
-               ts_iso, status
-        FROM strategy_backtest_results
-        ORDER BY ts_iso DESC
-    """)
+    # ─── 1. Fetch backtest results (newest per strategy) ──────────────────
+    _latest_backtests.refresh(conn)
     backtest_rows = {}
-    for row in cursor.fetchall():
-        key = row['strategy']
-        if key not in backtest_rows:
-            backtest_rows[key] = dict(row)
+    for row in _latest_backtests.by_strategy():
+        backtest_rows[row['strategy']] = dict(row)
     
     # ─── 2. Fetch optimizer top strategies (most recent run) ──────────────
-    cursor.execute("SELECT raw_json FROM optimizer_runs ORDER BY ts_iso DESC LIMIT 1")
-    opt_row = cursor.fetchone()
-    if opt_row and opt_row['raw_json']:
+    opt_data = _latest_optimizer.get(conn)
+    if opt_data:
         try:
-            opt_data = json.loads(opt_row['raw_json'])
             for s in opt_data.get('top_strategies', []):
                 key = s.get('strategy', 'unknown')
                 if key not in backtest_rows:
@@ -892,23 +2277,19 @@ def api_backtest_comparison(conn):
             print(f"Error parsing optimizer_runs: {e}")
     
     # ─── 3. Fetch paper trading metrics per strategy ───────────────────────
-    cursor.execute("""
-        SELECT 
-            ss.strategy,
-            AVG(ss.win_rate)           AS paper_win_rate,
-            AVG(ss.sharpe_ratio)       AS paper_sharpe,
-            AVG(ss.max_drawdown_pct)   AS paper_max_dd,
-            AVG(ss.avg_pnl_pct)        AS paper_avg_pnl,
-            SUM(ss.trades)             AS paper_total_trades,
-            MAX(ss.ts_iso)             AS last_updated,
-            COUNT(*)                   AS eval_count
-        FROM strategy_scores ss
-        GROUP BY ss.strategy
-        ORDER BY last_updated DESC
-    """)
+    _score_rollups.refresh(conn)
     paper_rows = {}
-    for row in cursor.fetchall():
-        paper_rows[row['strategy']] = dict(row)
+    for row in _score_rollups.by_strategy(order_by="last_update DESC", src=conn):
+        paper_rows[row['strategy']] = {
+            'strategy': row['strategy'],
+            'paper_win_rate': row['avg_win_rate'],
+            'paper_sharpe': row['avg_sharpe'],
+            'paper_max_dd': row['avg_drawdown'],
+            'paper_avg_pnl': row['avg_pnl'],
+            'paper_total_trades': row['total_trades'],
+            'last_updated': row['last_update'],
+            'eval_count': row['score_count'],
+        }
     
     # ─── 4. Fetch paper trade PnL aggregates ──────────────────────────────
     # paper_trades doesn't have strategy column, so use confirmed_signals join
@@ -1106,10 +2487,16 @@ def api_summary(conn):
     """
     cursor = conn.cursor()
     now = datetime.utcnow()
+    try:
+        live = _live.snapshot(wait=0)   # don't hold a pooled connection waiting for the tailer
+    except RuntimeError:
+        live = None                     # not ready or failing: the SQL counts below
 
-    # Total signal count
-    cursor.execute("SELECT COUNT(*) as cnt FROM signals")
-    signals_count = cursor.fetchone()['cnt']
+    # Total signal count (running total from the live tailer, once its initial count is done)
+    signals_count = live["signals"]["total"] if live else None
+    if signals_count is None:
+        cursor.execute("SELECT COUNT(*) as cnt FROM signals")
+        signals_count = cursor.fetchone()['cnt']
 
     # Recent signals (last 20)
     cursor.execute("""
@@ -1121,14 +2508,16 @@ def api_summary(conn):
     recent_signals = [dict(row) for row in cursor.fetchall()]
 
     # Signal breakdown last 1h
-    one_hour_ago = (now - timedelta(hours=1)).isoformat()
-    cursor.execute("""
-        SELECT signal, COUNT(*) as cnt
-        FROM signals
-        WHERE ts_iso > ?
-        GROUP BY signal
-    """, (one_hour_ago,))
-    signals_1h_by_type = {row['signal']: row['cnt'] for row in cursor.fetchall()}
+    if live:
+        signals_1h_by_type = live["signals"]["by_signal_1h"]
+    else:
+        cursor.execute("""
+            SELECT signal, COUNT(*) as cnt
+            FROM signals
+            WHERE ts_iso > ?
+            GROUP BY signal
+        """, ((now - timedelta(hours=1)).isoformat(),))
+        signals_1h_by_type = {row['signal']: row['cnt'] for row in cursor.fetchall()}
 
     # Paper trade stats
     cursor.execute("""
@@ -1160,15 +2549,19 @@ def api_summary(conn):
     recent_trades = [dict(row) for row in cursor.fetchall()]
 
     # Live data flow
-    ten_sec_ago = (now - timedelta(seconds=10)).isoformat()
-    thirty_sec_ago = (now - timedelta(seconds=30)).isoformat()
-    cursor.execute("SELECT COUNT(*) as cnt FROM ticks WHERE ts_iso > ?", (ten_sec_ago,))
-    ticks_10s = cursor.fetchone()['cnt']
-    cursor.execute("SELECT COUNT(*) as cnt FROM ticks WHERE ts_iso > ?", (thirty_sec_ago,))
-    ticks_30s = cursor.fetchone()['cnt']
-    cursor.execute("SELECT MAX(ts_iso) as last_ts FROM ticks")
-    last_tick_row = cursor.fetchone()
-    last_tick_iso = last_tick_row['last_ts'] if last_tick_row else None
+    if live:
+        ticks_10s = live["ticks"]["counts"]["10s"]
+        ticks_30s = live["ticks"]["counts"]["30s"]
+        last_tick_iso = live["ticks"]["last_ts_iso"]
+    else:
+        cursor.execute("SELECT COUNT(*) as cnt FROM ticks WHERE ts_iso > ?",
+                       ((now - timedelta(seconds=10)).isoformat(),))
+        ticks_10s = cursor.fetchone()['cnt']
+        cursor.execute("SELECT COUNT(*) as cnt FROM ticks WHERE ts_iso > ?",
+                       ((now - timedelta(seconds=30)).isoformat(),))
+        ticks_30s = cursor.fetchone()['cnt']
+        cursor.execute("SELECT MAX(ts_iso) as last_ts FROM ticks")
+        last_tick_iso = cursor.fetchone()['last_ts']
 
     is_live = ticks_10s > 2
 
@@ -1217,14 +2610,11 @@ def api_summary(conn):
     })
 
 
-@app.route('/api/coin_performance')
-@cache_response(ttl_seconds=30)
-@safe_query
-def api_coin_performance(conn):
+def coin_performance_rows(conn, after=None, limit=None):
     """
-    Per-coin strategy performance from strategy_coin_eligibility (paper trading stats)
-    joined with strategy_coin_performance (backtest stats).
-    Returns rows sorted by strategy then symbol.
+    (strategy, symbol) → row from strategy_coin_eligibility (paper trading stats)
+    joined with strategy_coin_performance (backtest stats), in key order.
+    Backtest-only rows when there is no eligibility table yet.
     """
     cursor = conn.cursor()
 
@@ -1238,11 +2628,6 @@ def api_coin_performance(conn):
     )
     scp_exists = cursor.fetchone() is not None
 
-    if not sce_exists and not scp_exists:
-        return jsonify({"rows": [], "count": 0, "timestamp": datetime.utcnow().isoformat() + "Z"})
-
-    rows = []
-
     if sce_exists:
         join_clause = ""
         if scp_exists:
@@ -1250,6 +2635,7 @@ def api_coin_performance(conn):
                 LEFT JOIN strategy_coin_performance scp
                     ON sce.strategy_name = scp.strategy_name AND sce.symbol = scp.symbol
             """
+        after_sql, params = keyset_clause(("sce.strategy_name", "sce.symbol"), after)
         cursor.execute(f"""
             SELECT
                 sce.strategy_name,
@@ -1266,10 +2652,12 @@ def api_coin_performance(conn):
                 {'scp.bt_pnl_pct, scp.bt_profit_factor' if scp_exists else 'NULL AS bt_pnl_pct, NULL AS bt_profit_factor'}
             FROM strategy_coin_eligibility sce
             {join_clause}
+            WHERE {after_sql}
             ORDER BY sce.strategy_name, sce.symbol
-        """)
-        for row in cursor.fetchall():
-            rows.append({
+            LIMIT ?
+        """, params + (-1 if limit is None else limit,))
+        for row in cursor:
+            yield (row['strategy_name'], row['symbol']), {
                 "strategy":        row['strategy_name'],
                 "symbol":          row['symbol'],
                 "trades":          int(row['total_trades'] or 0),
@@ -1284,21 +2672,23 @@ def api_coin_performance(conn):
                 "bt_win_rate_pct": float(row['bt_win_rate_pct'] or 0) if row['bt_win_rate_pct'] is not None else None,
                 "bt_pnl_pct":      round(float(row['bt_pnl_pct']), 2) if row['bt_pnl_pct'] is not None else None,
                 "bt_profit_factor": round(float(row['bt_profit_factor']), 3) if row['bt_profit_factor'] is not None else None,
-            })
+            }
     elif scp_exists:
         # No eligibility data yet — show backtest-only rows
-        cursor.execute("""
+        after_sql, params = keyset_clause(("strategy_name", "symbol"), after)
+        cursor.execute(f"""
             SELECT
                 strategy_name, symbol, tier,
                 bt_trades,
                 ROUND(COALESCE(bt_win_rate,0)*100,1) AS bt_win_rate_pct,
                 bt_pnl_pct, bt_profit_factor
             FROM strategy_coin_performance
-            WHERE bt_trades IS NOT NULL AND bt_trades > 0
+            WHERE bt_trades IS NOT NULL AND bt_trades > 0 AND {after_sql}
             ORDER BY strategy_name, symbol
-        """)
-        for row in cursor.fetchall():
-            rows.append({
+            LIMIT ?
+        """, params + (-1 if limit is None else limit,))
+        for row in cursor:
+            yield (row['strategy_name'], row['symbol']), {
                 "strategy":        row['strategy_name'],
                 "symbol":          row['symbol'],
                 "trades":          0,
@@ -1313,13 +2703,32 @@ def api_coin_performance(conn):
                 "bt_win_rate_pct": float(row['bt_win_rate_pct'] or 0),
                 "bt_pnl_pct":      round(float(row['bt_pnl_pct']), 2) if row['bt_pnl_pct'] is not None else None,
                 "bt_profit_factor": round(float(row['bt_profit_factor']), 3) if row['bt_profit_factor'] is not None else None,
-            })
+            }
 
-    return jsonify({
+
+@app.route('/api/coin_performance')
+@streamable(coin_performance_rows, "rows", (str, str))
+@cache_response(ttl_seconds=30)
+@safe_query
+def api_coin_performance(conn):
+    """
+    Per-coin strategy performance from strategy_coin_eligibility (paper trading stats)
+    joined with strategy_coin_performance (backtest stats).
+    Returns rows sorted by strategy then symbol; ?limit=&after=<strategy,symbol> pages them.
+    """
+    try:
+        rows, next_after = read_page(coin_performance_rows, conn, (str, str))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = {
         "rows":      rows,
         "count":     len(rows),
         "timestamp": datetime.utcnow().isoformat() + "Z",
-    })
+    }
+    if is_paged():
+        body["next_after"] = next_after
+    return jsonify(body)
 
 
 @app.route('/api/top_pairs')
@@ -1432,55 +2841,49 @@ def api_leverage_tiers(conn):
     })
 
 
-@app.route('/api/leverage_pairs')
-@cache_response(ttl_seconds=30)
-@safe_query
-def api_leverage_pairs(conn):
+def leverage_pairs_rows(conn, after=None, limit=None, ranked=False):
     """
-    All pairs with leverage > 1x, ranked by leverage and FT profit factor.
-    Includes strategy, coin, leverage, FT metrics.
+    (strategy, symbol) → pair for every pair with leverage > 1x, with FT metrics.
+    Key order, or ranked by leverage and FT profit factor with ranked=True (no `after`).
     """
     cursor = conn.cursor()
     scp_cols = table_columns(conn, "strategy_coin_performance")
     if {"strategy_name", "symbol", "leverage"}.issubset(scp_cols):
-        cursor.execute("""
-            SELECT
-                strategy_name,
-                symbol,
-                leverage,
+        table, pf_col = "strategy_coin_performance", "ft_profit_factor"
+        columns = """
                 ROUND(ft_profit_factor, 3)                 AS ft_pf,
                 ROUND(COALESCE(ft_win_rate, 0) * 100, 1)  AS ft_wr_pct,
                 COALESCE(ft_trades, 0)                     AS ft_trades,
-                ROUND(COALESCE(ft_pnl_pct, 0), 2)          AS ft_pnl_pct
-            FROM strategy_coin_performance
-            WHERE leverage > 1
-            ORDER BY leverage DESC, ft_profit_factor DESC
-        """)
+                ROUND(COALESCE(ft_pnl_pct, 0), 2)          AS ft_pnl_pct"""
     else:
         sce_cols = table_columns(conn, "strategy_coin_eligibility")
         if not {"strategy_name", "symbol", "leverage"}.issubset(sce_cols):
-            return jsonify({"pairs": [], "count": 0, "timestamp": datetime.utcnow().isoformat() + "Z"})
+            return
         trade_col = "ft_trade_count" if "ft_trade_count" in sce_cols else ("ft_trades" if "ft_trades" in sce_cols else "0")
         wr_col = "ft_win_rate" if "ft_win_rate" in sce_cols else "win_rate"
         pnl_col = "ft_pnl_pct" if "ft_pnl_pct" in sce_cols else "sum_pnl_pct"
         pf_col = "ft_profit_factor" if "ft_profit_factor" in sce_cols else "NULL"
-        cursor.execute(f"""
-            SELECT
-                strategy_name,
-                symbol,
-                leverage,
+        table = "strategy_coin_eligibility"
+        columns = f"""
                 ROUND({pf_col}, 3)                         AS ft_pf,
                 ROUND(COALESCE({wr_col}, 0) * 100, 1)      AS ft_wr_pct,
                 COALESCE({trade_col}, 0)                   AS ft_trades,
-                ROUND(COALESCE({pnl_col}, 0), 2)           AS ft_pnl_pct
-            FROM strategy_coin_eligibility
-            WHERE leverage > 1
-            ORDER BY leverage DESC, {pf_col} DESC
-        """)
+                ROUND(COALESCE({pnl_col}, 0), 2)           AS ft_pnl_pct"""
 
-    pairs = []
-    for row in cursor.fetchall():
-        pairs.append({
+    after_sql, params = keyset_clause(("strategy_name", "symbol"), after)
+    order = f"leverage DESC, {pf_col} DESC" if ranked else "strategy_name, symbol"
+    cursor.execute(f"""
+        SELECT
+            strategy_name,
+            symbol,
+            leverage,{columns}
+        FROM {table}
+        WHERE leverage > 1 AND {after_sql}
+        ORDER BY {order}
+        LIMIT ?
+    """, params + (-1 if limit is None else limit,))
+    for row in cursor:
+        yield (row['strategy_name'], row['symbol']), {
             "strategy":    row['strategy_name'],
             "symbol":      row['symbol'],
             "leverage":    int(row['leverage']),
@@ -1488,26 +2891,43 @@ def api_leverage_pairs(conn):
             "ft_wr_pct":   float(row['ft_wr_pct'] or 0),
             "ft_trades":   int(row['ft_trades'] or 0),
             "ft_pnl_pct":  float(row['ft_pnl_pct'] or 0),
-        })
+        }
 
-    return jsonify({
+
+@app.route('/api/leverage_pairs')
+@streamable(leverage_pairs_rows, "pairs", (str, str))
+@cache_response(ttl_seconds=30)
+@safe_query
+def api_leverage_pairs(conn):
+    """
+    All pairs with leverage > 1x, ranked by leverage and FT profit factor.
+    Includes strategy, coin, leverage, FT metrics.
+    ?limit=&after=<strategy,symbol> pages them in strategy/symbol order instead.
+    """
+    try:
+        pairs, next_after = read_page(leverage_pairs_rows, conn, (str, str), ranked=not is_paged())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = {
         "pairs":     pairs,
         "count":     len(pairs),
         "timestamp": datetime.utcnow().isoformat() + "Z",
-    })
+    }
+    if is_paged():
+        body["next_after"] = next_after
+    return jsonify(body)
 
 
-@app.route('/api/leverage_trades')
-@cache_response(ttl_seconds=15)
-@safe_query
-def api_leverage_trades(conn):
-    """
-    Recent paper trades with leverage > 1x (last 100 trades).
-    """
+def leverage_trades_rows(conn, after=None, limit=None):
+    """(opened_ts_ms, id) → paper trade with leverage > 1x, newest first."""
+    after_sql, params = keyset_clause(("opened_ts_ms", "id"), after, op="<")
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT
+            id,
             symbol,
+            opened_ts_ms,
             opened_ts_iso,
             leverage_used,
             entry_price,
@@ -1516,15 +2936,14 @@ def api_leverage_trades(conn):
             pnl_pct,
             ROUND(exit_price, 4) as exit_price
         FROM paper_trades
-        WHERE leverage_used > 1
-        ORDER BY opened_ts_ms DESC
-        LIMIT 100
-    """)
+        WHERE leverage_used > 1 AND {after_sql}
+        ORDER BY opened_ts_ms DESC, id DESC
+        LIMIT ?
+    """, params + (-1 if limit is None else limit,))
 
-    trades = []
-    for row in cursor.fetchall():
+    for row in cursor:
         pnl_pct = float(row['pnl_pct']) if row['pnl_pct'] is not None else None
-        trades.append({
+        yield (row['opened_ts_ms'], row['id']), {
             "symbol":       row['symbol'],
             "opened_ts":    row['opened_ts_iso'],
             "leverage":     int(row['leverage_used']),
@@ -1533,15 +2952,235 @@ def api_leverage_trades(conn):
             "qty":          float(row['qty']),
             "status":       row['status'],
             "pnl_pct":      pnl_pct,
-        })
+        }
+
+
+@app.route('/api/leverage_trades')
+@streamable(leverage_trades_rows, "trades", (int, int))
+@cache_response(ttl_seconds=15)
+@safe_query
+def api_leverage_trades(conn):
+    """
+    Recent paper trades with leverage > 1x (last 100 trades).
+    Older trades: ?limit=&after=<opened_ts_ms,id> from the previous page's next_after.
+    """
+    try:
+        trades, next_after = read_page(leverage_trades_rows, conn, (int, int), default_limit=100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     return jsonify({
-        "trades":    trades,
-        "count":     len(trades),
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "trades":     trades,
+        "count":      len(trades),
+        "next_after": next_after,
+        "timestamp":  datetime.utcnow().isoformat() + "Z",
     })
 
 
+# ── Server push (/api/stream) ────────────────────────────────────────────────
+# One refresher thread computes each dashboard panel at its own cadence (through
+# the same cached views the polling endpoints use) while anyone is subscribed,
+# and bumps a global version when a panel's content changes. Subscribers are
+# sent every panel newer than the last version they saw, so a slow client just
+# skips intermediate states and a reconnecting EventSource resumes from its
+# Last-Event-ID. N open tabs cost the same DB work as one.
+
+STREAM_PANELS = {                 # panel → (path, refresh seconds)
+    "summary": ("/api/summary", 5),
+    "leverage_trades": ("/api/leverage_trades", 15),
+    "advanced_metrics": ("/api/advanced_metrics", 20),
+    "registry": ("/api/registry", 30),
+    "ml_models": ("/api/ml_models", 30),
+    "coin_performance": ("/api/coin_performance", 30),
+    "top_pairs": ("/api/top_pairs", 30),
+    "leverage_tiers": ("/api/leverage_tiers", 30),
+    "leverage_pairs": ("/api/leverage_pairs", 30),
+}
+STREAM_KEEPALIVE_S = 15
+STREAM_IDLE_STOP_S = 60           # refresher exits after this long with no subscribers
+
+_stream_boot = format(int(time.time()), "x")   # event ids are "<boot>-<version>": resume only within one process
+_stream_cond = threading.Condition()
+_stream_panels = {}               # panel → {"version", "data", "digest", "updated_at"}
+_stream_version = 0
+_stream_subscribers = 0
+_stream_thread = None
+_stream_stats = {"computes": 0, "changes": 0, "errors": 0, "events_sent": 0, "connections": 0}
+
+
+def _panel_digest(body):
+    """Content hash ignoring the per-response `timestamp` field."""
+    try:
+        data = json.loads(body)
+        if isinstance(data, dict):
+            data.pop("timestamp", None)
+        body = json.dumps(data, sort_keys=True).encode()
+    except ValueError:
+        pass
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def _stream_compute(name, path):
+    global _stream_version
+    with app.test_request_context(path):
+        resp = app.full_dispatch_request()
+    _stream_stats["computes"] += 1
+    if resp.status_code >= 400:
+        _stream_stats["errors"] += 1
+        return False
+    body = resp.get_data()
+    digest = _panel_digest(body)
+    with _stream_cond:
+        current = _stream_panels.get(name)
+        if current is not None and current["digest"] == digest:
+            return False
+        _stream_version += 1
+        _stream_panels[name] = {"version": _stream_version, "data": body.decode().strip(), "digest": digest,
+                                "updated_at": time.time()}
+        _stream_stats["changes"] += 1
+        _stream_cond.notify_all()
+    return True
+
+
+def _stream_refresher():
+    global _stream_thread
+    due = dict.fromkeys(STREAM_PANELS, 0.0)
+    idle_since = None
+    while True:
+        with _stream_cond:
+            if _stream_subscribers == 0:
+                idle_since = idle_since or time.time()
+                if time.time() - idle_since > STREAM_IDLE_STOP_S:
+                    _stream_thread = None
+                    return
+            else:
+                idle_since = None
+        if idle_since is None:
+            for name, (path, every) in STREAM_PANELS.items():
+                if time.time() >= due[name]:
+                    due[name] = time.time() + every
+                    try:
+                        _stream_compute(name, path)
+                    except Exception as e:
+                        _stream_stats["errors"] += 1
+                        print(f"Stream refresh failed for {name}: {e}")
+        time.sleep(0.5)
+
+
+def _parse_event_id(value):
+    """Version from a "<boot>-<version>" event id; 0 (send everything) if absent or from another process."""
+    boot, _, version = (value or "").partition("-")
+    if boot != _stream_boot or not version.isdigit():
+        return 0
+    return int(version)
+
+
+@app.route('/api/stream')
+def api_stream():
+    """SSE: one `event: <panel>` per changed panel (data = that endpoint's JSON). Resumes via Last-Event-ID."""
+    since = _parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    wanted = set(request.args.get('panels', '').split(',')) - {''} or set(STREAM_PANELS)
+
+    def events():
+        global _stream_subscribers, _stream_thread
+        with _stream_cond:
+            _stream_subscribers += 1
+            _stream_stats["connections"] += 1
+            if _stream_thread is None:
+                _stream_thread = threading.Thread(target=_stream_refresher, daemon=True, name="stream-refresher")
+                _stream_thread.start()
+        last = since
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                with _stream_cond:
+                    pending = [(p["version"], n, p["data"]) for n, p in _stream_panels.items()
+                               if p["version"] > last and n in wanted]
+                    if not pending:
+                        _stream_cond.wait(STREAM_KEEPALIVE_S)
+                        pending = [(p["version"], n, p["data"]) for n, p in _stream_panels.items()
+                                   if p["version"] > last and n in wanted]
+                if not pending:
+                    yield ": keepalive\n\n"
+                    continue
+                for version, name, data in sorted(pending):
+                    yield f"id: {_stream_boot}-{version}\nevent: {name}\ndata: {data}\n\n"
+                    last = max(last, version)
+                _stream_stats["events_sent"] += len(pending)
+        finally:
+            with _stream_cond:
+                _stream_subscribers -= 1
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/_stream')
+def api_stream_stats():
+    """Server-push counters: subscribers, panel versions, computes vs. changes."""
+    with _stream_cond:
+        return jsonify(dict(_stream_stats, subscribers=_stream_subscribers, version=_stream_version,
+                            panels={n: {"version": p["version"], "updated_at": p["updated_at"], "bytes": len(p["data"])}
+                                    for n, p in _stream_panels.items()}))
+
+
+@app.route('/api/_cache')
+def api_cache_stats():
+    """Response cache counters: per-endpoint hits, stale hits, misses, coalesced waits, compute times."""
+    return jsonify(response_cache_stats())
+
+
+@app.route('/api/_live')
+def api_live_counters():
+    """Raw live-tailer state: window counts, totals and rowid watermarks per table."""
+    try:
+        live = _live.snapshot()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"tables": live, "updated_at": _live.updated_at, "error": _live.error})
+
+
+@app.route('/api/_pool')
+def api_pool_stats():
+    """Read-only connection pool counters."""
+    return jsonify(_db_pool.snapshot())
+
+
+@app.route('/api/_profile')
+def api_profile():
+    """SQL profiler report. ?sample=<0..1> sets the sampling rate, ?reset=1 clears the aggregates."""
+    sample = request.args.get("sample", type=float)
+    if sample is not None:
+        _profiler.sample = min(max(sample, 0.0), 1.0)
+    if request.args.get("reset"):
+        _profiler.reset()
+    return jsonify(_profiler.report(top=request.args.get("top", 50, type=int)))
+
+
+@app.route('/api/_reports')
+def api_report_index_stats():
+    """Daily report index: newest file, body size, rebuilds vs. hits."""
+    return jsonify(_report_index.snapshot())
+
+
+@app.route('/api/_rollups')
+@safe_query
+def api_rollup_stats(conn):
+    """Rollup watermarks and counters; ?check=1 compares them against the raw tables."""
+    _score_rollups.refresh(conn)
+    _latest_backtests.refresh(conn)
+    out = {"path": str(_score_rollups.path or ROLLUP_DB_PATH), "watermark": _score_rollups.watermark(),
+           "caught_up": _score_rollups.caught_up, **_score_rollups.stats,
+           "backtest_latest": {"watermark": _latest_backtests.watermark(), **_latest_backtests.stats},
+           "optimizer": {"rowid": _latest_optimizer.rowid, "ts_iso": _latest_optimizer.ts_iso,
+                         **_latest_optimizer.stats}}
+    if request.args.get("check"):
+        hours = request.args.get("hours", type=int)
+        out["check"] = _score_rollups.check(conn, hours=hours)
+        out["backtest_latest"]["check"] = _latest_backtests.check(conn)
+    return jsonify(out)
+
+
 @app.route('/health')
 def health():
     """Health check endpoint."""
@@ -1554,7 +3193,17 @@ def health():
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in ("--rebuild-rollups", "--check-rollups"):
+        src = get_db_connection()
+        if sys.argv[1] == "--rebuild-rollups":
+            print(f"Rebuilt {ROLLUP_DB_PATH}: {_score_rollups.rebuild(src)} strategy_scores rows, "
+                  f"{_latest_backtests.rebuild(src)} strategy_backtest_results rows")
+        result = {"strategy_scores": _score_rollups.check(src), "backtest_latest": _latest_backtests.check(src)}
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if any(r["mismatches"] for r in result.values()) else 0)
     print(f"Starting Blofin Dashboard Server on http://localhost:8892")
     print(f"Database: {DB_PATH}")
     print(f"Dashboard: http://localhost:8892/blofin-dashboard.html")
-    app.run(host='0.0.0.0', port=8892, debug=False)
+    _live.ensure_started()
+    _score_rollups.start_catch_up()
+    app.run(host='0.0.0.0', port=8892, debug=False, threaded=True)
@@ -0,0 +1,83 @@
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import LatestBacktests, LatestOptimizerRun
+
+
+def _insert_results(conn, n, rnd, day="2026-09"):
+    conn.executemany("""
+        INSERT INTO strategy_backtest_results (strategy, symbol, win_rate, sharpe_ratio, max_drawdown_pct,
+                                               total_pnl_pct, total_trades, ts_iso, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'done')
+    """, [(rnd.choice("abcde"), rnd.choice(["BTC-USDT", "ETH-USDT", None]), rnd.random(), rnd.random(),
+           rnd.random(), rnd.uniform(-5, 5), rnd.randint(1, 99),
+           f"{day}-{rnd.randint(1, 28):02d}T{rnd.randint(0, 23):02d}:00:00") for _ in range(n)])
+
+
+@pytest.fixture
+def src():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE strategy_backtest_results (
+            id INTEGER PRIMARY KEY, strategy TEXT, symbol TEXT, win_rate REAL, sharpe_ratio REAL,
+            max_drawdown_pct REAL, total_pnl_pct REAL, total_trades INTEGER, ts_iso TEXT, status TEXT
+        );
+        CREATE TABLE optimizer_runs (id INTEGER PRIMARY KEY, ts_iso TEXT, raw_json TEXT);
+    """)
+    _insert_results(conn, 2000, random.Random(3))
+    return conn
+
+
+def _first_per_strategy(conn):
+    out = {}
+    for row in conn.execute("SELECT strategy, ts_iso, total_pnl_pct FROM strategy_backtest_results "
+                            "ORDER BY ts_iso DESC, rowid DESC"):
+        out.setdefault(row["strategy"], tuple(row))
+    return out
+
+
+def test_by_strategy_matches_full_scan(src, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "ROLLUP_BATCH", 300)
+    latest = LatestBacktests(tmp_path / "rollups.db")
+    assert latest.refresh(src) == 2000
+    got = {r["strategy"]: (r["strategy"], r["ts_iso"], r["total_pnl_pct"]) for r in latest.by_strategy()}
+    assert got == _first_per_strategy(src)
+    assert latest.check(src)["mismatches"] == []
+
+
+def test_new_rows_replace_older_results_only(src, tmp_path):
+    latest = LatestBacktests(tmp_path / "rollups.db")
+    latest.refresh(src)
+    _insert_results(src, 50, random.Random(4), day="2026-08")   # older than everything kept
+    _insert_results(src, 50, random.Random(5), day="2026-10")
+    assert latest.refresh(src, force=True) == 100
+    got = {r["strategy"]: (r["strategy"], r["ts_iso"], r["total_pnl_pct"]) for r in latest.by_strategy()}
+    assert got == _first_per_strategy(src)
+    assert latest.check(src)["mismatches"] == []
+
+
+def test_optimizer_run_is_parsed_once(src):
+    opt = LatestOptimizerRun()
+    assert opt.get(src) is None
+    src.execute("INSERT INTO optimizer_runs (ts_iso, raw_json) VALUES ('2026-10-02', ?)",
+                (json.dumps({"run": 2}),))
+    src.execute("INSERT INTO optimizer_runs (ts_iso, raw_json) VALUES ('2026-10-01', ?)",
+                (json.dumps({"run": 1}),))
+    assert opt.get(src) == {"run": 2}
+    assert opt.get(src) == {"run": 2}
+    assert opt.stats["parses"] == 1
+    src.execute("INSERT INTO optimizer_runs (ts_iso, raw_json) VALUES ('2026-09-30', ?)",
+                (json.dumps({"run": 0}),))
+    assert opt.get(src) == {"run": 2}
+    src.execute("INSERT INTO optimizer_runs (ts_iso, raw_json) VALUES ('2026-10-03', 'not json')")
+    assert opt.get(src) is None
+    assert opt.stats == {"parses": 2, "parse_errors": 1}
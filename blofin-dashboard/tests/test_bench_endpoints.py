@@ -0,0 +1,60 @@
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import bench_endpoints
+import gen_synthetic_db
+import server
+
+
+@pytest.fixture
+def synthetic_dir(tmp_path, monkeypatch):
+    gen_synthetic_db.generate(tmp_path, ticks=20_000, strategies=12, symbols=5, scores=2_000,
+                              paper_trades=500, days=3)
+    # bench_endpoints repoints the server module; restore it (and its per-DB state) afterwards
+    for name in ("DATA_DIR", "DB_PATH", "REPORTS_DIR", "STRATEGIES_DIR", "ROLLUP_DB_PATH",
+                 "get_db_connection", "_strategy_files_cache"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    monkeypatch.setattr(server, "_db_pool", server.ReadPool())
+    monkeypatch.setattr(server, "_score_rollups", server.ScoreRollups())
+    monkeypatch.setattr(server, "_latest_backtests", server.LatestBacktests())
+    monkeypatch.setattr(server, "_latest_optimizer", server.LatestOptimizerRun())
+    monkeypatch.setattr(server, "_report_index", server.ReportIndex())
+    monkeypatch.setattr(server, "_live", server.LiveCounters())
+    yield tmp_path
+    server.clear_response_cache()
+
+
+def test_generator_is_deterministic(tmp_path):
+    a = gen_synthetic_db.generate(tmp_path / "a", ticks=1000, strategies=4, symbols=3, scores=100,
+                                  paper_trades=50, days=2, seed=5)
+    b = gen_synthetic_db.generate(tmp_path / "b", ticks=1000, strategies=4, symbols=3, scores=100,
+                                  paper_trades=50, days=2, seed=5)
+    query = "SELECT symbol, price, volume FROM ticks ORDER BY id"
+    assert sqlite3.connect(a).execute(query).fetchall() == sqlite3.connect(b).execute(query).fetchall()
+
+
+def test_every_endpoint_serves_the_synthetic_schema(synthetic_dir):
+    results = bench_endpoints.run(synthetic_dir, iterations=2, cold_iterations=1)
+    assert "/api/coin_performance" in results and "/api/registry" in results
+    assert {path: r["status"] for path, r in results.items() if r["status"] != 200} == {}
+    r = results["/api/coin_performance"]
+    assert r["statements"] >= 1 and r["rows_returned"] >= 12 * 5   # one row per strategy/symbol pair
+    assert r["cold"]["n"] == 1 and r["warm"]["n"] == 2
+    assert set(r["warm"]) >= {"p50", "p95", "p99"}
+    assert r["peak_kb"] > 0
+    json.dumps(results)
+
+
+def test_compare_flags_p95_regressions():
+    baseline = {"endpoints": {"/api/a": {"warm": {"p95": 10.0}, "cold": {"p95": 20.0}},
+                              "/api/b": {"warm": {"p95": 0.2}, "cold": {"p95": 0.3}}}}
+    results = {"/api/a": {"warm": {"p95": 15.0}, "cold": {"p95": 21.0}},
+               "/api/b": {"warm": {"p95": 0.9}, "cold": {"p95": 0.3}}}   # 4.5x, but under the 1 ms floor
+    regs = bench_endpoints.compare(results, baseline, tolerance=1.3)
+    assert [(r["endpoint"], r["mode"]) for r in regs] == [("/api/a", "warm")]
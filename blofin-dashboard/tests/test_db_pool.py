@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import ReadPool
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "blofin_monitor.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY, symbol TEXT)")
+    conn.execute("INSERT INTO signals (symbol) VALUES ('BTC-USDT')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(server, "DB_PATH", path)
+    return path
+
+
+def test_connections_are_reused(db):
+    pool = ReadPool(size=2)
+    first = pool.acquire()
+    pool.release(first)
+    again = pool.acquire()
+    assert again is first
+    pool.release(again)
+    stats = pool.snapshot()
+    assert stats["created"] == 1 and stats["reused"] == 1 and stats["in_use"] == 0
+
+
+def test_connections_are_read_only(db):
+    pool = ReadPool(size=1)
+    conn = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO signals (symbol) VALUES ('ETH-USDT')")
+    assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 1
+    pool.release(conn, check=True)
+    assert pool.snapshot()["idle"] == 1
+
+
+def test_pool_is_bounded(db, monkeypatch):
+    monkeypatch.setattr(server, "DB_POOL_WAIT_S", 0.05)
+    pool = ReadPool(size=1)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.snapshot()["timeouts"] == 1
+
+
+def test_replaced_file_is_reopened(db, monkeypatch):
+    monkeypatch.setattr(server, "DB_POOL_CHECK_S", -1)   # health-check on every reuse
+    pool = ReadPool(size=1)
+    conn = pool.acquire()
+    pool.release(conn)
+    replacement = db.with_name("new.db")
+    new = sqlite3.connect(replacement)
+    new.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY, symbol TEXT)")
+    new.commit()
+    new.close()
+    os.replace(replacement, db)
+    fresh = pool.acquire()
+    assert fresh is not conn
+    assert fresh.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 0
+    assert pool.snapshot()["discarded"] == 1
@@ -0,0 +1,131 @@
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import _TableTail
+
+NOW = 1_780_000_000
+
+
+def _iso(epoch):
+    return datetime.utcfromtimestamp(epoch).isoformat()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE ticks (id INTEGER PRIMARY KEY, ts_iso TEXT, price REAL)")
+    conn.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY, ts_iso TEXT, signal TEXT)")
+    # 2h of history: one tick per second, one signal every 10s
+    conn.executemany("INSERT INTO ticks (ts_iso, price) VALUES (?, 1.0)",
+                     [(_iso(t),) for t in range(NOW - 7200, NOW)])
+    conn.executemany("INSERT INTO signals (ts_iso, signal) VALUES (?, ?)",
+                     [(_iso(t), "BUY" if t % 20 else "SELL") for t in range(NOW - 7200, NOW, 10)])
+    return conn
+
+
+def test_rebuild_reads_only_the_last_hour(conn):
+    tail = _TableTail("ticks")
+    tail.rebuild(conn, NOW)
+    snap = tail.snapshot(NOW)
+    # same boundary as `ts_iso > now - window`
+    assert snap["counts"] == {"10s": 9, "30s": 29, "60s": 59, "1h": 3599}
+    assert snap["last_ts_iso"] == _iso(NOW - 1)
+    assert len(tail.buckets) == 3599
+
+
+def test_tail_reads_new_rows_and_keeps_running_total(conn):
+    tail = _TableTail("signals", kind_col="signal", count_total=True)
+    tail.rebuild(conn, NOW)
+    tail.count_rows(conn)
+    assert tail.total == 720
+    conn.executemany("INSERT INTO signals (ts_iso, signal) VALUES (?, 'BUY')",
+                     [(_iso(NOW + i),) for i in range(5)])
+    assert tail.tail(conn, NOW + 5) == 5
+    snap = tail.snapshot(NOW + 5)
+    assert snap["total"] == 725
+    assert snap["counts"]["10s"] == 5
+    expected = conn.execute("SELECT signal, COUNT(*) FROM signals WHERE ts_iso >= ? GROUP BY signal",
+                            (_iso(NOW + 5 - 3600 + 1),)).fetchall()
+    assert snap["by_signal_1h"] == dict(expected)
+    assert tail.tail(conn, NOW + 6) == 0
+
+
+def test_old_buckets_are_dropped(conn):
+    tail = _TableTail("ticks")
+    tail.rebuild(conn, NOW)
+    tail.tail(conn, NOW + 1800)
+    assert min(tail.buckets) > NOW + 1800 - 3600
+    assert tail.snapshot(NOW + 1800)["counts"]["1h"] == 1799
+
+
+def test_empty_table(conn):
+    conn.execute("DELETE FROM ticks")
+    tail = _TableTail("ticks")
+    tail.rebuild(conn, NOW)
+    assert tail.snapshot(NOW)["counts"]["1h"] == 0
+    conn.execute("INSERT INTO ticks (ts_iso, price) VALUES (?, 1.0)", (_iso(NOW),))
+    tail.tail(conn, NOW)
+    assert tail.snapshot(NOW)["counts"]["10s"] == 1
+
+
+class _NotReady:
+    def snapshot(self, wait=5.0):
+        assert wait == 0
+        raise RuntimeError("live counters not ready")
+
+
+def test_summary_falls_back_to_sql_until_the_tailer_is_ready(tmp_path, monkeypatch):
+    path = tmp_path / "blofin_monitor.db"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE ticks (id INTEGER PRIMARY KEY, ts_iso TEXT)")
+    db.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY, ts_ms INTEGER, ts_iso TEXT, symbol TEXT, "
+               "signal TEXT, strategy TEXT, confidence REAL, price REAL)")
+    db.execute("CREATE TABLE paper_trades (id INTEGER PRIMARY KEY, opened_ts_iso TEXT, closed_ts_iso TEXT, "
+               "symbol TEXT, side TEXT, entry_price REAL, exit_price REAL, status TEXT, pnl_pct REAL)")
+    db.execute("CREATE TABLE service_heartbeats (id INTEGER PRIMARY KEY, service TEXT, ts_ms INTEGER, ts_iso TEXT)")
+    now = datetime.utcnow()
+    db.executemany("INSERT INTO ticks (ts_iso) VALUES (?)",
+                   [((now - timedelta(seconds=s)).isoformat(),) for s in (2, 5, 20, 100)])
+    db.executemany("INSERT INTO signals (ts_iso, signal) VALUES (?, ?)",
+                   [((now - timedelta(minutes=m)).isoformat(), sig) for m, sig in ((1, "BUY"), (5, "SELL"), (90, "BUY"))])
+    db.commit()
+    db.close()
+    monkeypatch.setattr(server, "DB_PATH", path)
+    monkeypatch.setattr(server, "_db_pool", server.ReadPool(size=1))
+    monkeypatch.setattr(server, "_live", _NotReady())
+    server.clear_response_cache()
+
+    resp = server.app.test_client().get("/api/summary")
+    server.clear_response_cache()
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["signals_count"] == 3
+    assert body["signals_1h_by_type"] == {"BUY": 1, "SELL": 1}
+    assert body["live_status"]["ticks_10s"] == 2 and body["live_status"]["ticks_30s"] == 3
+
+    resp = server.app.test_client().get("/api/live-data")
+    server.clear_response_cache()
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["ticks_10s"] == 2 and body["signals_1m"] == 0 and body["is_flowing"]   # newest signal is 1m old
+    assert body["last_tick_iso"] == (now - timedelta(seconds=2)).isoformat()
+
+
+def test_stale_snapshot_is_not_served(monkeypatch):
+    live = server.LiveCounters()
+    monkeypatch.setattr(live, "ensure_started", lambda: None)
+    live._snapshot = {"ticks": {"counts": {"10s": 9}}}
+    live.updated_at = server.time.time()
+    assert live.snapshot(wait=0) is live._snapshot
+    # the tailer has been failing since: frozen window counts must not read as live
+    live.updated_at -= server.LIVE_STALE_S + 1
+    live.error = "disk I/O error"
+    with pytest.raises(RuntimeError, match="disk I/O error"):
+        live.snapshot(wait=0)
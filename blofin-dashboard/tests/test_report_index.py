@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server import ReportIndex, app
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE daily_reports (id INTEGER PRIMARY KEY, date TEXT, full_report_json TEXT, summary TEXT)")
+    conn.executemany("INSERT INTO daily_reports (date, full_report_json, summary) VALUES (?, ?, ?)",
+                     [(f"2026-10-{d:02d}", json.dumps({"day": d, "notes": "x" * 200}), f"day {d}")
+                      for d in range(1, 11)])
+    return conn
+
+
+@pytest.fixture
+def reports(tmp_path):
+    (tmp_path / "2026-10-09.json").write_text(json.dumps({"day": 9}))
+    (tmp_path / "2026-10-10.json").write_text(json.dumps({"day": 10}))
+    (tmp_path / "optimizer_results_2026-10-11.json").write_text("{}")
+    return tmp_path
+
+
+def _get(index, conn, headers=None):
+    with app.test_request_context("/api/reports", headers=headers or {}):
+        return index.response(conn)
+
+
+def test_body_is_built_once_and_matches_layout(conn, reports):
+    index = ReportIndex(reports)
+    body = _get(index, conn).get_json()
+    assert body["latest_report"] == {"day": 10}
+    assert [r["date"] for r in body["recent_reports"]] == [f"2026-10-{d:02d}" for d in range(10, 3, -1)]
+    assert body["recent_reports"][0]["data"]["day"] == 10
+    assert body["timestamp"].endswith("Z")
+    _get(index, conn)
+    assert index.stats["builds"] == 1 and index.stats["hits"] == 1 and index.stats["dir_scans"] == 1
+
+
+def test_rebuilds_on_new_file_or_row(conn, reports):
+    index = ReportIndex(reports)
+    _get(index, conn)
+    (reports / "2026-10-11.json").write_text(json.dumps({"day": 11}))
+    os.utime(reports, ns=(0, 1))   # directory mtime resolution is coarse on some filesystems
+    assert _get(index, conn).get_json()["latest_report"] == {"day": 11}
+    conn.execute("INSERT INTO daily_reports (date, full_report_json, summary) VALUES ('2026-10-11', '{}', 'new')")
+    assert _get(index, conn).get_json()["recent_reports"][0]["summary"] == "new"
+    assert index.stats["builds"] == 3
+
+
+def test_gzip_body_decodes_to_plain_body(conn, reports):
+    index = ReportIndex(reports)
+    plain = _get(index, conn).get_json()
+    resp = _get(index, conn, headers={"Accept-Encoding": "gzip, deflate"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    decoded = json.loads(gzip.decompress(resp.get_data()))
+    assert decoded["recent_reports"] == plain["recent_reports"]
+    assert decoded["latest_report"] == plain["latest_report"]
+
+
+def test_missing_reports_dir(conn, tmp_path):
+    body = _get(ReportIndex(tmp_path / "missing"), conn).get_json()
+    assert body["latest_report"] is None
+    assert len(body["recent_reports"]) == 7
@@ -0,0 +1,118 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from flask import jsonify
+from werkzeug.datastructures import MultiDict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import app, cache_key, cache_response
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    server._response_cache.clear()
+    server._cache_stats.clear()
+    server._cache_inflight.clear()
+    server._cache_bytes = 0
+    yield
+
+
+def _call(view, path="/x", query_string=None):
+    with app.test_request_context(path, query_string=query_string):
+        return view()
+
+
+def test_cache_key_normalizes_args():
+    a = cache_key("ep", MultiDict([("b", "2"), ("a", "1"), ("_", "123")]))
+    b = cache_key("ep", MultiDict([("a", "1"), ("b", "2")]))
+    c = cache_key("ep", MultiDict([("a", "1"), ("b", "3")]))
+    assert a == b
+    assert a != c
+
+
+def test_query_args_get_separate_entries():
+    @cache_response(ttl_seconds=60)
+    def view_args():
+        from flask import request
+        return jsonify({"days": request.args.get("days")})
+
+    assert _call(view_args, query_string={"days": "7"}).get_json() == {"days": "7"}
+    assert _call(view_args, query_string={"days": "30"}).get_json() == {"days": "30"}
+    hit = _call(view_args, query_string={"days": "7"})
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.get_json() == {"days": "7"}
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    @cache_response(ttl_seconds=60)
+    def view_slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return jsonify({"n": len(calls)})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_call(view_slow).get_json())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"n": 1}] * 8
+    st = server.response_cache_stats()["endpoints"]["view_slow"]
+    assert st["misses"] == 1 and st["coalesced"] == 7
+
+
+def test_expired_entry_is_served_while_refreshing():
+    calls = []
+
+    @cache_response(ttl_seconds=0.05)
+    def view_stale():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    assert _call(view_stale).get_json() == {"n": 1}
+    time.sleep(0.06)
+    stale = _call(view_stale)
+    assert stale.headers["X-Cache"] == "STALE"
+    assert stale.get_json() == {"n": 1}
+    for _ in range(50):
+        if len(calls) == 2 and not server._cache_inflight:
+            break
+        time.sleep(0.01)
+    assert _call(view_stale).get_json() == {"n": 2}
+
+
+def test_errors_are_not_cached():
+    calls = []
+
+    @cache_response(ttl_seconds=60)
+    def view_error():
+        calls.append(1)
+        return jsonify({"error": "db"}), 500
+
+    assert _call(view_error).status_code == 500
+    assert _call(view_error).status_code == 500
+    assert len(calls) == 2
+
+
+def test_lru_bound(monkeypatch):
+    monkeypatch.setattr(server, "CACHE_MAX_ENTRIES", 2)
+
+    @cache_response(ttl_seconds=60)
+    def view_lru():
+        from flask import request
+        return jsonify({"k": request.args.get("k")})
+
+    for k in ("a", "b", "c"):
+        _call(view_lru, query_string={"k": k})
+    stats = server.response_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["endpoints"]["view_lru"]["evictions"] == 1
+    assert _call(view_lru, query_string={"k": "a"}).headers["X-Cache"] == "MISS"
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "blofin_monitor.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE strategy_coin_eligibility (
+        strategy_name TEXT, symbol TEXT, total_trades INTEGER, wins INTEGER, win_rate REAL, avg_pnl_pct REAL,
+        sum_pnl_pct REAL, status TEXT, reason TEXT, leverage INTEGER, PRIMARY KEY (strategy_name, symbol))""")
+    conn.execute("""CREATE TABLE paper_trades (
+        id INTEGER PRIMARY KEY, symbol TEXT, opened_ts_ms INTEGER, opened_ts_iso TEXT, leverage_used INTEGER,
+        entry_price REAL, exit_price REAL, qty REAL, status TEXT, pnl_pct REAL)""")
+    conn.executemany("INSERT INTO strategy_coin_eligibility VALUES (?, ?, 10, 6, 0.6, 0.1, 1.0, 'active', '', ?)",
+                     [(f"strat_{s:02d}", f"SYM{c}-USDT", 1 + (s + c) % 3) for s in range(12) for c in range(5)])
+    # two trades share each opened_ts_ms, so pages must break ties on id
+    conn.executemany("INSERT INTO paper_trades VALUES (?, 'BTC-USDT', ?, '', 3, 100.0, NULL, 1.0, 'OPEN', NULL)",
+                     [(i, 1_000_000 + i // 2) for i in range(1, 251)])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(server, "DB_PATH", path)
+    monkeypatch.setattr(server, "_db_pool", server.ReadPool(size=2))
+    server.clear_response_cache()
+    yield server.app.test_client()
+    server.clear_response_cache()
+
+
+def _walk(client, path, limit):
+    rows, after, pages = [], None, 0
+    while True:
+        query = {"limit": limit} if after is None else {"limit": limit, "after": after}
+        body = client.get(path, query_string=query).get_json()
+        rows += body.get("rows") or body.get("pairs") or body.get("trades")
+        pages += 1
+        after = body["next_after"]
+        if after is None:
+            return rows, pages
+
+
+def test_pages_cover_the_unpaged_rows(client):
+    full = client.get("/api/coin_performance").get_json()
+    assert full["count"] == 60 and "next_after" not in full
+    rows, pages = _walk(client, "/api/coin_performance", 7)
+    assert rows == full["rows"] and pages == 9
+
+
+def test_leverage_trades_keyset_breaks_ties_on_id(client):
+    first = client.get("/api/leverage_trades").get_json()
+    assert first["count"] == 100 and first["next_after"] == "1000075,151"
+    rows, _ = _walk(client, "/api/leverage_trades", 40)
+    assert len(rows) == 250 and rows[:100] == first["trades"]
+
+
+def test_paged_leverage_pairs_use_key_order(client):
+    ranked = client.get("/api/leverage_pairs").get_json()["pairs"]
+    assert [p["leverage"] for p in ranked] == sorted((p["leverage"] for p in ranked), reverse=True)
+    rows, _ = _walk(client, "/api/leverage_pairs", 25)
+    assert [(p["strategy"], p["symbol"]) for p in rows] == sorted((p["strategy"], p["symbol"]) for p in ranked)
+
+
+def test_ndjson_stream_matches_the_list(client):
+    full = client.get("/api/coin_performance").get_json()["rows"]
+    resp = client.get("/api/coin_performance?stream=ndjson")
+    assert resp.mimetype == "application/x-ndjson" and "X-Cache" not in resp.headers
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert lines[:-1] == full
+    assert lines[-1]["count"] == 60 and lines[-1]["next_after"] is None
+    assert server._db_pool.snapshot()["in_use"] == 0
+
+
+def test_json_stream_page(client):
+    body = client.get("/api/coin_performance?stream=json&limit=5&after=strat_03,SYM4-USDT").get_json()
+    assert [r["strategy"] for r in body["rows"]] == ["strat_04"] * 5
+    assert body["count"] == 5 and body["next_after"] == "strat_04,SYM4-USDT"
+
+
+def test_bad_page_args(client):
+    assert client.get("/api/leverage_trades?after=abc").status_code == 400
+    assert client.get("/api/coin_performance?limit=0").status_code == 400
+    assert client.get("/api/coin_performance?stream=csv").status_code == 400
+
+
+def test_stream_reads_in_keyset_windows(client, monkeypatch):
+    monkeypatch.setattr(server, "STREAM_WINDOW_ROWS", 7)
+    paged, _ = _walk(client, "/api/leverage_trades", 250)
+    lines = client.get("/api/leverage_trades?stream=ndjson").get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines[:-1]] == paged
+    body = client.get("/api/leverage_trades?stream=json&limit=20").get_json()
+    assert body["trades"] == paged[:20] and body["next_after"] == "1000115,231"
+
+
+def test_streams_use_their_own_connections_and_are_capped(client, monkeypatch):
+    slots = server.threading.BoundedSemaphore(1)
+    monkeypatch.setattr(server, "_stream_slots", slots)
+    streaming = client.get("/api/coin_performance?stream=ndjson")
+    assert client.get("/api/coin_performance?stream=ndjson").status_code == 503
+    assert len(streaming.get_data(as_text=True).splitlines()) == 61
+    assert server._db_pool.snapshot()["created"] == 0
+    streaming.close()    # the WSGI server does this when the download ends
+    assert slots.acquire(blocking=False)
@@ -0,0 +1,155 @@
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import ScoreRollups
+
+STRATEGIES = ["momentum", "breakout", "vwap_reversion"]
+
+
+def _insert_scores(conn, n, start, rnd):
+    rows = []
+    for i in range(n):
+        ts = start + timedelta(minutes=7 * i)
+        rows.append((
+            ts.isoformat(), rnd.choice(STRATEGIES), rnd.uniform(0, 100),
+            rnd.uniform(0.3, 0.7) if i % 5 else None, rnd.uniform(-1, 3), rnd.uniform(-1, 1),
+            rnd.uniform(-20, 40), rnd.uniform(0, 25), rnd.randint(0, 60),
+        ))
+    conn.executemany("""
+        INSERT INTO strategy_scores (ts_iso, strategy, score, win_rate, sharpe_ratio,
+                                     avg_pnl_pct, total_pnl_pct, max_drawdown_pct, trades)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+@pytest.fixture
+def src():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE strategy_scores (
+            id INTEGER PRIMARY KEY, ts_iso TEXT, strategy TEXT, score REAL, win_rate REAL,
+            sharpe_ratio REAL, avg_pnl_pct REAL, total_pnl_pct REAL, max_drawdown_pct REAL, trades INTEGER
+        )
+    """)
+    _insert_scores(conn, 3000, datetime.utcnow() - timedelta(days=12), random.Random(7))
+    return conn
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    return ScoreRollups(tmp_path / "rollups.db")
+
+
+def test_windows_match_raw_aggregates(src, rollups):
+    assert rollups.refresh(src) == 3000
+    since = ScoreRollups.since_hour(7 * 24)
+    raw = {r["strategy"]: r for r in src.execute("""
+        SELECT strategy, COUNT(*) AS n, MAX(score) AS best, AVG(win_rate) AS wr, AVG(trades) AS trades,
+               SUM(avg_pnl_pct * trades) / NULLIF(SUM(trades), 0) AS weighted
+        FROM strategy_scores WHERE replace(substr(ts_iso, 1, 13), ' ', 'T') >= ? GROUP BY strategy
+    """, (since,))}
+    rolled = {r["strategy"]: r for r in rollups.by_strategy(hours=7 * 24)}
+    assert set(rolled) == set(raw)
+    for name, r in rolled.items():
+        assert r["score_count"] == raw[name]["n"]
+        assert r["best_score"] == raw[name]["best"]
+        assert r["avg_win_rate"] == pytest.approx(raw[name]["wr"])
+        assert r["avg_trades"] == pytest.approx(raw[name]["trades"])
+        assert r["trade_weighted_pnl"] == pytest.approx(raw[name]["weighted"])
+    assert rollups.check(src, hours=24)["mismatches"] == []
+
+
+def test_refresh_applies_only_new_rows(src, rollups):
+    rollups.refresh(src)
+    assert rollups.refresh(src, force=True) == 0
+    _insert_scores(src, 40, datetime.utcnow() - timedelta(hours=3), random.Random(8))
+    assert rollups.refresh(src, force=True) == 40
+    assert rollups.watermark() == src.execute("SELECT MAX(rowid) FROM strategy_scores").fetchone()[0]
+    assert rollups.check(src)["mismatches"] == []
+
+
+def test_batches_and_rebuild(src, rollups, monkeypatch):
+    monkeypatch.setattr(server, "ROLLUP_BATCH", 128)
+    rollups.refresh(src)
+    assert rollups.check(src)["mismatches"] == []
+    # a row rewritten in place is invisible to the watermark until a rebuild
+    src.execute("UPDATE strategy_scores SET score = 1000 WHERE id = 1")
+    assert rollups.check(src)["mismatches"]
+    assert rollups.rebuild(src) == 3000
+    assert rollups.check(src)["mismatches"] == []
+
+
+def _rows(rows):
+    return {r["strategy"]: dict(r) for r in rows}
+
+
+def test_all_time_window_matches_unfiltered_aggregate(src, rollups):
+    # rows without a timestamp still belong to the all-time numbers, as they did before rollups
+    src.execute("UPDATE strategy_scores SET ts_iso = NULL WHERE id % 97 = 0")
+    old = {r["strategy"]: r for r in src.execute("""
+        SELECT strategy, AVG(win_rate) AS wr, AVG(sharpe_ratio) AS sharpe, AVG(max_drawdown_pct) AS dd,
+               AVG(avg_pnl_pct) AS pnl, SUM(trades) AS trades, MAX(ts_iso) AS last, COUNT(*) AS n,
+               MAX(score) AS best, SUM(avg_pnl_pct * trades) / NULLIF(SUM(trades), 0) AS weighted
+        FROM strategy_scores GROUP BY strategy
+    """)}
+    cold = _rows(ScoreRollups(rollups.path).by_strategy(order_by="strategy", src=src))
+    rollups.refresh(src)
+    assert rollups.caught_up
+    rolled = _rows(rollups.by_strategy(order_by="strategy", src=src))
+    for got in (rolled, cold):
+        assert set(got) == set(old)
+        for name, r in got.items():
+            assert r["score_count"] == old[name]["n"] and r["last_update"] == old[name]["last"]
+            assert r["best_score"] == old[name]["best"]
+            assert r["total_trades"] == pytest.approx(old[name]["trades"])
+            for col, key in (("avg_win_rate", "wr"), ("avg_sharpe", "sharpe"), ("avg_drawdown", "dd"),
+                             ("avg_pnl", "pnl"), ("trade_weighted_pnl", "weighted")):
+                assert r[col] == pytest.approx(old[name][key])
+    assert rollups.overall()["score_count"] == 3000
+    week = rollups.overall(hours=7 * 24)["score_count"]
+    assert week == ScoreRollups(rollups.path).overall(hours=7 * 24, src=src)["score_count"] < 3000
+    assert rollups.check(src)["mismatches"] == []
+    assert rollups.check(src, hours=24)["mismatches"] == []
+
+
+def test_large_backlog_is_caught_up_in_background(tmp_path, monkeypatch):
+    path = tmp_path / "blofin_monitor.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE strategy_scores (
+            id INTEGER PRIMARY KEY, ts_iso TEXT, strategy TEXT, score REAL, win_rate REAL,
+            sharpe_ratio REAL, avg_pnl_pct REAL, total_pnl_pct REAL, max_drawdown_pct REAL, trades INTEGER
+        )
+    """)
+    _insert_scores(conn, 3000, datetime.utcnow() - timedelta(days=12), random.Random(9))
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(server, "DB_PATH", path)
+    monkeypatch.setattr(server, "ROLLUP_INLINE_ROWS", 100)
+    monkeypatch.setattr(server, "ROLLUP_BATCH", 256)
+    rollups = ScoreRollups(tmp_path / "rollups.db")
+
+    with rollups._lock:        # hold the fold back so the request path is observed mid catch-up
+        assert rollups.refresh(conn) == 0
+        assert not rollups.caught_up
+        raw = _rows(rollups.by_strategy(hours=7 * 24, src=conn))
+    for _ in range(200):
+        if not rollups._catching_up:
+            break
+        time.sleep(0.025)
+    assert rollups.caught_up and rollups.watermark() == 3000 and rollups.stats["catch_ups"] == 1
+    rolled = _rows(rollups.by_strategy(hours=7 * 24, src=conn))
+    assert set(rolled) == set(raw)
+    for name, r in rolled.items():
+        assert r == pytest.approx(raw[name])
+    assert rollups.check(conn)["mismatches"] == []
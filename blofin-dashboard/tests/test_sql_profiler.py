@@ -0,0 +1,81 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import SqlProfiler, normalize_sql
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE paper_trades (id INTEGER PRIMARY KEY, status TEXT, pnl_pct REAL)")
+    conn.execute("CREATE TABLE ticks (id INTEGER PRIMARY KEY, symbol TEXT, ts_iso TEXT)")
+    conn.execute("CREATE INDEX idx_ticks_symbol ON ticks(symbol)")
+    conn.executemany("INSERT INTO paper_trades (status, pnl_pct) VALUES (?, ?)",
+                     [("CLOSED" if i % 3 else "OPEN", i * 0.1) for i in range(300)])
+    return conn
+
+
+def test_normalize_sql():
+    sql = """SELECT *  FROM t
+             WHERE a = 'x''y' AND b > 10.5 AND c IN (?, ?, ?) AND ts > datetime('now', '-1 hour')"""
+    assert normalize_sql(sql) == ("SELECT * FROM t WHERE a = ? AND b > ? AND c IN (?...) "
+                                  "AND ts > datetime(?, ?)")
+    assert normalize_sql("SELECT col1 FROM t2 LIMIT 5") == "SELECT col1 FROM t2 LIMIT ?"
+
+
+def test_unsampled_requests_get_the_plain_connection(conn):
+    assert SqlProfiler(sample=0).begin(conn, "view") is None
+
+
+def test_statements_rows_and_endpoints_are_recorded(conn, monkeypatch):
+    monkeypatch.setattr(server, "SQL_PROFILE_SLOW_MS", 0.0)
+    prof = SqlProfiler(sample=1)
+    for limit in (5, 7):
+        p = prof.begin(conn, "api_trades")
+        cur = p.cursor()
+        cur.execute("SELECT * FROM paper_trades WHERE status = 'CLOSED' LIMIT ?", (limit,))
+        assert len(cur.fetchall()) == limit
+        assert sum(1 for _ in p.execute("SELECT * FROM ticks WHERE symbol = ?", ("BTC",))) == 0
+        prof.end(p)
+
+    report = prof.report()
+    ep = report["endpoints"]["api_trades"]
+    assert ep["requests"] == 2 and ep["statements"] == 4 and ep["rows"] == 12
+    assert sum(ep["histogram"].values()) == 2
+    by_sql = {s["sql"]: s for s in report["statements"]}
+    trades = by_sql["SELECT * FROM paper_trades WHERE status = ? LIMIT ?"]
+    assert trades["calls"] == 2 and trades["rows"] == 12 and trades["endpoints"] == ["api_trades"]
+    assert trades["plan"] == ["SCAN paper_trades"]
+    assert any("USING INDEX idx_ticks_symbol" in d for d in by_sql["SELECT * FROM ticks WHERE symbol = ?"]["plan"])
+    assert len(report["slow"]) == 4
+
+    hints = report["index_hints"]
+    assert [h["table"] for h in hints if "table" in h] == ["paper_trades"]
+    assert hints[0]["suggest"] == "CREATE INDEX idx_paper_trades_status ON paper_trades(status)"
+
+
+def test_safe_query_profiles_sampled_requests(conn, monkeypatch):
+    monkeypatch.setattr(server, "_profiler", SqlProfiler(sample=1))
+
+    class _Pool:
+        def acquire(self):
+            return conn
+
+        def release(self, c, check=False):
+            pass
+
+    monkeypatch.setattr(server, "_db_pool", _Pool())
+
+    @server.safe_query
+    def view_count(c):
+        return c.execute("SELECT COUNT(*) FROM paper_trades").fetchone()[0]
+
+    assert view_count() == 300
+    assert server._profiler.report()["endpoints"]["view_count"]["rows"] == 1
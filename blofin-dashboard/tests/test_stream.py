@@ -0,0 +1,55 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import server
+from server import _panel_digest, _parse_event_id, _stream_compute
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "blofin_monitor.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE strategy_coin_eligibility (strategy_name TEXT, symbol TEXT, leverage INTEGER)")
+    conn.execute("INSERT INTO strategy_coin_eligibility VALUES ('s1', 'BTC-USDT', 3)")
+    conn.commit()
+    monkeypatch.setattr(server, "DB_PATH", path)
+    monkeypatch.setattr(server, "_db_pool", server.ReadPool())
+    server._response_cache.clear()
+    server._stream_panels.clear()
+    yield conn
+    conn.close()
+
+
+def test_digest_ignores_timestamp():
+    a = _panel_digest(b'{"rows": [1, 2], "timestamp": "2026-01-01T00:00:00Z"}')
+    b = _panel_digest(b'{"timestamp": "2026-01-01T00:00:05Z", "rows": [1, 2]}')
+    c = _panel_digest(b'{"rows": [1, 3], "timestamp": "2026-01-01T00:00:05Z"}')
+    assert a == b
+    assert a != c
+
+
+def test_event_ids_resume_only_within_this_process():
+    assert _parse_event_id(f"{server._stream_boot}-42") == 42
+    assert _parse_event_id("deadbeef-42") == 0
+    assert _parse_event_id(None) == 0
+    assert _parse_event_id("garbage") == 0
+
+
+def test_version_bumps_only_when_panel_changes(db):
+    assert _stream_compute("leverage_tiers", "/api/leverage_tiers") is True
+    first = server._stream_panels["leverage_tiers"]["version"]
+    server._response_cache.clear()
+    assert _stream_compute("leverage_tiers", "/api/leverage_tiers") is False
+    assert server._stream_panels["leverage_tiers"]["version"] == first
+
+    db.execute("INSERT INTO strategy_coin_eligibility VALUES ('s2', 'ETH-USDT', 5)")
+    db.commit()
+    server._response_cache.clear()
+    assert _stream_compute("leverage_tiers", "/api/leverage_tiers") is True
+    assert server._stream_panels["leverage_tiers"]["version"] > first
+    assert '"5":1' in server._stream_panels["leverage_tiers"]["data"]
@@ -4,19 +4,20 @@ Port: 8892
 """
 
 import asyncio
-import json
 import logging
+import math
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-import httpx
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 import span
 import enphase
+from broadcast import Broadcaster, negotiate
+from recorder import RECORD_INTERVAL_S, FLUSH_INTERVAL_S, RETENTION_DAYS, Recorder
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger(__name__)
@@ -25,8 +26,12 @@ log = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     asyncio.create_task(push_loop())
+    asyncio.create_task(flush_loop())
     log.info("Jarvis Home Energy OS started on port 8892")
     yield
+    await asyncio.to_thread(_recorder.finish_rollover)
+    await asyncio.to_thread(_recorder.flush)
+    await asyncio.gather(span.aclose(), enphase.aclose())
 
 
 app = FastAPI(title="Jarvis Home Energy OS", lifespan=lifespan)
@@ -40,17 +45,36 @@ _state: dict = {}
 _state_ts: float = 0.0
 CACHE_TTL = 2.0  # seconds
 
-# Active WebSocket connections
-_connections: set[WebSocket] = set()
+# Active WebSocket connections (each with its own bounded send queue)
+_connections = Broadcaster()
 
+# Time-series history (daily columnar segments under data/history/)
+_recorder = Recorder()
 
-async def fetch_state() -> dict:
-    """Fetch all device data and return unified state dict."""
-    now = time.time()
-    global _state, _state_ts
-    if now - _state_ts < CACHE_TTL and _state:
-        return _state
 
+# Per-source deadlines for one refresh — a slow device only costs its own slot
+SOURCE_TIMEOUTS = {"span_panel": 1.5, "span_circuits": 1.5, "enphase": 2.5}
+
+# Single-flight: concurrent callers share one in-progress refresh
+_refresh_task: asyncio.Task | None = None
+
+
+async def _timed(name: str, coro):
+    """Await one source under its deadline. Returns (result, error, elapsed_ms)."""
+    t0 = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coro, SOURCE_TIMEOUTS[name])
+        return result, None, round((time.perf_counter() - t0) * 1000, 1)
+    except asyncio.TimeoutError:
+        return None, f"timed out after {SOURCE_TIMEOUTS[name]}s", round((time.perf_counter() - t0) * 1000, 1)
+    except Exception as e:
+        return None, str(e) or type(e).__name__, round((time.perf_counter() - t0) * 1000, 1)
+
+
+async def _refresh_state() -> dict:
+    """Fetch all sources concurrently and build the unified state dict (partial on failures)."""
+    global _state, _state_ts
+    now = time.time()
     state: dict = {
         "ts": int(now),
         "grid": {},
@@ -58,11 +82,23 @@ async def fetch_state() -> dict:
         "circuits": [],
         "panel": {},
         "errors": [],
+        "sources": {},
+    }
+
+    (panel_data, panel_err, panel_ms), (circuits_data, circuits_err, circuits_ms), (prod, prod_err, prod_ms) = \
+        await asyncio.gather(
+            _timed("span_panel", span.get_panel()),
+            _timed("span_circuits", span.get_circuits()),
+            _timed("enphase", enphase.get_production()),
+        )
+    state["sources"] = {
+        "span_panel": {"ok": panel_err is None, "ms": panel_ms},
+        "span_circuits": {"ok": circuits_err is None, "ms": circuits_ms},
+        "enphase": {"ok": prod_err is None, "ms": prod_ms},
     }
 
     # --- SPAN Panel ---
-    try:
-        panel_data = await span.get_panel()
+    if panel_err is None:
         grid_w = panel_data.get("instantGridPowerW", 0)
         state["grid"] = {
             "watts": round(grid_w, 1),
@@ -74,13 +110,12 @@ async def fetch_state() -> dict:
             "dsm_state": panel_data.get("dsmState", "UNKNOWN"),
             "run_config": panel_data.get("currentRunConfig", "UNKNOWN"),
         }
-    except Exception as e:
-        log.warning(f"SPAN panel error: {e}")
-        state["errors"].append(f"SPAN panel: {e}")
+    else:
+        log.warning(f"SPAN panel error: {panel_err}")
+        state["errors"].append(f"SPAN panel: {panel_err}")
 
     # --- SPAN Circuits ---
-    try:
-        circuits_data = await span.get_circuits()
+    if circuits_err is None:
         raw = circuits_data.get("circuits", {})
         circuits = []
         for cid, c in raw.items():
@@ -98,29 +133,45 @@ async def fetch_state() -> dict:
         # Sort by watts descending
         circuits.sort(key=lambda x: -x["watts"])
         state["circuits"] = circuits
-    except Exception as e:
-        log.warning(f"SPAN circuits error: {e}")
-        state["errors"].append(f"SPAN circuits: {e}")
+    else:
+        log.warning(f"SPAN circuits error: {circuits_err}")
+        state["errors"].append(f"SPAN circuits: {circuits_err}")
 
     # --- Enphase Solar ---
-    try:
-        prod = await enphase.get_production()
+    if prod_err is None:
         state["solar"] = {
             "watts_now": prod.get("wattsNow", 0),
             "wh_today": prod.get("wattHoursToday", 0),
             "wh_lifetime": prod.get("wattHoursLifetime", 0),
             "available": True,
         }
-    except Exception as e:
-        log.warning(f"Enphase error: {e}")
+    else:
+        log.warning(f"Enphase error: {prod_err}")
         state["solar"] = {"watts_now": 0, "wh_today": 0, "available": False}
-        state["errors"].append(f"Enphase: {e}")
+        state["errors"].append(f"Enphase: {prod_err}")
 
     _state = state
-    _state_ts = now
+    _state_ts = time.time()  # TTL runs from when the data arrived
+    try:
+        _recorder.record(state)
+        if _recorder.rollover_pending:   # writing a whole day + pruning must not block the loop
+            await asyncio.to_thread(_recorder.finish_rollover)
+    except Exception as e:
+        log.warning(f"History record error: {e}")
     return state
 
 
+async def fetch_state(force: bool = False) -> dict:
+    """Return the unified state, refreshing it if older than CACHE_TTL (or forced)."""
+    global _refresh_task
+    if not force and _state and time.time() - _state_ts < CACHE_TTL:
+        return _state
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_state())
+    # shield: one caller disconnecting must not cancel the refresh the others await
+    return await asyncio.shield(_refresh_task)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard():
     index = STATIC_DIR / "index.html"
@@ -138,43 +189,81 @@ async def health():
     return {"status": "ok", "ts": int(time.time())}
 
 
+@app.get("/api/history")
+async def api_history(hours: float = 24, points: int = 300, series: str = "grid,solar",
+                      start: int | None = None, end: int | None = None):
+    """
+    Downsampled history: ?hours=168&points=300&series=grid,solar,circuits
+    (or explicit start/end epoch seconds). Returns per-bucket mean and max.
+    Ranges are clamped to the last RETENTION_DAYS before `end`.
+    """
+    now = int(time.time())
+    if end is None:
+        end = now
+    if start is None:
+        if not (math.isfinite(hours) and hours > 0):
+            return JSONResponse({"error": "hours must be a positive number"}, status_code=400)
+        start = int(end - min(hours, RETENTION_DAYS * 24) * 3600)
+    if not 0 <= start < end <= now + 86400:
+        return JSONResponse({"error": "start must be before end, and end no later than tomorrow"},
+                            status_code=400)
+    start = max(start, end - RETENTION_DAYS * 86400)
+    names = [s.strip() for s in series.split(",") if s.strip()]
+    return JSONResponse(await asyncio.to_thread(_recorder.history, start, end, points, names))
+
+
+@app.get("/api/ws-stats")
+async def ws_stats():
+    """Per-connection queue depth, drops and send lag."""
+    return _connections.stats()
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
-    await ws.accept()
-    _connections.add(ws)
-    log.info(f"WS connected ({len(_connections)} total)")
+    # Encoding: ?enc=msgpack or Sec-WebSocket-Protocol: msgpack (JSON otherwise)
+    enc = negotiate(ws)
+    offered = [p.strip() for p in ws.headers.get("sec-websocket-protocol", "").split(",")]
+    await ws.accept(subprotocol=enc if enc in offered else None)
+    _connections.add(ws, enc)
+    log.info(f"WS connected ({len(_connections)} total, {enc})")
     try:
         # Send initial state immediately
-        state = await fetch_state()
-        await ws.send_text(json.dumps(state))
+        _connections.send_to(ws, await fetch_state())
         # Keep alive — state is pushed by the background task
         while True:
             await ws.receive_text()  # client heartbeats
     except WebSocketDisconnect:
         pass
     finally:
-        _connections.discard(ws)
+        _connections.remove(ws)
         log.info(f"WS disconnected ({len(_connections)} total)")
 
 
+async def flush_loop():
+    """Background task: persist today's history segment every FLUSH_INTERVAL_S."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_S)
+        try:
+            await asyncio.to_thread(_recorder.flush)
+        except Exception as e:
+            log.warning(f"History flush error: {e}")
+
+
 async def push_loop():
-    """Background task: fetch state every 2s and push to all WS clients."""
+    """Background task: fetch state every 2s and queue it for all WS clients if it changed."""
     while True:
         await asyncio.sleep(2)
-        if not _connections:
+        if not len(_connections):
+            # Nobody watching — still refresh at the recorder's cadence so history has no gaps
+            if time.time() - _state_ts >= RECORD_INTERVAL_S:
+                try:
+                    await fetch_state(force=True)
+                except Exception as e:
+                    log.warning(f"Push loop error: {e}")
             continue
         try:
-            global _state_ts
-            _state_ts = 0  # force refresh
-            state = await fetch_state()
-            msg = json.dumps(state)
-            dead = set()
-            for ws in list(_connections):
-                try:
-                    await ws.send_text(msg)
-                except Exception:
-                    dead.add(ws)
-            _connections.difference_update(dead)
+            state = await fetch_state(force=True)
+            _connections.publish(state)
         except Exception as e:
             log.warning(f"Push loop error: {e}")
 
@@ -0,0 +1,152 @@
+"""WebSocket state broadcaster — per-client bounded queues, concurrent sends."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from fastapi import WebSocket
+
+try:
+    import msgpack
+except ImportError:  # optional: clients fall back to JSON
+    msgpack = None
+
+log = logging.getLogger(__name__)
+
+QUEUE_MAX = 4          # states buffered per client; oldest is dropped beyond this
+SEND_TIMEOUT = 5.0     # a send stuck this long means the client is gone
+IDLE_RESEND_S = 30.0   # re-send an unchanged state this often so clients see we're alive
+
+# Fields that change every refresh without the data changing
+_VOLATILE_KEYS = ("ts", "sources")
+
+
+def supported_encodings() -> list[str]:
+    return ["json", "msgpack"] if msgpack else ["json"]
+
+
+def negotiate(ws: WebSocket) -> str:
+    """Pick the encoding from ?enc= or the Sec-WebSocket-Protocol offer; JSON by default."""
+    offered = [ws.query_params.get("enc", "")]
+    offered += [p.strip() for p in ws.headers.get("sec-websocket-protocol", "").split(",")]
+    for enc in offered:
+        if enc in supported_encodings():
+            return enc
+    return "json"
+
+
+def _encode(state: dict, enc: str):
+    if enc == "msgpack":
+        return msgpack.packb(state, use_bin_type=True)
+    return json.dumps(state, separators=(",", ":"))
+
+
+class _Client:
+    def __init__(self, ws: WebSocket, enc: str):
+        self.ws = ws
+        self.enc = enc
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX)
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.task: asyncio.Task | None = None
+
+    def offer(self, payload, produced_at: float):
+        if self.queue.full():
+            self.queue.get_nowait()  # drop-oldest: a lagging client skips ahead
+            self.dropped += 1
+        self.queue.put_nowait((payload, produced_at))
+
+    async def run(self, on_dead):
+        try:
+            while True:
+                payload, produced_at = await self.queue.get()
+                if isinstance(payload, bytes):
+                    await asyncio.wait_for(self.ws.send_bytes(payload), SEND_TIMEOUT)
+                else:
+                    await asyncio.wait_for(self.ws.send_text(payload), SEND_TIMEOUT)
+                self.sent += 1
+                self.last_lag_ms = round((time.time() - produced_at) * 1000, 1)
+                self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.info(f"WS send failed ({type(e).__name__}) — dropping client")
+            on_dead(self.ws)
+            try:
+                await asyncio.wait_for(self.ws.close(), 1.0)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "client": f"{self.ws.client.host}:{self.ws.client.port}" if self.ws.client else "?",
+            "encoding": self.enc,
+            "connected_s": round(time.time() - self.connected_at, 1),
+            "queued": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "last_lag_ms": self.last_lag_ms,
+            "max_lag_ms": self.max_lag_ms,
+        }
+
+
+class Broadcaster:
+    """Fan one state out to many sockets; each socket drains its own queue in its own task."""
+
+    def __init__(self):
+        self._clients: dict[WebSocket, _Client] = {}
+        self._last_digest = None
+        self._last_push = 0.0
+        self.pushes = 0
+        self.skipped_unchanged = 0
+
+    def __len__(self):
+        return len(self._clients)
+
+    def add(self, ws: WebSocket, enc: str = "json") -> _Client:
+        client = _Client(ws, enc)
+        client.task = asyncio.create_task(client.run(self.remove))
+        self._clients[ws] = client
+        return client
+
+    def remove(self, ws: WebSocket):
+        client = self._clients.pop(ws, None)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def send_to(self, ws: WebSocket, state: dict):
+        client = self._clients.get(ws)
+        if client:
+            client.offer(_encode(state, client.enc), time.time())
+
+    def publish(self, state: dict) -> bool:
+        """Queue `state` for every client unless it's unchanged since the last push. Returns True if sent."""
+        now = time.time()
+        digest = hashlib.blake2b(
+            json.dumps({k: v for k, v in state.items() if k not in _VOLATILE_KEYS},
+                       sort_keys=True, default=str).encode(), digest_size=16).digest()
+        if digest == self._last_digest and now - self._last_push < IDLE_RESEND_S:
+            self.skipped_unchanged += 1
+            return False
+        self._last_digest, self._last_push = digest, now
+        encoded = {}
+        for client in list(self._clients.values()):
+            if client.enc not in encoded:
+                encoded[client.enc] = _encode(state, client.enc)
+            client.offer(encoded[client.enc], now)
+        self.pushes += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._clients),
+            "encodings": supported_encodings(),
+            "pushes": self.pushes,
+            "skipped_unchanged": self.skipped_unchanged,
+            "clients": [c.stats() for c in self._clients.values()],
+        }
@@ -13,21 +13,42 @@ HEADERS = {"Authorization": f"Bearer {ENPHASE_TOKEN}"}
 BASE = f"https://{ENPHASE_IP}"
 TIMEOUT = 5.0
 
+# One long-lived client so the Envoy's TLS handshake happens once, not every poll
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BASE,
+            headers=HEADERS,
+            timeout=TIMEOUT,
+            verify=False,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=2, keepalive_expiry=60),
+        )
+    return _client
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def get_production() -> dict:
     """Returns wattsNow, wattHoursToday, wattHoursLifetime."""
-    async with httpx.AsyncClient(timeout=TIMEOUT, verify=False) as client:
-        r = await client.get(f"{BASE}/api/v1/production", headers=HEADERS)
-        r.raise_for_status()
-        return r.json()
+    r = await _get_client().get("/api/v1/production")
+    r.raise_for_status()
+    return r.json()
 
 
 async def get_meters() -> dict | None:
     """Returns meter readings (production/consumption channels)."""
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT, verify=False) as client:
-            r = await client.get(f"{BASE}/ivp/meters/readings", headers=HEADERS)
-            r.raise_for_status()
-            return r.json()
+        r = await _get_client().get("/ivp/meters/readings")
+        r.raise_for_status()
+        return r.json()
     except Exception:
         return None
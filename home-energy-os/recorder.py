@@ -0,0 +1,287 @@
+"""
+Telemetry recorder — grid, solar and per-circuit watts in daily columnar segments.
+
+Samples from fetch_state() are thinned to one per RECORD_INTERVAL_S and
+appended to today's in-memory segment: one array per column (ts as uint32,
+watts as float32). The open segment is flushed to data/history/YYYY-MM-DD.seg
+every FLUSH_INTERVAL_S and at day rollover (by finish_rollover(), off the
+event loop). On disk a segment is
+
+    b"HEOS1" | u32 header length | JSON header | zlib(column bytes, in header order)
+
+Closed segments are read back through a small LRU, and files older than
+RETENTION_DAYS are deleted, so memory is bounded by one open day plus
+SEGMENT_CACHE decoded days regardless of uptime.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data" / "history"
+RECORD_INTERVAL_S = 10
+FLUSH_INTERVAL_S = 300
+RETENTION_DAYS = 400
+SEGMENT_CACHE = 8
+MAX_POINTS = 2000
+
+_MAGIC = b"HEOS1"
+_BASE_COLUMNS = ("grid", "solar")
+
+
+def _day_start(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+class _Segment:
+    """One local day of samples, column-oriented."""
+
+    def __init__(self, day: date):
+        self.day = day
+        self.ts = array("I")
+        self.cols: dict[str, array] = {name: array("f") for name in _BASE_COLUMNS}
+        self.names: dict[str, str] = {}   # "circuit:<id>" → display name
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, ts: int, values: dict[str, float]):
+        n = len(self.ts)
+        self.ts.append(ts)
+        for key, v in values.items():
+            col = self.cols.get(key)
+            if col is None:
+                # circuit first seen mid-day: earlier samples read as 0 W
+                col = self.cols[key] = array("f", bytes(4 * n))
+            col.append(v)
+        for key, col in self.cols.items():
+            if len(col) == n:
+                col.append(0.0)
+
+    def encode(self) -> bytes:
+        keys = list(self.cols)
+        header = json.dumps({
+            "day": self.day.isoformat(), "count": len(self.ts), "columns": keys, "names": self.names,
+        }).encode()
+        body = self.ts.tobytes() + b"".join(self.cols[k].tobytes() for k in keys)
+        return _MAGIC + struct.pack("<I", len(header)) + header + zlib.compress(body, 6)
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "_Segment":
+        if not raw.startswith(_MAGIC):
+            raise ValueError("not a history segment")
+        (hlen,) = struct.unpack_from("<I", raw, len(_MAGIC))
+        off = len(_MAGIC) + 4
+        header = json.loads(raw[off:off + hlen])
+        body = zlib.decompress(raw[off + hlen:])
+        seg = cls(date.fromisoformat(header["day"]))
+        n = header["count"]
+        seg.ts = array("I", body[:4 * n])
+        pos = 4 * n
+        seg.cols = {}
+        for key in header["columns"]:
+            seg.cols[key] = array("f", body[pos:pos + 4 * n])
+            pos += 4 * n
+        seg.names = header.get("names", {})
+        return seg
+
+
+class Recorder:
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self._lock = threading.Lock()
+        self._open: _Segment | None = None
+        self._last_ts = 0
+        self._dirty = False
+        self._rolled: list[_Segment] = []   # closed days not yet written by finish_rollover()
+        self._cache: OrderedDict[date, _Segment] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _path(self, day: date) -> Path:
+        return self.data_dir / f"{day.isoformat()}.seg"
+
+    def _load(self, day: date) -> _Segment | None:
+        try:
+            return _Segment.decode(self._path(day).read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"History segment {day} unreadable: {e}")
+            return None
+
+    # ── Write side ───────────────────────────────────────────────────────────
+
+    def record(self, state: dict) -> bool:
+        """
+        Append one sample from a fetch_state() dict (thinned to RECORD_INTERVAL_S).
+        At day rollover the closed day is queued; call finish_rollover() from a
+        worker thread when rollover_pending is set.
+        """
+        ts = int(state.get("ts") or time.time())
+        if ts - self._last_ts < RECORD_INTERVAL_S:
+            return False
+        values = {
+            "grid": float((state.get("grid") or {}).get("watts", 0) or 0),
+            "solar": float((state.get("solar") or {}).get("watts_now", 0) or 0),
+        }
+        names = {}
+        for c in state.get("circuits") or ():
+            key = f"circuit:{c['id']}"
+            values[key] = float(c.get("watts", 0) or 0)
+            names[key] = c.get("name", c["id"])
+        day = datetime.fromtimestamp(ts).date()
+        with self._lock:
+            if self._open is None or self._open.day != day:
+                if self._open is not None and len(self._open):
+                    self._rolled.append(self._open)
+                self._open = self._load(day) or _Segment(day)
+            self._open.append(ts, values)
+            self._open.names.update(names)
+            self._last_ts = ts
+            self._dirty = True
+        return True
+
+    @property
+    def rollover_pending(self) -> bool:
+        return bool(self._rolled)
+
+    def finish_rollover(self):
+        """Write closed days queued by record() and prune old files (blocking; run in a worker thread)."""
+        with self._lock:
+            rolled = list(self._rolled)
+        if not rolled:
+            return
+        for seg in rolled:
+            self._write(seg)
+            with self._cache_lock:   # drop any copy decoded before the day was complete
+                self._cache.pop(seg.day, None)
+        with self._lock:
+            self._rolled = [seg for seg in self._rolled if seg not in rolled]
+        self._prune()
+
+    def _write(self, seg: _Segment):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(seg.day)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(seg.encode())
+        os.replace(tmp, path)
+
+    def flush(self):
+        """Persist the open segment if it changed (safe to call from a worker thread)."""
+        with self._lock:
+            if not self._dirty or self._open is None:
+                return
+            seg = _Segment(self._open.day)
+            seg.ts = array("I", self._open.ts)
+            seg.cols = {k: array("f", v) for k, v in self._open.cols.items()}
+            seg.names = dict(self._open.names)
+            self._dirty = False
+        self._write(seg)
+
+    def _prune(self):
+        cutoff = (date.today() - timedelta(days=RETENTION_DAYS)).isoformat()
+        for p in self.data_dir.glob("*.seg"):
+            if p.stem < cutoff:
+                p.unlink(missing_ok=True)
+
+    # ── Read side ────────────────────────────────────────────────────────────
+
+    def _segment(self, day: date) -> _Segment | None:
+        with self._lock:
+            if self._open is not None and self._open.day == day:
+                return self._open
+            for seg in self._rolled:
+                if seg.day == day:
+                    return seg
+        # history() runs in concurrent worker threads; the LRU is only touched under its lock
+        with self._cache_lock:
+            seg = self._cache.get(day)
+            if seg is not None:
+                self._cache.move_to_end(day)
+                return seg
+        seg = self._load(day)
+        if seg is not None:
+            with self._cache_lock:
+                self._cache[day] = seg
+                while len(self._cache) > SEGMENT_CACHE:
+                    self._cache.popitem(last=False)
+        return seg
+
+    def history(self, start: int, end: int, points: int = 300, series=None) -> dict:
+        """
+        Downsample [start, end) into `points` equal time buckets.
+        `series`: names like "grid", "solar", "circuit:<id>", or "circuits" for all
+        circuits; default grid + solar. Each series gets per-bucket mean and max
+        (None where a bucket has no samples).
+        """
+        points = max(1, min(int(points), MAX_POINTS))
+        span = max(1, end - start)
+        width = span / points
+        wanted = list(series or _BASE_COLUMNS)
+        all_circuits = "circuits" in wanted
+        wanted = [s for s in wanted if s != "circuits"]
+
+        sums: dict[str, list] = {}
+        maxes: dict[str, list] = {}
+        counts = [0] * points
+        names: dict[str, str] = {}
+        day = datetime.fromtimestamp(start).date()
+        last_day = datetime.fromtimestamp(end - 1).date()
+        while day <= last_day:
+            seg = self._segment(day)
+            day += timedelta(days=1)
+            if seg is None or not len(seg):
+                continue
+            with self._lock:  # the open segment may be appended to concurrently
+                ts = seg.ts[:]
+                keys = [k for k in seg.cols if k in wanted or (all_circuits and k.startswith("circuit:"))]
+                cols = {k: seg.cols[k][:len(ts)] for k in keys}
+                names.update({k: v for k, v in seg.names.items() if k in cols})
+            for k in keys:
+                sums.setdefault(k, [0.0] * points)
+                maxes.setdefault(k, [None] * points)
+            lo = bisect_left(ts, start)
+            hi = bisect_left(ts, end)
+            b = int((ts[lo] - start) // width) if lo < hi else points
+            while lo < hi and b < points:
+                b_end = start + (b + 1) * width
+                j = bisect_left(ts, b_end, lo, hi)
+                if j > lo:
+                    counts[b] += j - lo
+                    for k, col in cols.items():
+                        chunk = col[lo:j]
+                        sums[k][b] += sum(chunk)
+                        m = max(chunk)
+                        if maxes[k][b] is None or m > maxes[k][b]:
+                            maxes[k][b] = m
+                lo = j
+                if lo < hi:
+                    b = int((ts[lo] - start) // width)
+
+        out = {}
+        for k in sums:
+            out[k] = {
+                "name": names.get(k, k),
+                "mean": [round(s / n, 1) if n else None for s, n in zip(sums[k], counts)],
+                "max": [round(m, 1) if m is not None else None for m in maxes[k]],
+            }
+        return {
+            "start": start,
+            "end": end,
+            "points": points,
+            "bucket_s": round(width, 3),
+            "ts": [int(start + i * width) for i in range(points)],
+            "samples": counts,
+            "series": out,
+        }
@@ -13,16 +13,36 @@ HEADERS = {"Authorization": f"Bearer {SPAN_TOKEN}"}
 BASE = f"http://{SPAN_IP}/api/v1"
 TIMEOUT = 5.0
 
+# One long-lived keep-alive client for the panel (created on first use, inside the running loop)
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BASE,
+            headers=HEADERS,
+            timeout=TIMEOUT,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=30),
+        )
+    return _client
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def get_panel() -> dict:
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        r = await client.get(f"{BASE}/panel", headers=HEADERS)
-        r.raise_for_status()
-        return r.json()
+    r = await _get_client().get("/panel")
+    r.raise_for_status()
+    return r.json()
 
 
 async def get_circuits() -> dict:
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        r = await client.get(f"{BASE}/circuits", headers=HEADERS)
-        r.raise_for_status()
-        return r.json()
+    r = await _get_client().get("/circuits")
+    r.raise_for_status()
+    return r.json()
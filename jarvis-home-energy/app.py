@@ -4,11 +4,16 @@ Jarvis Home Energy OS — Unified Home Energy Dashboard
 Covers: SPAN Panel · Enphase Solar · Pentair Pool · Tesla Energy Gateway 3V · Tesla Wall Connector Gen 3
 """
 
+import atexit
+import hashlib
 import json
 import os
 import logging
+import signal
 import socket
+import sqlite3
 import ssl
+import sys
 import threading
 import time
 import uuid
@@ -22,8 +27,14 @@ import teslapy
 from flask import Flask, Response, jsonify, render_template_string, request, stream_with_context, make_response
 from energy_analytics import (
     init_db, log_telemetry, compute_hourly_aggregates, compute_daily_aggregates,
-    get_usage_patterns, calculate_powerwall_roi, get_recent_daily_trends
+    get_usage_patterns, calculate_powerwall_roi, get_recent_daily_trends,
+    cached_analytics, analytics_cache_stats, compare_tariffs, bump_aggregate_version, on_aggregate_version,
 )
+from tariff import PLANS as TARIFF_PLANS
+import energy_forecast
+import ring_history
+import state_records
+from state_records import CircuitTable, EnergyFlows, Summary
 
 logging.basicConfig(
     level=logging.INFO,
@@ -113,7 +124,15 @@ try:
 except ImportError:
     MYQ_EMAIL = ""; MYQ_PASSWORD = ""
 
+# Process role — "all" (single process, default), "ingest" (pollers + state bus
+# publisher, control API on JARVIS_CONTROL_PORT) or "web" (stateless worker
+# serving /api/*, SSE and frames from the bus). See serve.py.
+JARVIS_ROLE = os.environ.get("JARVIS_ROLE", "all")
+JARVIS_CONTROL_PORT = int(os.environ.get("JARVIS_CONTROL_PORT", "8794"))
+JARVIS_BUS_PREFIX = os.environ.get("JARVIS_BUS_PREFIX", "jarvis")
+
 app = Flask(__name__, static_folder='static', static_url_path='/static')
+app.json.default = state_records.json_default  # jsonify(_state) understands slot records
 
 # ── Shared State ──────────────────────────────────────────────────────────────
 _state_lock = threading.Lock()
@@ -122,25 +141,29 @@ _state = {
     "span": {"status": "unconfigured", "door": "?", "uptime": 0, "grid_power": 0, "circuits": [], "last_seen": 0},
     "enphase": {"status": "unconfigured", "production_w": 0, "consumption_w": 0, "net_w": 0, "firmware": "D8.3.5167", "last_seen": 0},
     "pentair": {"status": "offline", "pool": {}, "spa": {}, "pump": {}, "heater": {}, "circuits": [], "last_seen": 0},
-    "tesla": {"status": "unconfigured", "soe": 0, "solar_w": 0, "battery_w": 0, "grid_w": 0, "load_w": 0, "last_seen": 0},
+    "tesla": EnergyFlows(),  # slot records for the hot sections — updated in place every tick
     "wall_connector": {"status": "unconfigured", "vehicle_connected": False, "charging_w": 0, "session_energy_wh": 0, "grid_v": 0, "pcba_temp_c": 0, "last_seen": 0},
-    "summary": {"solar_w": 0, "load_w": 0, "battery_w": 0, "grid_w": 0, "net_savings_today": 0},
+    "summary": Summary(),
     "cameras": [],  # list of {name, mac, type, status, last_seen, last_motion, snapshot_path}
     "nest": {"status": "unconfigured", "temp_f": 0, "setpoint_f": 0, "mode": "off", "hvac_state": "idle", "humidity": 0, "last_seen": 0},
     "bhyve": {"status": "unconfigured", "devices": [], "zones": [], "last_seen": 0},
     "ge_appliances": {"status": "unconfigured", "appliances": [], "last_seen": 0},
     "myq": {"status": "unconfigured", "doors": [], "last_seen": 0},
     "roku": [],
+    "stale": {},  # section → snapshot time, for sections restored at startup and not yet re-polled
 }
 _sse_subscribers = []
 _sse_lock = threading.Lock()
+_state_bus = None       # StateBus when running as ingest/web role
+_state_version = 0      # last published (ingest) or applied (web) bus version
+_span_circuits = CircuitTable()  # owns the Circuit records in _state["span"]["circuits"]
 
 # Wyze — single cached client (login once, reuse across polls + snapshots)
 _wyze_client = None
 _wyze_client_lock = threading.Lock()
 _wyze_next_retry = 0   # epoch seconds — don't retry auth before this time
 _camera_poll_counter = 0  # throttle: refresh camera list every 60s (every 12 ticks at 5s)
-_ge_poll_counter = 0      # throttle: poll GE appliances every 30s
+_ge_poll_counter = 0      # throttle: list GE appliances every 15s (active) – 2min (idle)
 _telemetry_log_counter = 0  # throttle: log telemetry every 60s (every 12 ticks at 5s)
 _daily_agg_counter = 0    # throttle: compute daily aggregates every 24h (every 17280 ticks at 5s)
 
@@ -257,9 +280,7 @@ _ring_status = {
     "last_updated": None,
 }
 _ring_status_lock = threading.Lock()
-_ring_history_cache = []  # [{id, kind, created_at, answered, duration, ...}]
-_ring_history_lock = threading.Lock()
-_ring_history_last_update = 0
+# Ring event history lives in ring_history.db (ring_history.py) — see /api/ring/history
 # Global device ref exposed for live stream endpoint (set by _ring_event_poller)
 _ring_live_device = [None]
 _ring_live_loop   = [None]
@@ -410,9 +431,11 @@ def _ring_event_poller():
                 if device_id[0]:
                     hist = hloop.run_until_complete(_hloop_poll(device_id[0]))
 
-                    # Cache history
-                    with _ring_history_lock:
-                        _ring_history_cache[:] = hist[:30]  # Keep last 30 events
+                    # Persist anything new (ids already logged are skipped in memory)
+                    try:
+                        ring_history.record_events(hist)
+                    except Exception as exc:
+                        log.warning("Ring history write failed: %s", exc)
 
                     # Emit new events
                     for evt in hist:
@@ -463,6 +486,7 @@ def _ring_event_poller():
                     if hist:
                         last_evt_id[0] = str(hist[0].get('id', ''))
                         log.info("Ring event poller: seeded last_evt_id=%s", last_evt_id[0])
+                        ring_history.record_events(hist)
 
             # Poll active dings every 5s (real-time detection)
             if ring_ref[0] and device_id[0]:
@@ -584,21 +608,10 @@ def poll_span():
                 inner = circuits_raw.get("circuits", circuits_raw)
                 circuits_raw = list(inner.values()) if isinstance(inner, dict) else (inner or [])
 
-        circuits = []
-        for c in circuits_raw:
-            pwr = c.get("instantPowerW", 0)
-            circuits.append({
-                "id": c.get("id", ""),
-                "name": c.get("name", "?"),
-                "power_w": round(pwr, 0),
-                "relay": c.get("relayState", "?"),
-                "priority": c.get("priority", "?"),
-                "sheddable": c.get("is_sheddable", False),
-                "color": "green" if abs(pwr) < 200 else ("yellow" if abs(pwr) < 1500 else "red"),
-            })
-
         with _state_lock:
-            _state["span"] = {
+            # Circuit records are updated in place (no per-circuit dicts per tick)
+            circuits = _span_circuits.update_from_span(circuits_raw)
+            _state["span"].update({
                 "status": "online" if SPAN_TOKEN else "no_token",
                 "door": door,
                 "uptime": uptime,
@@ -607,7 +620,7 @@ def poll_span():
                 "solaredge_w": round(solaredge_w, 1), # branches 30+32 — SolarEdge SE5000H
                 "circuits": circuits,
                 "last_seen": time.time(),
-            }
+            })
         return True
     except Exception as e:
         log.warning("SPAN poll error: %s", e)
@@ -1032,20 +1045,19 @@ def poll_tesla():
             log.debug("Tesla site_info fetch error (non-fatal): %s", e_info)
 
         with _state_lock:
-            _state["tesla"] = {
-                "status": "online",
-                "soe": round(soe, 1),
-                "solar_w": round(solar_w, 0),
-                "battery_w": round(battery_w, 0),
-                "grid_w": round(grid_w, 0),
-                "load_w": round(load_w, 0),
-                "grid_state": grid_state,
-                "islanded": islanded,
-                "backup_reserve_percent": round(backup_reserve, 1),
-                "site_name": site_name,
-                "storm_mode_active": storm_mode_active,
-                "last_seen": time.time(),
-            }
+            t = _state["tesla"]
+            t.status = "online"
+            t.soe = round(soe, 1)
+            t.solar_w = round(solar_w, 0)
+            t.battery_w = round(battery_w, 0)
+            t.grid_w = round(grid_w, 0)
+            t.load_w = round(load_w, 0)
+            t.grid_state = grid_state
+            t.islanded = islanded
+            t.backup_reserve_percent = round(backup_reserve, 1)
+            t.site_name = site_name
+            t.storm_mode_active = storm_mode_active
+            t.last_seen = time.time()
         log.info("Tesla Fleet API poll OK — solar=%.0fW battery=%.0fW grid=%.0fW soe=%.1f%%",
                  solar_w, battery_w, grid_w, soe)
         return True
@@ -1070,9 +1082,9 @@ def _update_summary():
         # Prefer Tesla for energy flows (most complete source)
         # Fallback: SPAN grid_power is the real import/export; Enphase has solar production
         if tesla_online:
-            solar = t["solar_w"]
-            battery = t["battery_w"]
-            grid = t["grid_w"]   # True SRP total (SPAN + CT) — used for SRP Grid node
+            solar = t.solar_w
+            battery = t.battery_w
+            grid = t.grid_w   # True SRP total (SPAN + CT) — used for SRP Grid node
             span_grid = s.get("grid_power", 0)  # SPAN-only home circuits — used for Home Panel node
             load = span_grid  # Home Panel shows SPAN load, not Tesla total
         else:
@@ -1094,8 +1106,11 @@ def _update_summary():
         total_solar_w = enphase_solar_w + solaredge_solar_w
 
         # SPAN home consumption: abs sum of consuming circuits (power_w < -10W)
-        span_circuits = s.get('circuits', [])
-        span_home_w = abs(sum(c.get('power_w', 0) for c in span_circuits if (c.get('power_w', 0) or 0) < -10))
+        span_home_w = 0
+        for c in s.get('circuits', ()):
+            pw = c.power_w or 0
+            if pw < -10:
+                span_home_w -= pw
 
         wc = _state["wall_connector"]
         # V2H: CT is feeding power to home (source, not sink)
@@ -1108,23 +1123,22 @@ def _update_summary():
         # bypassing SPAN; Tesla GW sees both when online, must be summed manually when offline)
         srp_grid_w = grid if tesla_online else span_grid + ct_w
 
-        _state["summary"] = {
-            "solar_w": round(total_solar_w, 0),            # total: Enphase + SolarEdge (for path animations)
-            "enphase_solar_w": round(enphase_solar_w, 0),  # Solar 1 — Enphase IQ8 (from Enphase API)
-            "solaredge_solar_w": round(solaredge_solar_w, 0),  # Solar 2 — SolarEdge SE5000H (SPAN minus Enphase)
-            "span_solar_w": round(span_solar_w, 0),        # SPAN total positive circuits (both systems raw)
-            "load_w": round(span_home_w, 0),               # pure SPAN circuit consumption (negative circuits)
-            "battery_w": battery,
-            "grid_w": round(srp_grid_w, 0),      # true total SRP draw (includes CT when offline)
-            "span_grid_w": round(span_grid, 0),  # SPAN-only grid power (for Home Panel node)
-            "srp_grid_w": round(srp_grid_w, 0),  # explicit alias for SRP Grid node
-            "pool_w": pool_w,
-            "ct_charging_w": ct_w,
-            "ct_v2h": ct_v2h,
-            "ct_v2h_w": round(ct_v2h_w, 0),
-            "total_load_w": round(span_home_w + ct_w, 0),   # SPAN consumption + CT charging = true home consumption
-            "self_powered_pct": round(min(100, total_solar_w / max(span_home_w + ct_w, 1) * 100), 1) if (span_home_w + ct_w) > 0 else 0,
-        }
+        sm = _state["summary"]
+        sm.solar_w = round(total_solar_w, 0)             # total: Enphase + SolarEdge (for path animations)
+        sm.enphase_solar_w = round(enphase_solar_w, 0)   # Solar 1 — Enphase IQ8 (from Enphase API)
+        sm.solaredge_solar_w = round(solaredge_solar_w, 0)  # Solar 2 — SolarEdge SE5000H (SPAN minus Enphase)
+        sm.span_solar_w = round(span_solar_w, 0)         # SPAN total positive circuits (both systems raw)
+        sm.load_w = round(span_home_w, 0)                # pure SPAN circuit consumption (negative circuits)
+        sm.battery_w = battery
+        sm.grid_w = round(srp_grid_w, 0)       # true total SRP draw (includes CT when offline)
+        sm.span_grid_w = round(span_grid, 0)   # SPAN-only grid power (for Home Panel node)
+        sm.srp_grid_w = round(srp_grid_w, 0)   # explicit alias for SRP Grid node
+        sm.pool_w = pool_w
+        sm.ct_charging_w = ct_w
+        sm.ct_v2h = ct_v2h
+        sm.ct_v2h_w = round(ct_v2h_w, 0)
+        sm.total_load_w = round(span_home_w + ct_w, 0)   # SPAN consumption + CT charging = true home consumption
+        sm.self_powered_pct = round(min(100, total_solar_w / max(span_home_w + ct_w, 1) * 100), 1) if (span_home_w + ct_w) > 0 else 0
         _state["ts"] = time.time()
 
 
@@ -1184,20 +1198,45 @@ def poll_cameras():
 
 
 # ── Roku ECP Integration ──────────────────────────────────────────────────────
+# Discovery is passive: Rokus multicast SSDP NOTIFY (alive/byebye) on their own,
+# so a listener thread keeps ROKU_IPS current and one M-SEARCH at startup (plus a
+# rare fallback) fills in anything that hasn't announced yet. Static device-info
+# fields are cached per device; each poll fetches power / active-app / media-player
+# for all TVs concurrently under ROKU_POLL_DEADLINE_S and reuses the last known
+# state (marked stale) for any TV that misses the deadline.
+
+import concurrent.futures as _roku_cf
+import struct as _struct
+import xml.etree.ElementTree as _ET
+
+ROKU_IPS = []  # auto-discovered at startup, then kept current from SSDP NOTIFY
+ROKU_POLL_DEADLINE_S = 2.0
+ROKU_MSEARCH_FALLBACK_S = 1800   # active M-SEARCH only this often (was every 60s)
+ROKU_INFO_TTL_S = 6 * 3600       # re-read name/model/serial this often
+_SSDP_ADDR, _SSDP_PORT = "239.255.255.250", 1900
+
+_roku_lock = threading.Lock()
+_roku_seen: dict = {}        # ip → last SSDP alive / poll success (time.time())
+_roku_info: dict = {}        # ip → {name, model, serial, fetched_at}
+_roku_last: dict = {}        # ip → last device dict (served when a TV misses the deadline)
+_roku_sessions: dict = {}    # ip → requests.Session (keep-alive to :8060)
+_roku_pool = _roku_cf.ThreadPoolExecutor(max_workers=8, thread_name_prefix="roku")
+_roku_stats = {"polls": 0, "deadline_misses": 0, "notify_alive": 0, "notify_byebye": 0,
+               "msearch": 0, "listener": "stopped"}
+
+_ROKU_STATIC_TAGS = ("friendly-device-name", "user-device-name", "model-name", "serial-number")
 
-ROKU_IPS = []  # auto-discovered at startup
 
 def _discover_roku_devices():
     """Discover Roku devices via SSDP multicast (official Roku method)."""
     import socket as _sock
-    SSDP_ADDR = "239.255.255.250"
-    SSDP_PORT = 1900
     MSG = b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\nMAN: \"ssdp:discover\"\r\nMX: 3\r\nST: roku:ecp\r\n\r\n"
     found = []
+    _roku_stats["msearch"] += 1
     try:
         s = _sock.socket(_sock.AF_INET, _sock.SOCK_DGRAM, _sock.IPPROTO_UDP)
         s.settimeout(4)
-        s.sendto(MSG, (SSDP_ADDR, SSDP_PORT))
+        s.sendto(MSG, (_SSDP_ADDR, _SSDP_PORT))
         seen = set()
         try:
             while True:
@@ -1212,78 +1251,208 @@ def _discover_roku_devices():
             s.close()
     except Exception as e:
         log.warning(f"[Roku] SSDP discovery failed: {e}")
+    now = time.time()
+    with _roku_lock:
+        for ip in found:
+            _roku_seen[ip] = now
     # fallback: also try known IPs from last successful discovery
     return found or ROKU_IPS
 
+
+def _ssdp_headers(data):
+    """Parse an SSDP datagram into (start line, {lower-case header: value})."""
+    lines = data.decode("latin-1", errors="replace").split("\r\n")
+    hdrs = {}
+    for line in lines[1:]:
+        k, sep, v = line.partition(":")
+        if sep:
+            hdrs[k.strip().lower()] = v.strip()
+    return lines[0], hdrs
+
+
+def _roku_notify(start, hdrs, src_ip):
+    """Apply one SSDP NOTIFY. Returns the ip if a new Roku appeared, else None."""
+    global ROKU_IPS
+    if not start.startswith("NOTIFY") or "roku" not in (hdrs.get("nt", "") + hdrs.get("server", "")).lower():
+        return None
+    ip = urllib.parse.urlparse(hdrs.get("location", "")).hostname or src_ip
+    with _roku_lock:
+        if hdrs.get("nts") == "ssdp:byebye":
+            _roku_stats["notify_byebye"] += 1
+            _roku_seen.pop(ip, None)
+            if ip in ROKU_IPS:
+                ROKU_IPS = [i for i in ROKU_IPS if i != ip]
+                log.info("[Roku] %s left (ssdp:byebye)", ip)
+            return None
+        _roku_stats["notify_alive"] += 1
+        _roku_seen[ip] = time.time()
+        if ip in ROKU_IPS:
+            return None
+        ROKU_IPS = ROKU_IPS + [ip]
+    log.info("[Roku] %s announced itself (ssdp:alive)", ip)
+    return ip
+
+
 def _roku_rediscover_loop():
+    """Listen for SSDP NOTIFY; fall back to a periodic M-SEARCH if the port can't be joined."""
     global ROKU_IPS
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        s.bind(("", _SSDP_PORT))
+        s.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                     _struct.pack("4s4s", socket.inet_aton(_SSDP_ADDR), socket.inet_aton("0.0.0.0")))
+        s.settimeout(60)
+    except OSError as e:
+        log.warning("[Roku] SSDP NOTIFY listener unavailable (%s) — using 60s M-SEARCH", e)
+        _roku_stats["listener"] = "msearch"
+        while True:
+            time.sleep(60)
+            found = _discover_roku_devices()
+            if found:
+                ROKU_IPS = found
+
+    _roku_stats["listener"] = "notify"
+    last_search = time.monotonic()
     while True:
-        time.sleep(60)
-        found = _discover_roku_devices()
-        if found:
-            ROKU_IPS = found
-            log.info("[Roku] Re-discovery: %d device(s): %s", len(found), found)
+        try:
+            data, addr = s.recvfrom(2048)
+            new_ip = _roku_notify(*_ssdp_headers(data), addr[0])
+            if new_ip:
+                threading.Thread(target=poll_roku, args=(True,), daemon=True).start()
+        except socket.timeout:
+            pass
+        except Exception as e:
+            log.debug("[Roku] NOTIFY parse error: %s", e)
+        if time.monotonic() - last_search >= ROKU_MSEARCH_FALLBACK_S:
+            last_search = time.monotonic()
+            found = _discover_roku_devices()
+            with _roku_lock:
+                ROKU_IPS = list(dict.fromkeys(ROKU_IPS + found))
 
 _roku_cache = {'data': [], 'ts': 0.0}
 _ROKU_TTL = 15.0
 
+def _roku_session(ip):
+    sess = _roku_sessions.get(ip)
+    if sess is None:
+        sess = _roku_sessions[ip] = _requests.Session()
+    return sess
+
 def _roku_get(ip, path):
-    import requests as _req
     try:
-        r = _req.get(f"http://{ip}:8060{path}", timeout=1.5)
+        r = _roku_session(ip).get(f"http://{ip}:8060{path}", timeout=1.5)
         return r.content if r.status_code == 200 else b''
     except Exception:
         return b''
 
 def _roku_post(ip, path):
-    import requests as _req
     try:
-        r = _req.post(f"http://{ip}:8060{path}", timeout=1.5)
+        r = _roku_session(ip).post(f"http://{ip}:8060{path}", timeout=1.5)
         return r.status_code == 200
     except Exception:
         return False
 
-def _parse_xml_tag(content, tag):
-    import re
-    m = re.search(rb'<' + tag.encode() + rb'[^>]*>(.*?)</' + tag.encode() + rb'>', content, re.DOTALL)
-    return m.group(1).decode('utf-8', errors='replace').strip() if m else ''
+def _ecp_fields(content, tags):
+    """
+    Stream-parse an ECP XML body, returning {tag: (text, attrib)} for the first
+    occurrence of each wanted tag. Stops feeding as soon as all are found.
+    """
+    out = {}
+    if not content:
+        return out
+    parser = _ET.XMLPullParser(events=("end",))
+    try:
+        for i in range(0, len(content), 512):
+            parser.feed(content[i:i + 512])
+            for _, el in parser.read_events():
+                if el.tag in tags and el.tag not in out:
+                    out[el.tag] = ((el.text or "").strip(), dict(el.attrib))
+            if len(out) == len(tags):
+                break
+    except _ET.ParseError:
+        pass  # keep whatever parsed before the malformed part
+    return out
+
+def _roku_fetch(ip, now):
+    """Fetch one TV's live state. Static device-info fields come from _roku_info."""
+    t0 = time.monotonic()
+    cached = _roku_info.get(ip)
+    want = ("power-mode",) if cached and now - cached["fetched_at"] < ROKU_INFO_TTL_S \
+        else ("power-mode",) + _ROKU_STATIC_TAGS
+    info_raw = _roku_get(ip, '/query/device-info')
+    info = _ecp_fields(info_raw, want)
+    if info_raw and len(want) > 1:
+        g = lambda t: info.get(t, ("", {}))[0]
+        cached = _roku_info[ip] = {
+            "name": g('friendly-device-name') or g('user-device-name') or ip,
+            "model": g('model-name'), "serial": g('serial-number'), "fetched_at": now,
+        }
+    cached = cached or {"name": ip, "model": "", "serial": ""}
+    power = info.get('power-mode', ("", {}))[0]
+
+    app = {}
+    media = {}
+    if info_raw:
+        app = _ecp_fields(_roku_get(ip, '/query/active-app'), ("app",))
+        media = _ecp_fields(_roku_get(ip, '/query/media-player'), ("player", "position", "duration"))
+    app_text, app_attr = app.get("app", ("", {}))
+    player_attr = media.get("player", ("", {}))[1]
+    return {
+        'ip': ip, 'name': cached["name"], 'model': cached["model"],
+        'power': power, 'active_app': app_text or 'Unknown', 'active_id': app_attr.get("id", ""),
+        'serial': cached["serial"], 'online': bool(info_raw),
+        'is_on': power == 'PowerOn',
+        'play_state': player_attr.get("state") or 'none',
+        'position_ms': media.get("position", ("", {}))[0],
+        'duration_ms': media.get("duration", ("", {}))[0],
+        'latency_ms': round((time.monotonic() - t0) * 1000, 1),
+        'stale': False,
+    }
 
-def poll_roku():
+def poll_roku(force=False):
     global ROKU_IPS
     now = time.monotonic()
-    if _roku_cache['data'] and now - _roku_cache['ts'] < _ROKU_TTL:
+    if not force and _roku_cache['data'] and now - _roku_cache['ts'] < _ROKU_TTL:
         return _roku_cache['data']
     if not ROKU_IPS:
         ROKU_IPS = _discover_roku_devices()
+    ips = list(ROKU_IPS)
+    wall = time.time()
+    futs = {ip: _roku_pool.submit(_roku_fetch, ip, wall) for ip in ips}
+    _roku_cf.wait(futs.values(), timeout=ROKU_POLL_DEADLINE_S)
+    _roku_stats["polls"] += 1
     devices = []
-    for ip in ROKU_IPS:
-        info  = _roku_get(ip, '/query/device-info')
-        app   = _roku_get(ip, '/query/active-app')
-        media = _roku_get(ip, '/query/media-player')
-        name       = _parse_xml_tag(info, 'friendly-device-name') or _parse_xml_tag(info, 'user-device-name') or ip
-        model      = _parse_xml_tag(info, 'model-name')
-        power      = _parse_xml_tag(info, 'power-mode')
-        serial     = _parse_xml_tag(info, 'serial-number')
-        active_app = _parse_xml_tag(app, 'name') or 'Unknown'
-        active_id  = _parse_xml_tag(app, 'id')
-        play_state  = _parse_xml_tag(media, 'state') or _parse_xml_tag(media, 'State') or 'none'
-        position_ms = _parse_xml_tag(media, 'position') or ''
-        duration_ms = _parse_xml_tag(media, 'duration') or ''
-        devices.append({
-            'ip': ip, 'name': name, 'model': model,
-            'power': power, 'active_app': active_app, 'active_id': active_id,
-            'serial': serial, 'online': bool(info),
-            'is_on': power == 'PowerOn',
-            'play_state': play_state,
-            'position_ms': position_ms,
-            'duration_ms': duration_ms,
-        })
+    for ip in ips:
+        fut = futs[ip]
+        if fut.done() and not fut.exception():
+            dev = fut.result()
+            _roku_last[ip] = dev
+            if dev['online']:
+                with _roku_lock:
+                    _roku_seen[ip] = wall
+        else:
+            _roku_stats["deadline_misses"] += 1
+            dev = dict(_roku_last.get(ip) or {'ip': ip, 'name': ip, 'model': '', 'power': '',
+                                              'active_app': 'Unknown', 'active_id': '', 'serial': '',
+                                              'online': False, 'is_on': False, 'play_state': 'none',
+                                              'position_ms': '', 'duration_ms': ''})
+            dev.update(stale=True, latency_ms=None)
+        devices.append(dev)
     _roku_cache['data'] = devices
     _roku_cache['ts'] = now
     with _state_lock:
         _state['roku'] = devices
     return devices
 
+def roku_stats():
+    """Discovery / poll counters plus per-device latency for /api/roku/stats."""
+    return dict(_roku_stats, devices={d['ip']: {"latency_ms": d.get('latency_ms'), "stale": d.get('stale', False),
+                                                "last_seen": _roku_seen.get(d['ip'])}
+                                      for d in _roku_cache['data']})
+
 
 # ── Nest Thermostat Adapter ───────────────────────────────────────────────────
 
@@ -1451,8 +1620,180 @@ def _bhyve_ws_command(device_id, payload, token=None):
     asyncio.run(_send())
 
 
+# Persistent event socket — one long-lived connection owned by the adapter.
+# Commands are multiplexed over it (acks correlated by device_id + event) and
+# server-pushed watering events update _state["bhyve"] immediately, so REST
+# polling only runs every BHYVE_RECONCILE_S while the socket is up.
+BHYVE_WS_URL = "wss://api.orbitbhyve.com/v1/events"
+BHYVE_RECONCILE_S = 300
+_BHYVE_WS_PING_S = 25
+# command event → pushed events that confirm it
+_BHYVE_ACK_EVENTS = {
+    "change_mode": {"change_mode", "watering_in_progress_notification"},
+    "stop_watering": {"stop_watering", "watering_complete", "device_idle"},
+}
+_bhyve_last_rest = 0.0
+
+
+class _BhyveEventSession:
+    """Auto-reconnecting B-Hyve /v1/events connection running on its own asyncio loop thread."""
+
+    def __init__(self):
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._connected = threading.Event()
+        self._pending = {}  # (device_id, command event) → [asyncio.Future]
+        self.stats = {"connects": 0, "events": 0, "commands": 0, "acked": 0,
+                      "last_event_at": 0.0, "last_ack_ms": None}
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="bhyve-ws")
+        self._thread.start()
+
+    def _run(self):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        import asyncio
+        import websockets
+        backoff = 1
+        while True:
+            tok = _bhyve_token
+            if not tok:
+                await asyncio.sleep(5)  # poll_bhyve() owns login/backoff
+                continue
+            try:
+                async with websockets.connect(
+                    BHYVE_WS_URL,
+                    additional_headers={"Orbit-Session-Token": tok},
+                    ping_interval=None,
+                    open_timeout=15,
+                ) as ws:
+                    await ws.send(json.dumps({"event": "app_connection", "orbit_session_token": tok}))
+                    self._ws = ws
+                    self._connected.set()
+                    self.stats["connects"] += 1
+                    backoff = 1
+                    log.info("B-Hyve event socket connected")
+                    pinger = asyncio.ensure_future(self._keepalive(ws))
+                    try:
+                        async for raw in ws:
+                            self._on_message(raw)
+                    finally:
+                        pinger.cancel()
+                log.info("B-Hyve event socket closed by server")
+            except Exception as e:
+                log.warning("B-Hyve event socket error: %s", e)
+            finally:
+                self._ws = None
+                self._connected.clear()
+                for waiters in self._pending.values():
+                    for w in waiters:
+                        if not w.done():
+                            w.set_exception(ConnectionError("B-Hyve event socket dropped"))
+                self._pending.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _keepalive(self, ws):
+        import asyncio
+        while True:
+            await asyncio.sleep(_BHYVE_WS_PING_S)
+            await ws.send(json.dumps({"event": "ping"}))
+
+    def _on_message(self, raw):
+        try:
+            msg = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        event = msg.get("event")
+        dev = msg.get("device_id")
+        self.stats["events"] += 1
+        self.stats["last_event_at"] = time.time()
+        for key in [k for k in self._pending if k[0] == dev and event in _BHYVE_ACK_EVENTS.get(k[1], {k[1]})]:
+            for w in self._pending.pop(key):
+                if not w.done():
+                    w.set_result(msg)
+        _bhyve_apply_event(msg)
+
+    async def _send(self, payload, timeout):
+        import asyncio
+        key = (payload.get("device_id"), payload.get("event"))
+        waiter = self._loop.create_future()
+        self._pending.setdefault(key, []).append(waiter)
+        t0 = time.perf_counter()
+        await self._ws.send(json.dumps(payload))
+        self.stats["commands"] += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            waiters = self._pending.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            return False
+        self.stats["acked"] += 1
+        self.stats["last_ack_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return True
+
+    def command(self, payload, timeout=3.0):
+        """Send a command from any thread. True = acked, False = sent without ack. Raises if not connected."""
+        import asyncio
+        if not self._connected.wait(timeout=2) or self._ws is None:
+            raise ConnectionError("B-Hyve event socket not connected")
+        fut = asyncio.run_coroutine_threadsafe(self._send(payload, timeout), self._loop)
+        return fut.result(timeout + 2)
+
+
+_bhyve_events = _BhyveEventSession()
+
+
+def _bhyve_apply_event(msg):
+    """Fold a pushed watering event into _state["bhyve"] and push it to dashboards."""
+    event = msg.get("event")
+    if event == "watering_in_progress_notification":
+        running = {msg.get("current_station"): int((msg.get("run_time") or 0) * 60)}
+    elif event in ("watering_complete", "device_idle"):
+        running = {}
+    else:
+        return
+    dev = msg.get("device_id")
+    with _state_lock:
+        for z in _state["bhyve"].get("zones", []):
+            if z.get("device_id") == dev:
+                z["is_running"] = z.get("zone_id") in running
+                z["remaining_s"] = running.get(z.get("zone_id"), 0)
+        _state["bhyve"]["ts"] = time.time()
+    _broadcast_sse()
+
+
+def _bhyve_send_command(device_id, payload):
+    """Send over the persistent event socket; fall back to a one-shot connection if it's down."""
+    global _bhyve_last_rest
+    _bhyve_events.start()
+    try:
+        if not _bhyve_events.command(payload):
+            log.debug("B-Hyve: no ack for %s within 3s (command may still have been accepted)",
+                      payload.get("event"))
+            _bhyve_last_rest = 0.0  # reconcile over REST on the next tick
+        return
+    except Exception as e:
+        log.info("B-Hyve event socket unavailable (%s) — using one-shot connection", e)
+    _bhyve_ws_command(device_id, payload)
+    _bhyve_last_rest = 0.0
+
+
 def poll_bhyve():
-    global _bhyve_token, _bhyve_next_retry
+    global _bhyve_token, _bhyve_next_retry, _bhyve_last_rest
     if not BHYVE_EMAIL or not BHYVE_PASSWORD:
         with _state_lock:
             _state["bhyve"]["status"] = "unconfigured"
@@ -1460,10 +1801,14 @@ def poll_bhyve():
     # Backoff: don't retry login within 5 min of a previous auth failure
     if not _bhyve_token and time.time() < _bhyve_next_retry:
         return False
+    # Live events keep zone state current — REST is only a slow reconciliation
+    if _bhyve_events.connected and time.time() - _bhyve_last_rest < BHYVE_RECONCILE_S:
+        return True
     try:
         with _bhyve_token_lock:
             if not _bhyve_token:
                 _bhyve_login()
+        _bhyve_events.start()
 
         # Get devices
         devices_raw = _bhyve_get("/v1/devices")
@@ -1559,9 +1904,11 @@ def poll_bhyve():
                 "status": "online",
                 "devices": out_devices,
                 "zones": out_zones,
+                "live": _bhyve_events.connected,
                 "ts": time.time(),
                 "last_seen": time.time(),
             }
+        _bhyve_last_rest = time.time()
         return True
 
     except Exception as e:
@@ -1617,6 +1964,72 @@ _GE_WATT_ESTIMATE = {
 # Track per-appliance state transitions {appliance_id: {state, changed_at}}
 _ge_state_history: dict = {}
 
+# Conditional sync — detail + alerts are only fetched for appliances whose
+# /v2/device summary changed, that are mid-cycle, or whose idle re-check is due.
+# The list itself runs every GE_ACTIVE_LIST_TICKS while anything is active,
+# GE_IDLE_LIST_TICKS otherwise (the legacy cadence was every 6 ticks = 30s).
+GE_ACTIVE_LIST_TICKS = 3     # 15s
+GE_IDLE_LIST_TICKS = 24      # 2 min
+GE_IDLE_DETAIL_S = 900       # idle appliances: full detail at least every 15 min
+_GE_LEGACY_LIST_S = 30
+_GE_ACTIVE_STATES = {"running", "paused", "delay start", "remote start"}
+_ge_sync: dict = {}          # deviceId → {marker, detail, alerts, fetched_at, active}
+_ge_parse_cache: dict = {}   # deviceId → (services hash, parsed telemetry)
+_ge_force_full = False
+_ge_sync_stats = {"started": 0.0, "calls": [], "parse_hits": 0, "parse_misses": 0}
+
+
+def _ge_list_ticks():
+    """Poll-loop ticks between /v2/device listings — fast while any appliance is mid-cycle."""
+    return GE_ACTIVE_LIST_TICKS if any(r.get("active") for r in _ge_sync.values()) else GE_IDLE_LIST_TICKS
+
+
+def _ge_summary_marker(dev):
+    """Per-device change marker from the /v2/device summary (explicit timestamp if the API gives one)."""
+    for key in ("lastSyncTime", "lastModified", "lastUpdated"):
+        if dev.get(key):
+            return f"{key}:{dev[key]}:{dev.get('presence', '')}"
+    return hashlib.sha1(json.dumps(dev, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _ge_parse_cached(did, services, dev_type):
+    """_ge_parse_services(), memoized per appliance on a hash of the raw service payload."""
+    h = hashlib.sha1(json.dumps(services, sort_keys=True, default=str).encode()).hexdigest()
+    hit = _ge_parse_cache.get(did)
+    if hit and hit[0] == h:
+        _ge_sync_stats["parse_hits"] += 1
+        return dict(hit[1])
+    _ge_sync_stats["parse_misses"] += 1
+    telemetry = _ge_parse_services(services, dev_type)
+    _ge_parse_cache[did] = (h, telemetry)
+    return dict(telemetry)
+
+
+def _ge_record_calls(n, now):
+    calls = _ge_sync_stats["calls"]
+    calls.append((now, n))
+    while calls and now - calls[0][0] > 3600:
+        calls.pop(0)
+    if not _ge_sync_stats["started"]:
+        _ge_sync_stats["started"] = now
+
+
+def _ge_sync_report(n_devices, now):
+    """Cloud calls in the last hour vs. what the legacy every-30s full fetch would have made."""
+    window = min(3600.0, now - _ge_sync_stats["started"]) if _ge_sync_stats["started"] else 0.0
+    made = sum(n for _, n in _ge_sync_stats["calls"])
+    legacy = window / _GE_LEGACY_LIST_S * (1 + 2 * n_devices)
+    scale = 3600.0 / window if window >= 60 else 0.0
+    return {
+        "calls_last_hour": made,
+        "legacy_calls_per_hour": round((1 + 2 * n_devices) * 3600 / _GE_LEGACY_LIST_S),
+        "calls_saved_per_hour": round(max(0.0, legacy - made) * scale),
+        "parse_cache_hits": _ge_sync_stats["parse_hits"],
+        "parse_cache_misses": _ge_sync_stats["parse_misses"],
+        "active": [did for did, r in _ge_sync.items() if r.get("active")],
+        "list_interval_s": _ge_list_ticks() * POLL_INTERVAL_SECONDS,
+    }
+
 
 def _ge_fetch_detail(token: str, aid: str) -> dict:
     """Try to fetch per-appliance detail + attribute data from GE API.
@@ -1920,7 +2333,7 @@ def _ge_parse_services(services, device_type):
 
 
 def poll_ge_appliances():
-    global _ge_next_retry
+    global _ge_next_retry, _ge_force_full
     if not (GE_CLIENT_ID and GE_REFRESH_TOKEN):
         with _state_lock:
             _state["ge_appliances"]["status"] = "unconfigured"
@@ -1942,20 +2355,29 @@ def poll_ge_appliances():
 
         now = time.time()
 
-        # For each device, fetch full detail (includes all services with current state)
+        # Fetch full detail (includes all services with current state) only where needed
         import concurrent.futures as _cf
+        force, _ge_force_full = _ge_force_full, False
+
+        def _needs_fetch(dev):
+            rec = _ge_sync.get(dev.get("deviceId", ""))
+            return (force or rec is None or rec["active"]
+                    or rec["marker"] != _ge_summary_marker(dev)
+                    or now - rec["fetched_at"] >= GE_IDLE_DETAIL_S)
+
         def _fetch_device(dev):
             did = dev.get("deviceId", "")
             if not did:
-                return dev, []
+                return dev, [], False
             result_dev = dev
             alerts = []
+            ok = True
             try:
                 r2 = urllib.request.Request(f"{GE_API_BASE}/v2/device/{did}", headers=hdr)
                 with urllib.request.urlopen(r2, timeout=8) as resp:
                     result_dev = json.loads(resp.read())
             except Exception:
-                pass
+                ok = False
             try:
                 # ?status=triggered → only currently-active alerts; cleared alerts are excluded.
                 # This is the correct way per the Digital Twin API spec — no need for
@@ -1966,11 +2388,32 @@ def poll_ge_appliances():
                     alerts = alert_data.get("alerts", [])
             except Exception:
                 pass
-            return result_dev, alerts
-
-        with _cf.ThreadPoolExecutor(max_workers=4) as ex:
-            fetch_results = list(ex.map(_fetch_device, devices))
-        full_devices = [(r[0], r[1]) for r in fetch_results]
+            return result_dev, alerts, ok
+
+        stale = [d for d in devices if _needs_fetch(d)]
+        fetched = {}
+        if stale:
+            with _cf.ThreadPoolExecutor(max_workers=4) as ex:
+                for dev, res in zip(stale, ex.map(_fetch_device, stale)):
+                    fetched[dev.get("deviceId", "")] = (dev, res)
+        _ge_record_calls(1 + 2 * len(stale), now)
+
+        full_devices = []
+        for dev in devices:
+            did = dev.get("deviceId", "")
+            if did in fetched:
+                summary, (detail, alerts, ok) = fetched[did]
+                rec = _ge_sync.setdefault(did, {"marker": None, "active": False, "fetched_at": 0.0})
+                rec.update(detail=detail, alerts=alerts)
+                if ok:
+                    rec.update(marker=_ge_summary_marker(summary), fetched_at=now)
+                full_devices.append((detail, alerts))
+            else:
+                rec = _ge_sync[did]
+                full_devices.append((rec["detail"], rec["alerts"]))
+        for gone in set(_ge_sync) - {d.get("deviceId", "") for d in devices}:
+            _ge_sync.pop(gone, None)
+            _ge_parse_cache.pop(gone, None)
 
         appliances = []
         for dev, dev_alerts in full_devices:
@@ -2002,9 +2445,11 @@ def poll_ge_appliances():
                 telemetry = {"state": "disconnected", "cycle": "", "door": "", "temp": "",
                              "attrs": [], "est_watts": 0}
             else:
-                telemetry = _ge_parse_services(services, dev_type)
+                telemetry = _ge_parse_cached(did, services, dev_type)
 
             state_str = telemetry["state"]
+            if did in _ge_sync:
+                _ge_sync[did]["active"] = state_str in _GE_ACTIVE_STATES
             # For refrigerators, show door state instead of "idle"
             if "refrigerator" in dev_type and state_str == "idle":
                 state_str = "Door Open" if telemetry.get("door") == "Open" else "Online"
@@ -2131,13 +2576,16 @@ def poll_ge_appliances():
                 "daily_runtime_mins": daily_runtime_mins,
             })
 
+        sync = _ge_sync_report(len(devices), now)
         with _state_lock:
             _state["ge_appliances"] = {
                 "status": "online",
                 "appliances": appliances,
+                "sync": sync,
                 "last_seen": now,
             }
-        log.info("GE SmartHQ polled OK — %d appliance(s)", len(appliances))
+        log.info("GE SmartHQ polled OK — %d appliance(s), %d fetched, ~%d calls/h saved",
+                 len(appliances), len(stale), sync["calls_saved_per_hour"])
         return True
 
     except Exception as e:
@@ -2199,6 +2647,109 @@ def poll_myq():
 # ║  POLLING LOOP                                                                ║
 # ╚══════════════════════════════════════════════════════════════════════════════╝
 
+# ── Warm-state checkpoint ────────────────────────────────────────────────────
+# The last good _state (plus small in-memory ring buffers) is checkpointed every
+# STATE_SNAPSHOT_INTERVAL_S and on shutdown, and restored + broadcast before the
+# first poll so tablets aren't blank while Pentair / cloud adapters warm up.
+# Restored sections are listed in _state["stale"] {section: snapshot time}
+# until their adapter's next successful poll.
+
+STATE_SNAPSHOT_FILE = Path(__file__).parent / "state_snapshot.json.gz"
+STATE_SNAPSHOT_INTERVAL_S = 30
+STATE_SNAPSHOT_MAX_AGE_S = 24 * 3600   # older checkpoints are ignored
+_STALE_SECTIONS_BY_POLLER = {
+    "poll_span": ("span", "summary"), "poll_enphase": ("enphase",), "poll_tesla": ("tesla",),
+    "poll_wall_connector": ("wall_connector",), "poll_bhyve": ("bhyve",), "poll_myq": ("myq",),
+    "poll_nest": ("nest",), "poll_cameras": ("cameras",), "poll_ge_appliances": ("ge_appliances",),
+    "poll_roku": ("roku",), "poll_pentair": ("pentair",),
+}
+_snapshot_last_ts = 0.0
+
+
+def _save_state_snapshot():
+    """Atomically write the current _state + ring buffers (gzip'd JSON) if anything changed."""
+    global _snapshot_last_ts
+    import gzip
+    with _state_lock:
+        ts = _state.get("ts", 0)
+        if not ts or ts == _snapshot_last_ts:
+            return False
+        payload = state_records.dumps({k: v for k, v in _state.items() if k != "stale"})
+    buffers = {"ring_evts": list(_ring_evts), "ge_state_history": _ge_state_history}
+    doc = '{"saved_at":%s,"state":%s,"buffers":%s}' % (time.time(), payload, state_records.dumps(buffers))
+    tmp = STATE_SNAPSHOT_FILE.with_suffix(".tmp")
+    try:
+        tmp.write_bytes(gzip.compress(doc.encode(), compresslevel=5))
+        os.replace(tmp, STATE_SNAPSHOT_FILE)
+        _snapshot_last_ts = ts
+        return True
+    except Exception as e:
+        log.warning("State snapshot write failed: %s", e)
+        return False
+
+
+def _restore_state_snapshot():
+    """Load the last checkpoint into _state, marking restored sections stale (not "unconfigured" ones)."""
+    import gzip
+    t0 = time.perf_counter()
+    try:
+        doc = json.loads(gzip.decompress(STATE_SNAPSHOT_FILE.read_bytes()))
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        log.warning("State snapshot unreadable, starting cold: %s", e)
+        return False
+    saved_at = doc.get("saved_at", 0)
+    if time.time() - saved_at > STATE_SNAPSHOT_MAX_AGE_S:
+        log.info("State snapshot is %.1fh old — starting cold", (time.time() - saved_at) / 3600)
+        return False
+
+    snap = doc.get("state", {})
+    stale = {}
+    with _state_lock:
+        for key, value in snap.items():
+            if key not in _state or key == "ts":
+                continue
+            cur = _state[key]
+            if key == "span" and isinstance(value, dict):
+                value = dict(value, circuits=_span_circuits.restore(value.get("circuits") or []))
+                cur.update(value)
+            elif isinstance(cur, state_records._Record):
+                cur.update({k: v for k, v in value.items() if k in cur})
+            else:
+                _state[key] = value
+            if not (isinstance(value, dict) and value.get("status") == "unconfigured"):
+                stale[key] = saved_at
+        _state["ts"] = snap.get("ts", saved_at)
+        _state["stale"] = stale
+    buffers = doc.get("buffers", {})
+    with _ring_evts_lock:
+        _ring_evts[:] = buffers.get("ring_evts", [])[-50:]
+    _ge_state_history.update(buffers.get("ge_state_history", {}))
+    log.info("Restored warm state from %s (%d sections, %.0fs old) in %.1f ms",
+             STATE_SNAPSHOT_FILE.name, len(stale), time.time() - saved_at, (time.perf_counter() - t0) * 1000)
+    return True
+
+
+def _mark_fresh(fn_name, result):
+    """Clear the stale marker for an adapter's sections after a successful poll.
+
+    Adapters without credentials return False but have still rewritten their
+    section as "unconfigured", so that clears the marker too.
+    """
+    sections = _STALE_SECTIONS_BY_POLLER.get(fn_name, ())
+    with _state_lock:
+        stale = _state.get("stale")
+        if not stale:
+            return
+        for sec in sections:
+            if result is False or result is None:
+                cur = _state.get(sec)
+                if not hasattr(cur, "get") or cur.get("status") != "unconfigured":
+                    continue
+            stale.pop(sec, None)
+
+
 def _poll_loop():
     import concurrent.futures
     global _camera_poll_counter, _ge_poll_counter, _telemetry_log_counter, _daily_agg_counter
@@ -2217,6 +2768,8 @@ def _poll_loop():
     def _submit_pentair():
         if _pentair_future[0] is None or _pentair_future[0].done():
             _pentair_future[0] = _pentair_executor.submit(poll_pentair)
+            _pentair_future[0].add_done_callback(
+                lambda f: _mark_fresh("poll_pentair", None if f.exception() else f.result()))
 
     _submit_pentair()  # kick off first pentair poll immediately
 
@@ -2234,7 +2787,7 @@ def _poll_loop():
         if _camera_poll_counter >= 12:
             fast_fns.append(poll_cameras)
             _camera_poll_counter = 0
-        if _ge_poll_counter >= 6:
+        if _ge_poll_counter >= _ge_list_ticks():
             fast_fns.append(poll_ge_appliances)
             _ge_poll_counter = 0
         if _roku_poll_counter >= 6:
@@ -2245,6 +2798,9 @@ def _poll_loop():
         with concurrent.futures.ThreadPoolExecutor(max_workers=8) as ex:
             futs = [ex.submit(f) for f in fast_fns]
             concurrent.futures.wait(futs, timeout=8)
+        for fn, fut in zip(fast_fns, futs):
+            if fut.done() and not fut.exception():
+                _mark_fresh(fn.__name__, fut.result())
 
         # Broadcast SSE immediately after fast polls — don't wait for Pentair
         try:
@@ -2275,12 +2831,26 @@ def _poll_loop():
         # Re-submit Pentair poll if previous one finished
         _submit_pentair()
 
+        # Warm-state checkpoint
+        if time.time() - _snapshot_last_ts >= STATE_SNAPSHOT_INTERVAL_S:
+            _save_state_snapshot()
+
         time.sleep(POLL_INTERVAL_SECONDS)
 
 
 def _broadcast_sse():
+    global _state_version
     with _state_lock:
-        payload = json.dumps(_state)
+        payload = state_records.dumps(_state)
+    if _state_bus is not None:
+        try:
+            _state_version = _state_bus.publish_state(payload)
+        except Exception as e:
+            log.warning("State bus publish failed: %s", e)
+    _fanout_sse(payload)
+
+
+def _fanout_sse(payload):
     event = f"data: {payload}\n\n"
     with _sse_lock:
         dead = []
@@ -2293,6 +2863,66 @@ def _broadcast_sse():
             _sse_subscribers.remove(q)
 
 
+# ── Multi-worker state bus (JARVIS_ROLE=ingest|web) ─────────────────────────
+
+# Routes a web worker answers from its own copy of the bus; everything else
+# (commands, Ring, Wyze snapshots, Roku) lives in the ingest process and is proxied.
+_WEB_LOCAL_PREFIXES = ("/static/", "/api/stream", "/api/analytics/", "/api/camera/", "/api/ring/history")
+_WEB_LOCAL_PATHS = {"/", "/api/state", "/api/energy-state", "/api/devices"}
+_PROXY_SKIP_HEADERS = {"host", "content-length", "content-encoding", "transfer-encoding", "connection"}
+
+
+def _bus_follow_loop():
+    """Web worker: mirror every published snapshot into the local _state and fan out to SSE clients."""
+    global _state_version
+    log.info("State bus follower started (bus=%s)", JARVIS_BUS_PREFIX)
+    agg_version = _state_bus.aggregates_version()
+    while True:
+        try:
+            snap = _state_bus.wait_state(_state_version, timeout=30)
+            # The aggregator runs in the ingest process; follow its commits so this
+            # worker's analytics cache is refreshed like the ingest one.
+            if _state_bus.aggregates_version() != agg_version:
+                agg_version = _state_bus.aggregates_version()
+                bump_aggregate_version()
+            if not snap:
+                continue
+            version, payload, _ = snap
+            fresh = json.loads(payload)
+            with _state_lock:
+                _state.clear()
+                _state.update(fresh)
+            _state_version = version
+            _fanout_sse(payload.decode())
+        except Exception as e:
+            log.warning("State bus follower error: %s", e)
+            time.sleep(1)
+
+
+@app.before_request
+def _proxy_to_ingest():
+    """Web worker: forward anything that needs device access to the ingest process."""
+    if JARVIS_ROLE != "web":
+        return None
+    path = request.path
+    if path in _WEB_LOCAL_PATHS or (path.startswith(_WEB_LOCAL_PREFIXES) and not path.endswith("/snapshot")):
+        return None
+    url = f"http://127.0.0.1:{JARVIS_CONTROL_PORT}{path}"
+    if request.query_string:
+        url += "?" + request.query_string.decode()
+    try:
+        r = _requests.request(
+            request.method, url,
+            headers={k: v for k, v in request.headers if k.lower() not in _PROXY_SKIP_HEADERS},
+            data=request.get_data(), stream=True, timeout=(3, 120),
+        )
+    except Exception as e:
+        log.warning("Ingest proxy %s %s failed: %s", request.method, path, e)
+        return jsonify({"error": "ingest process unavailable"}), 502
+    headers = [(k, v) for k, v in r.headers.items() if k.lower() not in _PROXY_SKIP_HEADERS]
+    return Response(stream_with_context(r.iter_content(chunk_size=None)), status=r.status_code, headers=headers)
+
+
 # ╔══════════════════════════════════════════════════════════════════════════════╗
 # ║  FLASK ROUTES                                                                ║
 # ╚══════════════════════════════════════════════════════════════════════════════╝
@@ -2311,7 +2941,10 @@ def index():
 @app.route("/api/state")
 def api_state():
     with _state_lock:
-        return jsonify(_state)
+        resp = jsonify(_state)
+    if _state_bus is not None:
+        resp.headers["X-State-Version"] = str(_state_version)
+    return resp
 
 
 @app.route("/api/energy-state")
@@ -2332,7 +2965,7 @@ def api_stream():
         try:
             # Send current state immediately
             with _state_lock:
-                yield f"data: {json.dumps(_state)}\n\n"
+                yield f"data: {state_records.dumps(_state)}\n\n"
             while True:
                 try:
                     event = q.get(timeout=30)
@@ -2484,6 +3117,10 @@ def api_myq_close(serial):
 def api_roku():
     return jsonify(poll_roku())
 
+@app.route("/api/roku/stats")
+def api_roku_stats():
+    return jsonify(roku_stats())
+
 @app.route("/api/roku/<ip>/keypress/<key>", methods=["POST"])
 def api_roku_keypress(ip, key):
     ok = _roku_post(ip, f"/keypress/{key}")
@@ -2600,22 +3237,36 @@ def ring_status_route():
 
 @app.route("/api/ring/history")
 def ring_history_route():
-    """Return recent Ring events (dings, motion, on_demand) up to 30 events."""
-    with _ring_history_lock:
-        history = list(_ring_history_cache)
-
-    # Transform history to include duration and recording_ready flags
-    events = []
-    for evt in history:
-        events.append({
-            "id": evt.get("id"),
-            "kind": evt.get("kind"),
-            "created_at": evt.get("created_at"),
-            "answered": evt.get("answered", False),
-            "duration": evt.get("duration", 0),
-            "recording_ready": (evt.get("recording", {}) or {}).get("status") == "ready",
-        })
-    return jsonify(events)
+    """Page through logged Ring events, newest first: ?before=<cursor|epoch|ISO>&kind=motion&limit=30."""
+    kind = request.args.get("kind") or None
+    if kind and kind not in ring_history.KINDS:
+        return jsonify({"error": f"unknown kind {kind!r}", "kinds": list(ring_history.KINDS)}), 400
+    try:
+        limit = int(request.args.get("limit", 30))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        events, next_before = ring_history.query_events(request.args.get("before"), kind, limit)
+    except sqlite3.OperationalError as e:  # DB not created yet (ingest still starting)
+        log.warning("Ring history unavailable: %s", e)
+        events, next_before = [], None
+    return jsonify({"events": events, "next_before": next_before})
+
+
+@app.route("/api/ring/history/daily")
+def ring_history_daily_route():
+    """Per-day Ring event counts for charting: ?days=30&kind=ding."""
+    kind = request.args.get("kind") or None
+    if kind and kind not in ring_history.KINDS:
+        return jsonify({"error": f"unknown kind {kind!r}", "kinds": list(ring_history.KINDS)}), 400
+    days = request.args.get("days", type=int)   # None if missing or not an integer
+    if days is None and "days" in request.args:
+        return jsonify({"error": "days must be an integer"}), 400
+    days = max(1, min(30 if days is None else days, ring_history.MAX_DAYS))
+    try:
+        return jsonify(ring_history.daily_counts(days, kind))
+    except sqlite3.OperationalError:
+        return jsonify([])
 
 
 @app.route("/api/ring/webrtc_offer", methods=["POST"])
@@ -3272,8 +3923,8 @@ def ring_page():
         // ── History Fetch ────────────────────────────────────────────
         async function updateHistory() {
             try {
-                const resp = await fetch('/api/ring/history');
-                const history = await resp.json();
+                const resp = await fetch('/api/ring/history?limit=30');
+                const history = (await resp.json()).events;
                 events = history.map(evt => ({
                     id: evt.id,
                     kind: evt.kind,
@@ -3501,6 +4152,8 @@ def _rtsp_capture_loop(cam_id: str, rtsp_url: str):
                     if e == -1:
                         break
                     _rtsp_frame_cache[cam_id] = (buf[s:e + 2], time.time())
+                    if _state_bus is not None:
+                        _state_bus.publish_frame(cam_id, *_rtsp_frame_cache[cam_id])
                     buf = buf[e + 2:]
             proc.wait()
             log.info("RTSP ffmpeg exited for %s, reconnecting in 3s", cam_id)
@@ -3534,7 +4187,10 @@ def _start_rtsp_threads():
 @app.route("/api/camera/<cam_id>/frame")
 def camera_frame(cam_id):
     """Return latest cached JPEG frame. Falls back to Wyze cloud snapshot if RTSP is stale/missing."""
-    entry = _rtsp_frame_cache.get(cam_id)
+    if JARVIS_ROLE == "web":
+        entry = _state_bus.read_frame(cam_id) if _state_bus is not None else None
+    else:
+        entry = _rtsp_frame_cache.get(cam_id)
     if entry:
         frame_bytes, captured_at = entry
         if time.time() - captured_at <= FRAME_MAX_AGE_S:
@@ -3707,7 +4363,7 @@ def api_bhyve_run():
             "stations": [{"station": zone_id, "run_time": minutes}],
             "timestamp": ts,
         }
-        _bhyve_ws_command(device_id, payload)
+        _bhyve_send_command(device_id, payload)
         return jsonify({"ok": True})
     except Exception as e:
         log.warning("B-Hyve run error: %s", e)
@@ -3734,7 +4390,7 @@ def api_bhyve_stop():
             "device_id": device_id,
             "timestamp": ts,
         }
-        _bhyve_ws_command(device_id, payload)
+        _bhyve_send_command(device_id, payload)
         return jsonify({"ok": True})
     except Exception as e:
         log.warning("B-Hyve stop error: %s", e)
@@ -3800,8 +4456,9 @@ def api_settings_ge():
 @app.route("/api/ge/refresh", methods=["POST"])
 def api_ge_refresh():
     """Force an immediate GE SmartHQ appliance re-poll on the next loop tick."""
-    global _ge_poll_counter
+    global _ge_poll_counter, _ge_force_full
     _ge_poll_counter = 99  # exceeds threshold — triggers on next tick
+    _ge_force_full = True  # and re-fetch every appliance's detail, changed or not
     return jsonify({"ok": True, "message": "GE refresh queued"})
 
 
@@ -3903,36 +4560,73 @@ def api_devices():
 
 
 # ── Energy Analytics API ───────────────────────────────────────────────────────
+# Query params are clamped so the analytics result cache sees a bounded key set.
+
+ANALYTICS_MAX_DAYS = 365
+
+
+def _analytics_days(default=30):
+    return min(max(request.args.get("days", default, type=int), 1), ANALYTICS_MAX_DAYS)
+
 
 @app.route("/api/analytics/usage-patterns")
 def api_usage_patterns():
     """Get usage pattern analysis: hourly peaks, daily averages, seasonal trends."""
-    days = request.args.get("days", 30, type=int)
-    patterns = get_usage_patterns(days)
+    days = _analytics_days()
+    patterns = cached_analytics("usage-patterns", get_usage_patterns, days)
     return jsonify(patterns or {})
 
 
 @app.route("/api/analytics/daily-trends")
 def api_daily_trends():
     """Fetch daily energy trends for charts (solar, load, grid, etc)."""
-    days = request.args.get("days", 30, type=int)
-    trends = get_recent_daily_trends(days)
+    days = _analytics_days()
+    trends = cached_analytics("daily-trends", get_recent_daily_trends, days)
     return jsonify({"trends": trends})
 
 
 @app.route("/api/analytics/powerwall-roi")
 def api_powerwall_roi():
     """Calculate ROI for Powerwall installation based on recent data patterns."""
-    battery_kwh = request.args.get("battery_kwh", 13.5, type=float)
-    install_cost = request.args.get("install_cost", 11000, type=int)
-    lifetime_years = request.args.get("lifetime_years", 10, type=int)
+    battery_kwh = round(min(max(request.args.get("battery_kwh", 13.5, type=float), 1.0), 100.0), 1)
+    install_cost = min(max(request.args.get("install_cost", 11000, type=int), 0), 200000)
+    lifetime_years = min(max(request.args.get("lifetime_years", 10, type=int), 1), 30)
 
-    roi = calculate_powerwall_roi(battery_kwh, install_cost, lifetime_years)
+    roi = cached_analytics("powerwall-roi", calculate_powerwall_roi, battery_kwh, install_cost, lifetime_years)
     if not roi:
         return jsonify({"error": "insufficient data"}), 202  # Accepted but not ready
     return jsonify(roi)
 
 
+@app.route("/api/analytics/tariff-compare")
+def api_tariff_compare():
+    """What the last N days would have cost under each price plan (?days=30&plans=srp_e27,srp_e26)."""
+    days = _analytics_days()
+    plans = tuple(p for p in request.args.get("plans", "").split(",") if p) or tuple(TARIFF_PLANS)
+    unknown = [p for p in plans if p not in TARIFF_PLANS]
+    if unknown:
+        return jsonify({"error": f"unknown plan(s): {', '.join(unknown)}", "plans": list(TARIFF_PLANS)}), 400
+    result = cached_analytics("tariff-compare", compare_tariffs, days, plans)
+    if not result:
+        return jsonify({"error": "insufficient data"}), 202
+    return jsonify(result)
+
+
+@app.route("/api/analytics/forecast")
+def api_forecast():
+    """Next 24h solar + load forecast (kWh per hour, p10–p90 bands), refit hourly in the background."""
+    fc = energy_forecast.get_forecast()
+    if not fc:
+        return jsonify({"error": "insufficient data"}), 202
+    return jsonify(fc)
+
+
+@app.route("/api/analytics/cache-stats")
+def api_analytics_cache_stats():
+    """Hit/miss/compute-time counters for the analytics result cache."""
+    return jsonify(analytics_cache_stats())
+
+
 # ╔══════════════════════════════════════════════════════════════════════════════╗
 # ║  DASHBOARD HTML                                                              ║
 # ╚══════════════════════════════════════════════════════════════════════════════╝
@@ -7610,7 +8304,7 @@ function renderRoku(devices) {
   const grid = document.getElementById('roku-grid');
   if (!grid) return;
   if (!devices || devices.length === 0) {
-    grid.innerHTML = '<div style="color:#888;font-size:0.9rem;">No Roku devices found on network. Discovery runs every 60s.</div>';
+    grid.innerHTML = '<div style="color:#888;font-size:0.9rem;">No Roku devices found on network. Listening for SSDP announcements.</div>';
     return;
   }
   const BTN = 'min-height:44px;padding:8px 14px;font-size:1rem;border-radius:6px;border:1px solid #444;background:#2a2a3e;color:#fff;cursor:pointer;';
@@ -9654,16 +10348,24 @@ DASHBOARD_HTML = DASHBOARD_HTML.replace(
 )
 
 
-if __name__ == "__main__":
-    log.info("Starting Jarvis Home Energy OS on port %d", DASHBOARD_PORT)
-    log.info("Devices configured:")
-    log.info("  SPAN    : %s (token=%s)", SPAN_HOST, "yes" if SPAN_TOKEN else "NO")
-    log.info("  Enphase : %s (token=%s)", ENPHASE_HOST, "yes" if ENPHASE_TOKEN else "NO")
-    log.info("  Pentair : %s:%d", PENTAIR_HOST, PENTAIR_PORT)
-    log.info("  Tesla   : %s", TESLA_HOST or "not configured")
+def _start_ingest():
+    """Start everything that talks to devices: analytics DB, pollers, RTSP, Ring, Roku discovery."""
+    # Show the last known state right away; adapters replace it section by section
+    if _restore_state_snapshot():
+        _broadcast_sse()
+    atexit.register(_save_state_snapshot)
 
-    # Initialize energy analytics database
+    # Initialize energy analytics + Ring event history databases
     init_db()
+    ring_history.init_db()
+    energy_forecast.init_db()
+    threading.Thread(target=energy_forecast.forecast_loop, daemon=True, name="forecast").start()
+    # Materialize the dashboard's default analytics panels so first loads come from memory
+    threading.Thread(target=lambda: [
+        cached_analytics("usage-patterns", get_usage_patterns, 30),
+        cached_analytics("daily-trends", get_recent_daily_trends, 30),
+        cached_analytics("powerwall-roi", calculate_powerwall_roi, 13.5, 11000, 10),
+    ], daemon=True, name="analytics-warm").start()
 
     t = threading.Thread(target=_poll_loop, daemon=True)
     t.start()
@@ -9684,8 +10386,38 @@ if __name__ == "__main__":
         global ROKU_IPS
         ROKU_IPS = _discover_roku_devices()
         log.info("Roku discovery complete: %d device(s) found: %s", len(ROKU_IPS), ROKU_IPS)
-        # Start background re-discovery loop
-        _threading.Thread(target=_roku_rediscover_loop, daemon=True).start()
+        # Then track arrivals/departures from SSDP NOTIFY
+        _threading.Thread(target=_roku_rediscover_loop, daemon=True, name="roku-ssdp").start()
     _threading.Thread(target=_roku_startup, daemon=True).start()
 
-    app.run(host="0.0.0.0", port=DASHBOARD_PORT, debug=False, threaded=True)
+
+if __name__ == "__main__":
+    log.info("Starting Jarvis Home Energy OS on port %d (role=%s)", DASHBOARD_PORT, JARVIS_ROLE)
+    log.info("Devices configured:")
+    log.info("  SPAN    : %s (token=%s)", SPAN_HOST, "yes" if SPAN_TOKEN else "NO")
+    log.info("  Enphase : %s (token=%s)", ENPHASE_HOST, "yes" if ENPHASE_TOKEN else "NO")
+    log.info("  Pentair : %s:%d", PENTAIR_HOST, PENTAIR_PORT)
+    log.info("  Tesla   : %s", TESLA_HOST or "not configured")
+    # SIGTERM (systemd, serve.py) → normal interpreter exit, so atexit checkpoints run
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    if JARVIS_ROLE == "ingest":
+        from state_bus import StateBus
+        _state_bus = StateBus(JARVIS_BUS_PREFIX, cameras=list(_RTSP_CAM_URLS), create=True)
+        on_aggregate_version(lambda _: _state_bus.publish_aggregates())
+        _start_ingest()
+        # Control API for web workers (commands, Ring, snapshots) — loopback only
+        app.run(host="127.0.0.1", port=JARVIS_CONTROL_PORT, debug=False, threaded=True)
+    elif JARVIS_ROLE == "web":
+        from state_bus import StateBus
+        from werkzeug.serving import make_server
+        _state_bus = StateBus(JARVIS_BUS_PREFIX, cameras=list(_RTSP_CAM_URLS))
+        threading.Thread(target=_bus_follow_loop, daemon=True, name="bus-follow").start()
+        listen_fd = os.environ.get("JARVIS_LISTEN_FD")
+        server = make_server("0.0.0.0", DASHBOARD_PORT, app, threaded=True,
+                             fd=int(listen_fd) if listen_fd else None)
+        log.info("Web worker %d serving from state bus", os.getpid())
+        server.serve_forever()
+    else:
+        _start_ingest()
+        app.run(host="0.0.0.0", port=DASHBOARD_PORT, debug=False, threaded=True)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Jarvis Home Energy — Analytics backfill / rebuild
+Rebuilds energy_hourly, energy_daily and peak_analysis from energy_telemetry
+after an aggregation change or a DB restore.
+
+The telemetry range is split into UTC day chunks (the same day boundaries
+compute_daily_aggregates uses). Each chunk is read and reduced in a worker
+process with NumPy bincount/maximum.at — 24 hourly rows + 1 daily row — and the
+main process upserts it in one transaction. Completed days are recorded in a
+checkpoint file so an interrupted run can continue with --resume. peak_analysis
+is recomputed at the end from the full load series (exact 95th percentiles),
+whatever --start/--end say.
+
+Aggregation semantics match compute_hourly_aggregates / compute_daily_aggregates
+exactly, so incremental aggregation can carry on from the rebuilt tables.
+
+Usage:
+    python backfill_analytics.py                       # whole telemetry range
+    python backfill_analytics.py --start 2026-01-01 --end 2026-03-01 --workers 8
+    python backfill_analytics.py --resume              # continue an interrupted run
+
+A running app.py will pick up the rebuilt tables when its analytics cache
+entries age out (CACHE_MAX_AGE_S).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from energy_analytics import DB_PATH, estimate_grid_cost, init_db  # noqa: E402
+
+_W_TO_KWH = 1.0 / 3600000   # same per-sample scaling as compute_hourly_aggregates
+
+_HOURLY_COLS = ("hour_start", "solar_kwh", "load_kwh", "grid_import_kwh", "grid_export_kwh",
+                "battery_discharge_kwh", "battery_charge_kwh", "ct_charge_kwh", "peak_load_w", "avg_load_w")
+_DAILY_COLS = ("date_start", "solar_kwh", "load_kwh", "grid_import_kwh", "grid_export_kwh",
+               "battery_discharge_kwh", "battery_charge_kwh", "ct_charge_kwh", "peak_load_w", "avg_load_w",
+               "self_powered_pct", "grid_cost_est")
+
+
+def _upsert_sql(table, cols, key):
+    updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c != key)
+    return (f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}")
+
+
+_HOURLY_UPSERT = _upsert_sql("energy_hourly", _HOURLY_COLS, "hour_start")
+_DAILY_UPSERT = _upsert_sql("energy_daily", _DAILY_COLS, "date_start")
+
+
+def _ro_connect(db_path):
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+
+
+# ── Worker: one day chunk ─────────────────────────────────────────────────────
+
+def aggregate_day(db_path, day_start, hour_limit):
+    """
+    Reduce one UTC day of telemetry to (hourly_rows, daily_row_or_None, samples).
+    Hours at or after `hour_limit` (the current, incomplete hour) are skipped.
+    """
+    day_end = min(day_start + 86400, hour_limit)
+    conn = _ro_connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT timestamp, solar_w, load_w, grid_w, battery_w, ct_charging_w "
+            "FROM energy_telemetry WHERE timestamp >= ? AND timestamp < ?",
+            (day_start, day_end),
+        ).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return [], None, 0
+
+    # NULL → NaN, so sums can skip them the way SQL SUM/AVG/MAX do
+    a = np.array(rows, dtype=np.float64)
+    hour = ((a[:, 0] - day_start) // 3600).astype(np.intp)
+    solar, load, grid, batt, ct = (a[:, i] for i in range(1, 6))
+
+    def hsum(x):
+        return np.bincount(hour, weights=np.nan_to_num(x), minlength=24)
+
+    samples = np.bincount(hour, minlength=24)
+    load_valid = ~np.isnan(load)
+    load_n = np.bincount(hour, weights=load_valid, minlength=24)
+    peak = np.full(24, -np.inf)
+    np.maximum.at(peak, hour[load_valid], load[load_valid])
+
+    solar_kwh = hsum(solar) * _W_TO_KWH
+    load_kwh = hsum(load) * _W_TO_KWH
+    grid_import = hsum(np.where(grid > 0, grid, 0)) * _W_TO_KWH
+    grid_export = hsum(np.where(grid < 0, -grid, 0)) * _W_TO_KWH
+    batt_dis = hsum(np.where(batt > 0, batt, 0)) * _W_TO_KWH
+    batt_chg = hsum(np.where(batt < 0, -batt, 0)) * _W_TO_KWH
+    ct_kwh = hsum(ct) * _W_TO_KWH
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_load = np.where(load_n > 0, hsum(load) / load_n, 0.0)
+    peak = np.where(np.isfinite(peak), peak, 0.0)
+
+    present = np.nonzero(samples)[0]
+    hourly = [
+        (day_start + int(h) * 3600, float(solar_kwh[h]), float(load_kwh[h]), float(grid_import[h]),
+         float(grid_export[h]), float(batt_dis[h]), float(batt_chg[h]), float(ct_kwh[h]),
+         float(peak[h]), float(avg_load[h]))
+        for h in present
+    ]
+
+    daily = None
+    if day_start + 86400 <= hour_limit:  # only complete days, like compute_daily_aggregates
+        d_solar = float(solar_kwh[present].sum())
+        d_load = float(load_kwh[present].sum())
+        d_import = float(grid_import[present].sum())
+        if d_solar:
+            daily = (
+                day_start, d_solar, d_load, d_import,
+                float(grid_export[present].sum()), float(batt_dis[present].sum()),
+                float(batt_chg[present].sum()), float(ct_kwh[present].sum()),
+                float(peak[present].max()), float(avg_load[present].mean()),
+                round((d_solar / d_load * 100) if d_load > 0 else 0, 1),
+                round(estimate_grid_cost(day_start + present * 3600, grid_import[present],
+                                         grid_export[present]), 2),
+            )
+    return hourly, daily, len(rows)
+
+
+# ── peak_analysis (full range, main process) ──────────────────────────────────
+
+def rebuild_peak_analysis(conn, start, end):
+    """Recompute peak_analysis: 95th-pct and mean load per (hour, weekday, summer)."""
+    a = np.array(conn.execute(
+        "SELECT timestamp, load_w FROM energy_telemetry "
+        "WHERE timestamp >= ? AND timestamp < ? AND load_w IS NOT NULL", (start, end),
+    ).fetchall(), dtype=np.float64)
+    conn.execute("DELETE FROM peak_analysis")
+    if not len(a):
+        return 0
+    ts = a[:, 0].astype("datetime64[s]")
+    hour = (ts - ts.astype("datetime64[D]")).astype(np.int64) // 3600
+    days = ts.astype("datetime64[D]").astype(np.int64)
+    dow = (days + 3) % 7                                     # 1970-01-01 was a Thursday; 0 = Mon
+    month = ts.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    summer = ((month >= 6) & (month <= 9)).astype(np.int64)
+    key = (hour * 7 + dow) * 2 + summer
+
+    order = np.lexsort((a[:, 1], key))
+    key_s, load_s = key[order], a[order, 1]
+    bounds = np.flatnonzero(np.diff(key_s)) + 1
+    rows = []
+    for k, vals in zip(key_s[np.r_[0, bounds]], np.split(load_s, bounds)):
+        k = int(k)
+        rows.append((k // 14, (k // 2) % 7, k % 2, float(np.percentile(vals, 95)),
+                     float(vals.mean()), int(len(vals))))
+    conn.executemany(
+        "INSERT INTO peak_analysis (hour_of_day, day_of_week, is_summer, peak_load_w, avg_load_w, samples) "
+        "VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def _day(s):
+    return int(datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def _fmt_day(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _load_checkpoint(path, start, end):
+    """Days done by a previous run over the same range (`end` is None for "up to now")."""
+    try:
+        saved = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return set()
+    if saved.get("start") != start or saved.get("end") != end:
+        print(f"Ignoring checkpoint {path.name}: it is for a different range", flush=True)
+        return set()
+    return set(saved.get("done", []))
+
+
+def _save_checkpoint(path, start, end, done):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"start": start, "end": end, "done": sorted(done)}))
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild energy analytics tables from telemetry")
+    ap.add_argument("--db", default=str(DB_PATH))
+    ap.add_argument("--start", help="first UTC day, YYYY-MM-DD (default: earliest telemetry)")
+    ap.add_argument("--end", help="last UTC day exclusive, YYYY-MM-DD (default: now)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--resume", action="store_true", help="skip days completed by a previous run")
+    ap.add_argument("--no-peak", action="store_true", help="don't rebuild peak_analysis")
+    args = ap.parse_args()
+
+    db_path = Path(args.db)
+    if db_path == Path(DB_PATH):
+        init_db()
+    checkpoint = db_path.with_name(db_path.name + ".backfill.json")
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    lo, hi = conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM energy_telemetry").fetchone()
+    if lo is None:
+        print("energy_telemetry is empty — nothing to backfill")
+        return
+    hour_limit = (int(time.time()) // 3600) * 3600
+    start = _day(args.start) if args.start else (lo // 86400) * 86400
+    end = min(_day(args.end) if args.end else hour_limit, (hi // 3600 + 1) * 3600, hour_limit)
+    end_arg = _day(args.end) if args.end else None
+    limit = min(end, hour_limit)
+    days = list(range(start, end, 86400))
+
+    done = _load_checkpoint(checkpoint, start, end_arg) if args.resume else set()
+    todo = [d for d in days if d not in done]
+    print(f"Backfill {_fmt_day(start)} → {_fmt_day(end)}: {len(days)} day(s), "
+          f"{len(days) - len(todo)} already done, {args.workers} worker(s)", flush=True)
+
+    t0 = time.time()
+    total_samples = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futs = {pool.submit(aggregate_day, str(db_path), d, limit): d for d in todo}
+        for i, fut in enumerate(as_completed(futs), 1):
+            day_start = futs[fut]
+            hourly, daily, samples = fut.result()
+            with conn:  # one transaction per chunk
+                if hourly:
+                    conn.executemany(_HOURLY_UPSERT, hourly)
+                if daily:
+                    conn.execute(_DAILY_UPSERT, daily)
+            if day_start + 86400 <= limit:   # a partial last day is redone on --resume
+                done.add(day_start)
+            _save_checkpoint(checkpoint, start, end_arg, done)
+            total_samples += samples
+            if i == len(todo) or i % max(1, len(todo) // 20) == 0:
+                el = time.time() - t0
+                print(f"  [{i}/{len(todo)}] {_fmt_day(day_start)}  {total_samples:,} samples  "
+                      f"{i / el if el else 0:.1f} days/s", flush=True)
+
+    if not args.no_peak:
+        with conn:   # always the full telemetry range: the table is replaced, not merged
+            n = rebuild_peak_analysis(conn, lo, hi + 1)
+        print(f"  peak_analysis: {n} (hour, weekday, season) buckets")
+    conn.close()
+    checkpoint.unlink(missing_ok=True)
+    print(f"Done in {time.time() - t0:.2f}s ({total_samples:,} telemetry rows)")
+
+
+if __name__ == "__main__":
+    main()
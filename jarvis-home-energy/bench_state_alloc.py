@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Jarvis Home Energy — per-tick allocation benchmark for the hot _state sections
+Compares the previous dict-per-tick construction of SPAN circuits / Tesla flows /
+summary (reproduced below as the "dicts" variant) with the in-place slot records
+in state_records.py, over the same synthetic SPAN + Tesla payloads.
+
+Reports, per tick: time to update + serialize, transient bytes allocated
+(tracemalloc peak above the pre-tick baseline) and GC runs triggered.
+
+Usage:
+    python bench_state_alloc.py                 # 40 circuits, 20k ticks
+    python bench_state_alloc.py --circuits 64 --ticks 50000
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import state_records  # noqa: E402
+from state_records import CircuitTable, EnergyFlows, Summary  # noqa: E402
+
+
+def _span_payload(n, rnd):
+    # like a real panel: a quarter of the circuits are drawing power, the rest idle at 0 W
+    return [{"id": f"c{i:02d}", "name": f"Circuit {i}",
+             "instantPowerW": rnd.uniform(-3000, -50) if i % 4 == 0 else 0.0,
+             "relayState": "CLOSED", "priority": "NICE_TO_HAVE", "is_sheddable": i % 3 == 0}
+            for i in range(n)]
+
+
+def _tesla_payload(rnd):
+    return {"solar_power": rnd.uniform(0, 9000), "battery_power": rnd.uniform(-5000, 5000),
+            "grid_power": rnd.uniform(-4000, 6000), "load_power": rnd.uniform(500, 9000),
+            "percentage_charged": rnd.uniform(10, 100)}
+
+
+# ── Previous representation: fresh dicts every tick ──────────────────────────
+
+def tick_dicts(state, circuits_raw, live):
+    circuits = []
+    for c in circuits_raw:
+        pwr = c.get("instantPowerW", 0)
+        circuits.append({
+            "id": c.get("id", ""), "name": c.get("name", "?"), "power_w": round(pwr, 0),
+            "relay": c.get("relayState", "?"), "priority": c.get("priority", "?"),
+            "sheddable": c.get("is_sheddable", False),
+            "color": "green" if abs(pwr) < 200 else ("yellow" if abs(pwr) < 1500 else "red"),
+        })
+    state["span"] = {"status": "online", "grid_power": live["grid_power"], "circuits": circuits,
+                     "last_seen": time.time()}
+    state["tesla"] = {"status": "online", "soe": round(live["percentage_charged"], 1),
+                      "solar_w": round(live["solar_power"], 0), "battery_w": round(live["battery_power"], 0),
+                      "grid_w": round(live["grid_power"], 0), "load_w": round(live["load_power"], 0),
+                      "grid_state": "Active", "islanded": False, "backup_reserve_percent": 20.0,
+                      "site_name": "Home", "storm_mode_active": False, "last_seen": time.time()}
+    span_home_w = abs(sum(c.get("power_w", 0) for c in circuits if (c.get("power_w", 0) or 0) < -10))
+    t = state["tesla"]
+    state["summary"] = {
+        "solar_w": t["solar_w"], "enphase_solar_w": 0, "solaredge_solar_w": 0, "span_solar_w": 0,
+        "load_w": round(span_home_w, 0), "battery_w": t["battery_w"], "grid_w": t["grid_w"],
+        "span_grid_w": 0, "srp_grid_w": t["grid_w"], "pool_w": 0, "ct_charging_w": 0, "ct_v2h": False,
+        "ct_v2h_w": 0, "total_load_w": round(span_home_w, 0),
+        "self_powered_pct": round(min(100, t["solar_w"] / max(span_home_w, 1) * 100), 1),
+    }
+    return json.dumps(state)
+
+
+# ── Slot records, updated in place ───────────────────────────────────────────
+
+def make_records_state():
+    table = CircuitTable()
+    state = {"span": {"status": "online", "grid_power": 0, "circuits": table.circuits, "last_seen": 0},
+             "tesla": EnergyFlows(), "summary": Summary()}
+    return state, table
+
+
+def tick_records(state, table, circuits_raw, live):
+    table.update_from_span(circuits_raw)
+    span = state["span"]
+    span["grid_power"] = live["grid_power"]
+    span["last_seen"] = time.time()
+    t = state["tesla"]
+    t.status = "online"
+    t.soe = round(live["percentage_charged"], 1)
+    t.solar_w = round(live["solar_power"], 0)
+    t.battery_w = round(live["battery_power"], 0)
+    t.grid_w = round(live["grid_power"], 0)
+    t.load_w = round(live["load_power"], 0)
+    t.last_seen = time.time()
+    span_home_w = 0
+    for c in table.circuits:
+        if c.power_w < -10:
+            span_home_w -= c.power_w
+    sm = state["summary"]
+    sm.solar_w = t.solar_w
+    sm.load_w = round(span_home_w, 0)
+    sm.battery_w = t.battery_w
+    sm.grid_w = sm.srp_grid_w = t.grid_w
+    sm.total_load_w = round(span_home_w, 0)
+    sm.self_powered_pct = round(min(100, t.solar_w / max(span_home_w, 1) * 100), 1)
+    return state_records.dumps(state)
+
+
+def _measure(name, tick, payloads, ticks):
+    collections = [0]
+
+    def _cb(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    # steady state first (records are allocated on the first tick only)
+    for p in payloads[:10]:
+        tick(*p)
+    gc.collect()
+
+    # time + GC activity, untraced
+    gc.callbacks.append(_cb)
+    t0 = time.perf_counter()
+    for i in range(ticks):
+        tick(*payloads[i % len(payloads)])
+    elapsed = time.perf_counter() - t0
+    gc.callbacks.remove(_cb)
+
+    # transient bytes per tick (peak above the pre-tick baseline) and net growth
+    tracemalloc.start()
+    transient = []
+    base0 = tracemalloc.get_traced_memory()[0]
+    for i in range(200):
+        tracemalloc.reset_peak()
+        cur, _ = tracemalloc.get_traced_memory()
+        tick(*payloads[i % len(payloads)])
+        transient.append(tracemalloc.get_traced_memory()[1] - cur)
+    growth = tracemalloc.get_traced_memory()[0] - base0
+    tracemalloc.stop()
+    return {
+        "variant": name,
+        "us_per_tick": round(elapsed / ticks * 1e6, 1),
+        "gc_runs_per_1k_ticks": round(collections[0] / ticks * 1000, 2),
+        "transient_kb_per_tick": round(sum(transient) / len(transient) / 1024, 1),
+        "net_growth_bytes_200_ticks": growth,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-tick allocation: dict sections vs slot records")
+    ap.add_argument("--circuits", type=int, default=40)
+    ap.add_argument("--ticks", type=int, default=20000)
+    args = ap.parse_args()
+
+    rnd = random.Random(1)
+    raw = [(_span_payload(args.circuits, rnd), _tesla_payload(rnd)) for _ in range(64)]
+
+    legacy_state = {}
+    rec_state, table = make_records_state()
+    results = [
+        _measure("dicts", lambda c, l: tick_dicts(legacy_state, c, l), raw, args.ticks),
+        _measure("records", lambda c, l: tick_records(rec_state, table, c, l), raw, args.ticks),
+    ]
+    print(f"{args.circuits} circuits, {args.ticks} ticks")
+    for r in results:
+        print("  {variant:8s} {us_per_tick:8.1f} us/tick   {transient_kb_per_tick:7.1f} KB allocated/tick   "
+              "GC runs/1k ticks {gc_runs_per_1k_ticks:6.2f}".format(**r))
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
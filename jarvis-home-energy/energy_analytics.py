@@ -8,13 +8,17 @@ import threading
 import time
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from tariff import DEFAULT_PLAN, PLANS, get_tariff
+
 log = logging.getLogger("jarvis.analytics")
 
 DB_PATH = Path(__file__).parent / "energy_data.db"
 _db_lock = threading.Lock()
+GRID_COST_PLAN = DEFAULT_PLAN  # tariff used for energy_daily.grid_cost_est
 
 
 def init_db():
@@ -180,6 +184,7 @@ def compute_hourly_aggregates():
 
             # Aggregate all complete hours since last aggregation
             hour_start = last_agg if last_agg > 0 else (now - 86400)  # Default: last 24h
+            inserted = 0
 
             while hour_start < current_hour_boundary:
                 hour_end = hour_start + 3600
@@ -219,12 +224,15 @@ def compute_hourly_aggregates():
                         row[8] or 0,  # peak_load_w
                         row[9] or 0,  # avg_load_w
                     ))
+                    inserted += c.rowcount
 
                 hour_start += 3600
 
             conn.commit()
             conn.close()
             log.debug("Hourly aggregates computed")
+        if inserted:
+            bump_aggregate_version()
     except Exception as e:
         log.warning("Failed to compute hourly aggregates: %s", e)
 
@@ -247,6 +255,7 @@ def compute_daily_aggregates():
             current_day_boundary = (now // 86400) * 86400
 
             day_start = last_agg if last_agg > 0 else (now - 86400 * 30)  # Default: last 30 days
+            inserted = 0
 
             while day_start < current_day_boundary:
                 day_end = day_start + 86400
@@ -273,8 +282,13 @@ def compute_daily_aggregates():
                     grid_import_kwh = row[2] or 0
                     self_powered_pct = (solar_kwh / load_kwh * 100) if load_kwh > 0 else 0
 
-                    # Estimate grid cost (SRP blended rate ~$0.18/kWh)
-                    grid_cost_est = grid_import_kwh * 0.18
+                    # Net TOU energy cost of the day's hours (imports − export credit)
+                    c.execute("""
+                        SELECT hour_start, grid_import_kwh, grid_export_kwh
+                        FROM energy_hourly
+                        WHERE hour_start >= ? AND hour_start < ?
+                    """, (day_start, day_end))
+                    grid_cost_est = estimate_grid_cost(*zip(*c.fetchall()))
 
                     c.execute("""
                         INSERT OR IGNORE INTO energy_daily (
@@ -296,16 +310,81 @@ def compute_daily_aggregates():
                         round(self_powered_pct, 1),
                         round(grid_cost_est, 2),
                     ))
+                    inserted += c.rowcount
 
                 day_start += 86400
 
             conn.commit()
             conn.close()
             log.debug("Daily aggregates computed")
+        if inserted:
+            bump_aggregate_version()
     except Exception as e:
         log.warning("Failed to compute daily aggregates: %s", e)
 
 
+def estimate_grid_cost(hour_starts, import_kwh, export_kwh, plan=None):
+    """Net energy cost ($) of hourly import/export under a tariff plan (demand charges excluded)."""
+    cost = get_tariff(plan or GRID_COST_PLAN).energy_cost(
+        hour_starts, [v or 0 for v in import_kwh], [v or 0 for v in export_kwh])
+    return float(cost.sum())
+
+
+COMPARE_MAX_DAYS = 365
+
+
+def compare_tariffs(days=30, plans=None):
+    """
+    Ad-hoc "what would plan X have cost": bills the last `days` of history under each plan.
+    Energy comes from energy_hourly; on-peak demand from 30-min averages of raw telemetry,
+    averaged in SQL on a read-only connection outside _db_lock (peak hours are whole MST
+    hours, so a 30-min bucket is never split across a peak boundary).
+    """
+    try:
+        days = min(max(int(days), 1), COMPARE_MAX_DAYS)
+        cutoff = int(time.time()) - days * 86400
+        with _db_lock:
+            conn = sqlite3.connect(DB_PATH)
+            c = conn.cursor()
+            c.execute("""
+                SELECT hour_start, grid_import_kwh, grid_export_kwh
+                FROM energy_hourly
+                WHERE hour_start >= ?
+                ORDER BY hour_start
+            """, (cutoff,))
+            hourly = c.fetchall()
+            conn.close()
+        if not hourly:
+            return None
+
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=30)
+        try:
+            demand = conn.execute("""
+                SELECT (timestamp / 1800) * 1800, AVG(MAX(grid_w, 0))
+                FROM energy_telemetry
+                WHERE timestamp >= ? AND grid_w IS NOT NULL
+                GROUP BY timestamp / 1800
+                ORDER BY 1
+            """, (cutoff,)).fetchall()
+        finally:
+            conn.close()
+
+        hour_starts, imp, exp = zip(*hourly)
+        imp = [v or 0 for v in imp]
+        exp = [v or 0 for v in exp]
+        demand_ts, demand_w = zip(*demand) if demand else (None, None)
+
+        results = []
+        for plan in plans or tuple(PLANS):
+            bill = get_tariff(plan).bill(hour_starts, imp, exp, demand_ts=demand_ts, demand_grid_w=demand_w)
+            results.append(bill)
+        results.sort(key=lambda b: b["total_usd"])
+        return {"days": days, "hours": len(hourly), "cheapest": results[0]["plan"], "plans": results}
+    except Exception as e:
+        log.warning("Failed to compare tariffs: %s", e)
+        return None
+
+
 def get_usage_patterns(days=30):
     """
     Analyze load patterns: peak hours, day-of-week, seasonal.
@@ -560,3 +639,168 @@ def get_recent_daily_trends(days=30):
     except Exception as e:
         log.warning("Failed to fetch daily trends: %s", e)
         return []
+
+
+# ── Analytics result cache ────────────────────────────────────────────────────
+# The analytics endpoints only change when compute_*_aggregates() commit new
+# rows, so results are cached per (endpoint, params) and tagged with the
+# aggregate version they were computed at. A version bump (or CACHE_MAX_AGE_S,
+# since usage patterns also read raw telemetry) marks entries stale: stale
+# entries are still served while one background thread recomputes them.
+# The cache is an LRU of CACHE_MAX_ENTRIES; on a bump only keys requested in
+# the last CACHE_HOT_S are recomputed eagerly, the rest are dropped.
+# With JARVIS_ROLE=ingest|web the aggregator only runs in the ingest process:
+# it publishes each bump on the state bus (on_aggregate_version) and web
+# workers bump their own cache when they see it change.
+
+CACHE_MAX_AGE_S = 900
+CACHE_MAX_ENTRIES = 64
+CACHE_HOT_S = 3600
+
+_agg_version = 0
+_cache = OrderedDict()    # (endpoint, params) → {"fn", "version", "value", "computed_at", "hit_at"}
+_version_listeners = []   # called with each new version (ingest: publish on the state bus)
+_cache_lock = threading.Lock()
+_cache_refreshing = set()
+_cache_inflight = {}      # key → threading.Event for a cold miss being computed, set when it finishes
+_cache_stats = {}         # endpoint → counters
+
+
+def _stats_for(endpoint):
+    st = _cache_stats.get(endpoint)
+    if st is None:
+        st = _cache_stats[endpoint] = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0,
+                                       "compute_ms_total": 0.0, "compute_ms_max": 0.0}
+    return st
+
+
+def _compute_entry(key, fn):
+    endpoint, params = key
+    with _cache_lock:
+        version = _agg_version
+    t0 = time.perf_counter()
+    value = fn(*params)
+    ms = (time.perf_counter() - t0) * 1000
+    with _cache_lock:
+        old = _cache.get(key)
+        now = time.time()
+        _cache[key] = {"fn": fn, "version": version, "value": value, "computed_at": now,
+                       "hit_at": old["hit_at"] if old else now}
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+        st = _stats_for(endpoint)
+        st["compute_ms_total"] += ms
+        st["compute_ms_max"] = max(st["compute_ms_max"], ms)
+    return value
+
+
+def _refresh_keys(keys):
+    try:
+        for key in keys:
+            with _cache_lock:
+                entry = _cache.get(key)
+            if entry is None:
+                continue
+            try:
+                _compute_entry(key, entry["fn"])
+                with _cache_lock:
+                    _stats_for(key[0])["refreshes"] += 1
+            except Exception as e:
+                log.warning("Analytics cache refresh failed for %s: %s", key, e)
+    finally:
+        with _cache_lock:
+            _cache_refreshing.difference_update(keys)
+
+
+def _schedule_refresh(keys):
+    """Recompute `keys` on a background thread; keys already being refreshed are skipped."""
+    with _cache_lock:
+        keys = [k for k in keys if k not in _cache_refreshing]
+        _cache_refreshing.update(keys)
+    if keys:
+        threading.Thread(target=_refresh_keys, args=(keys,), daemon=True, name="analytics-refresh").start()
+
+
+def on_aggregate_version(fn):
+    """Register fn(version), called after every bump_aggregate_version()."""
+    _version_listeners.append(fn)
+
+
+def bump_aggregate_version():
+    """Called after each aggregation commit that wrote rows — re-materializes recently used results."""
+    global _agg_version
+    with _cache_lock:
+        _agg_version += 1
+        version = _agg_version
+        cold_before = time.time() - CACHE_HOT_S
+        for key in [k for k, e in _cache.items() if e["hit_at"] < cold_before]:
+            del _cache[key]
+        keys = list(_cache)
+    _schedule_refresh(keys)
+    for fn in _version_listeners:
+        try:
+            fn(version)
+        except Exception as e:
+            log.warning("Aggregate version listener failed: %s", e)
+
+
+def cached_analytics(endpoint, fn, *params):
+    """
+    Return fn(*params) from the result cache.
+    Fresh → memory. Stale → memory now, recomputed in the background. Missing → computed
+    inline once; concurrent misses for the same key wait for that computation.
+    """
+    key = (endpoint, params)
+    while True:
+        waiter = None
+        with _cache_lock:
+            entry = _cache.get(key)
+            st = _stats_for(endpoint)
+            if entry is not None:
+                entry["hit_at"] = time.time()
+                _cache.move_to_end(key)
+                fresh = entry["version"] == _agg_version and time.time() - entry["computed_at"] < CACHE_MAX_AGE_S
+                st["hits" if fresh else "stale_hits"] += 1
+            else:
+                waiter = _cache_inflight.get(key)
+                if waiter is None:
+                    _cache_inflight[key] = threading.Event()
+                    st["misses"] += 1
+                else:
+                    st["coalesced"] += 1
+        if entry is not None:
+            if not fresh:
+                _schedule_refresh([key])
+            return entry["value"]
+        if waiter is None:
+            try:
+                return _compute_entry(key, fn)
+            finally:
+                with _cache_lock:
+                    done = _cache_inflight.pop(key)
+                done.set()
+        # Another request is computing this key: wait for it, then re-check the cache.
+        # (If it failed there's still no entry, and this request computes on the next pass.)
+        waiter.wait(timeout=60)
+
+
+def analytics_cache_stats():
+    with _cache_lock:
+        endpoints = {}
+        for name, st in _cache_stats.items():
+            lookups = st["hits"] + st["stale_hits"] + st["misses"] + st["coalesced"]
+            computes = st["misses"] + st["refreshes"]
+            endpoints[name] = dict(st,
+                                   hit_rate=round((st["hits"] + st["stale_hits"]) / lookups, 3) if lookups else None,
+                                   compute_ms_avg=round(st["compute_ms_total"] / computes, 2) if computes else None,
+                                   compute_ms_total=round(st["compute_ms_total"], 2),
+                                   compute_ms_max=round(st["compute_ms_max"], 2))
+        return {
+            "aggregate_version": _agg_version,
+            "entries": len(_cache),
+            "max_entries": CACHE_MAX_ENTRIES,
+            "refreshing": len(_cache_refreshing),
+            "inflight": len(_cache_inflight),
+            "endpoints": endpoints,
+        }
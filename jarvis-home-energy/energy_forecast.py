@@ -0,0 +1,326 @@
+"""
+Jarvis Home Energy — Solar & load forecast
+Rolling 24-hour forecast of solar production and home load from energy_hourly,
+refit once an hour by a background thread and served from memory.
+
+Per series, each hour's forecast is a weighted least-squares blend of
+    seasonal profile   solar: same hour of day, ±SOLAR_WINDOW_DAYS day-of-year, all years
+                       load:  same hour of day and weekday/weekend, last LOAD_PROFILE_DAYS
+    persistence        the same hour yesterday
+fit over the last FIT_DAYS (recent days weighted up). The band is the
+10th–90th percentile of that fit's residuals for the hour of day.
+
+History rows are loaded incrementally (only hours newer than the last fit;
+a full reload when older hours changed, e.g. after backfill_analytics.py) and
+every fit is vectorized NumPy over a day × hour matrix, so a refit on years of
+data takes well under a second. Results are written to the energy_forecast
+table (latest forecast per hour — past hours keep the forecast that was
+current when they happened) and kept in memory; get_forecast() is O(1).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from energy_analytics import DB_PATH
+
+log = logging.getLogger("jarvis.forecast")
+
+HORIZON_HOURS = 24
+FIT_DAYS = 28               # regression window
+HALF_LIFE_DAYS = 7          # recency weighting inside the fit window
+SOLAR_WINDOW_DAYS = 15      # ± day-of-year for the solar seasonal profile
+LOAD_PROFILE_DAYS = 56      # trailing window for the load profile
+MIN_HISTORY_DAYS = 3
+REFIT_DELAY_S = 150         # after the hour boundary, once energy_hourly has the new row
+RETENTION_DAYS = 90         # energy_forecast rows kept for forecast-vs-actual comparisons
+
+_lock = threading.Lock()
+_history = {"ts": np.empty(0, np.int64), "day": np.empty(0, np.int64), "hod": np.empty(0, np.int64),
+            "solar": np.empty(0), "load": np.empty(0)}
+_latest = None              # last forecast, as served by /api/analytics/forecast
+_checked_at = 0.0           # last _load_stored() — at most one table read per STORED_RECHECK_S
+STORED_RECHECK_S = 60
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def init_db():
+    """Create the forecast table and load the most recent stored forecast into memory."""
+    conn = _connect()
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS energy_forecast (
+                hour_start INTEGER PRIMARY KEY,  -- forecast hour (Unix epoch)
+                generated_at INTEGER,            -- when this forecast was made
+                solar_kwh REAL, solar_lo REAL, solar_hi REAL,
+                load_kwh REAL, load_lo REAL, load_hi REAL
+            )
+        """)
+        conn.commit()
+    finally:
+        conn.close()
+    _load_stored()
+
+
+def _load_stored():
+    """Serve the stored forecast (processes that don't run the refit loop, e.g. web workers)."""
+    global _latest, _checked_at
+    _checked_at = time.time()
+    now_hour = int(_checked_at) // 3600 * 3600
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT hour_start, generated_at, solar_kwh, solar_lo, solar_hi, load_kwh, load_lo, load_hi "
+            "FROM energy_forecast WHERE hour_start >= ? ORDER BY hour_start LIMIT ?",
+            (now_hour, HORIZON_HOURS)).fetchall()
+    except sqlite3.Error:
+        return
+    finally:
+        conn.close()
+    generated_at = max((r[1] for r in rows), default=0)
+    if rows and (_latest is None or generated_at > _latest["generated_at"]):
+        _latest = _result([dict(zip(("hour_start", "generated_at", "solar_kwh", "solar_lo", "solar_hi",
+                                     "load_kwh", "load_lo", "load_hi"), r)) for r in rows],
+                          generated_at=generated_at, model={"stored": True})
+
+
+# ── History (loaded incrementally) ───────────────────────────────────────────
+
+def _history_changed(conn, last):
+    """True if energy_hourly up to `last` no longer matches memory (backfilled or corrected hours)."""
+    n, solar, load = conn.execute("SELECT COUNT(*), TOTAL(solar_kwh), TOTAL(load_kwh) FROM energy_hourly "
+                                  "WHERE hour_start <= ?", (last,)).fetchone()
+    return (n != len(_history["ts"]) or not np.isclose(solar, _history["solar"].sum())
+            or not np.isclose(load, _history["load"].sum()))
+
+
+def _load_new_history():
+    """
+    Append energy_hourly rows newer than what's in memory. Returns the number of new rows.
+    If hours already in memory were inserted or rewritten since, everything is reloaded.
+    """
+    last = int(_history["ts"][-1]) if len(_history["ts"]) else 0
+    conn = _connect()
+    try:
+        if last and _history_changed(conn, last):
+            log.info("Forecast: energy_hourly changed before %s, reloading history",
+                     datetime.fromtimestamp(last).isoformat(timespec="minutes"))
+            for k, v in _history.items():
+                _history[k] = v[:0]
+            last = 0
+        rows = conn.execute("SELECT hour_start, solar_kwh, load_kwh FROM energy_hourly WHERE hour_start > ? "
+                            "ORDER BY hour_start", (last,)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return 0
+    ts = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+    local = [time.localtime(t) for t in ts.tolist()]
+    new = {
+        "ts": ts,
+        "day": np.fromiter((date(lt.tm_year, lt.tm_mon, lt.tm_mday).toordinal() for lt in local), np.int64, len(rows)),
+        "hod": np.fromiter((lt.tm_hour for lt in local), np.int64, len(rows)),
+        "solar": np.array([r[1] or 0.0 for r in rows]),
+        "load": np.array([r[2] or 0.0 for r in rows]),
+    }
+    for k, v in new.items():
+        _history[k] = np.concatenate((_history[k], v))
+    return len(rows)
+
+
+def _matrices():
+    """(first day ordinal, solar[day, hour], load[day, hour]) with NaN for missing hours."""
+    first = int(_history["day"][0])
+    ndays = int(_history["day"][-1]) - first + 1
+    solar = np.full((ndays, 24), np.nan)
+    load = np.full((ndays, 24), np.nan)
+    d = _history["day"] - first
+    solar[d, _history["hod"]] = _history["solar"]
+    load[d, _history["hod"]] = _history["load"]
+    return first, solar, load
+
+
+# ── Model ─────────────────────────────────────────────────────────────────────
+
+def _solar_profile(solar, ordinals, doy, target):
+    """Mean solar by hour over every year's days within ±SOLAR_WINDOW_DAYS of target's day-of-year."""
+    t_doy = date.fromordinal(int(target)).timetuple().tm_yday
+    dist = np.abs(doy - t_doy)
+    mask = (np.minimum(dist, 366 - dist) <= SOLAR_WINDOW_DAYS) & (ordinals != target)
+    if not mask.any():
+        return np.zeros(24)
+    return np.nan_to_num(np.nanmean(solar[mask], axis=0)) if np.isfinite(solar[mask]).any() else np.zeros(24)
+
+
+def _load_profile(load, ordinals, is_weekend, target):
+    """Mean load by hour over the trailing LOAD_PROFILE_DAYS with the same weekday/weekend type."""
+    weekend = date.fromordinal(int(target)).weekday() >= 5
+    mask = (ordinals < target) & (ordinals >= target - LOAD_PROFILE_DAYS) & (is_weekend == weekend)
+    if not mask.any():
+        mask = (ordinals < target) & (ordinals >= target - LOAD_PROFILE_DAYS)
+    if not mask.any() or not np.isfinite(load[mask]).any():
+        return np.zeros(24)
+    return np.nan_to_num(np.nanmean(load[mask], axis=0))
+
+
+def _fit(y, base, lag, weights, daylight=None):
+    """Weighted least squares y ≈ c0 + c1·base + c2·lag. Returns (coef, residual lo/hi per hour)."""
+    ok = np.isfinite(y) & np.isfinite(lag)
+    if daylight is not None:
+        ok &= daylight
+    if ok.sum() < 12:
+        return np.array([0.0, 1.0, 0.0]), np.zeros(24), np.zeros(24)
+    X = np.stack([np.ones(ok.sum()), base[ok], lag[ok]], axis=1)
+    sw = np.sqrt(weights[ok])
+    coef = np.linalg.lstsq(X * sw[:, None], y[ok] * sw, rcond=None)[0]
+    resid = np.full(y.shape, np.nan)
+    resid[ok] = y[ok] - X @ coef
+    lo = np.zeros(24)
+    hi = np.zeros(24)
+    all_lo, all_hi = np.nanpercentile(resid[ok], [10, 90])
+    for h in range(24):
+        r = resid[:, h][np.isfinite(resid[:, h])]
+        lo[h], hi[h] = np.percentile(r, [10, 90]) if len(r) >= 5 else (all_lo, all_hi)
+    return coef, lo, hi
+
+
+def _forecast(now=None):
+    now = int(now or time.time())
+    first, solar, load = _matrices()
+    ordinals = np.arange(first, first + solar.shape[0])
+    if solar.shape[0] < MIN_HISTORY_DAYS:
+        return None
+    days = [date.fromordinal(int(o)) for o in ordinals]
+    doy = np.array([d.timetuple().tm_yday for d in days])
+    is_weekend = np.array([d.weekday() >= 5 for d in days])
+
+    # Fit window: the last FIT_DAYS complete-or-partial days, each with its own (leave-one-out) profile
+    today = datetime.fromtimestamp(now).date().toordinal()
+    fit_days = [o for o in range(today - FIT_DAYS, today) if first < o <= ordinals[-1]]
+    if len(fit_days) < MIN_HISTORY_DAYS - 1:
+        return None
+    rows = np.array(fit_days) - first
+    age = today - np.array(fit_days)
+    w = np.repeat((0.5 ** (age / HALF_LIFE_DAYS))[:, None], 24, axis=1)
+    s_base = np.stack([_solar_profile(solar, ordinals, doy, o) for o in fit_days])
+    l_base = np.stack([_load_profile(load, ordinals, is_weekend, o) for o in fit_days])
+    s_coef, s_lo, s_hi = _fit(solar[rows], s_base, solar[rows - 1], w, daylight=s_base > 0.005)
+    l_coef, l_lo, l_hi = _fit(load[rows], l_base, load[rows - 1], w)
+
+    # Next HORIZON_HOURS, starting with the current (not yet aggregated) hour
+    hour0 = now // 3600 * 3600
+    profiles = {}
+    hours = []
+    for i in range(HORIZON_HOURS):
+        hs = hour0 + i * 3600
+        lt = time.localtime(hs)
+        o, h = date(lt.tm_year, lt.tm_mon, lt.tm_mday).toordinal(), lt.tm_hour
+        if o not in profiles:
+            profiles[o] = (_solar_profile(solar, ordinals, doy, o), _load_profile(load, ordinals, is_weekend, o))
+        sp, lp = profiles[o]
+        yday = o - 1 - first
+        s_lag = solar[yday, h] if 0 <= yday < solar.shape[0] and np.isfinite(solar[yday, h]) else sp[h]
+        l_lag = load[yday, h] if 0 <= yday < load.shape[0] and np.isfinite(load[yday, h]) else lp[h]
+        if sp[h] > 0.005:
+            s = s_coef[0] + s_coef[1] * sp[h] + s_coef[2] * s_lag
+            s_band = (max(0.0, s + s_lo[h]), max(0.0, s + s_hi[h]))
+            s = max(0.0, s)
+        else:
+            s, s_band = 0.0, (0.0, 0.0)
+        ld = max(0.0, l_coef[0] + l_coef[1] * lp[h] + l_coef[2] * l_lag)
+        hours.append({
+            "hour_start": hs,
+            "solar_kwh": s, "solar_lo": s_band[0], "solar_hi": s_band[1],
+            "load_kwh": ld, "load_lo": max(0.0, ld + l_lo[h]), "load_hi": max(0.0, ld + l_hi[h]),
+        })
+    model = {
+        "history_hours": int(len(_history["ts"])),
+        "fit_days": len(fit_days),
+        "solar_coef": [round(float(c), 4) for c in s_coef],
+        "load_coef": [round(float(c), 4) for c in l_coef],
+    }
+    return hours, model
+
+
+def _result(hours, generated_at, model):
+    out = []
+    for hr in hours:
+        d = {k: (round(float(v), 3) if k.endswith(("_kwh", "_lo", "_hi")) else v) for k, v in hr.items()
+             if k != "generated_at"}
+        d["net_kwh"] = round(d["load_kwh"] - d["solar_kwh"], 3)   # + draws from battery/grid
+        out.append(d)
+    return {
+        "generated_at": int(generated_at),
+        "horizon_hours": len(out),
+        "band": "p10-p90",
+        "hours": out,
+        "totals": {k: round(sum(h[k] for h in out), 2) for k in ("solar_kwh", "load_kwh", "net_kwh")},
+        "model": model,
+    }
+
+
+def _store(hours, generated_at):
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO energy_forecast (hour_start, generated_at, solar_kwh, solar_lo, solar_hi, "
+                "load_kwh, load_lo, load_hi) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(h["hour_start"], generated_at, h["solar_kwh"], h["solar_lo"], h["solar_hi"],
+                  h["load_kwh"], h["load_lo"], h["load_hi"]) for h in hours])
+            conn.execute("DELETE FROM energy_forecast WHERE hour_start < ?",
+                         (generated_at - RETENTION_DAYS * 86400,))
+    finally:
+        conn.close()
+
+
+def refit(now=None):
+    """Load new history, refit both series and publish a fresh forecast. Returns it (or None)."""
+    global _latest
+    t0 = time.perf_counter()
+    with _lock:
+        added = _load_new_history()
+        if not len(_history["ts"]):
+            return None
+        fc = _forecast(now)
+    if fc is None:
+        log.info("Forecast: not enough history yet (%d hours)", len(_history["ts"]))
+        return None
+    hours, model = fc
+    generated_at = int(now or time.time())
+    model["fit_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    model["new_rows"] = added
+    result = _result(hours, generated_at, model)
+    _store(result["hours"], generated_at)
+    _latest = result
+    log.info("Forecast refit in %.0f ms: next 24h solar %.1f kWh, load %.1f kWh",
+             model["fit_ms"], result["totals"]["solar_kwh"], result["totals"]["load_kwh"])
+    return result
+
+
+def get_forecast():
+    """The current forecast from memory (None until the first fit). Re-reads the table only once it's over an hour old."""
+    if (_latest is None or time.time() - _latest["generated_at"] > 3600 + REFIT_DELAY_S) \
+            and time.time() - _checked_at > STORED_RECHECK_S:
+        _load_stored()
+    return _latest
+
+
+def forecast_loop():
+    """Background thread: refit now, then shortly after every hour boundary."""
+    while True:
+        try:
+            refit()
+        except Exception as e:
+            log.warning("Forecast refit failed: %s", e)
+        now = time.time()
+        time.sleep(max(30.0, (now // 3600 + 1) * 3600 + REFIT_DELAY_S - now))
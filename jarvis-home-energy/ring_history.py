@@ -0,0 +1,227 @@
+"""
+Jarvis Home Energy — Ring event history
+Append-only SQLite log of Ring doorbell events (ding / motion / on_demand) so
+history survives restarts and reaches back further than Ring's last ~30 events.
+
+    ring_events        one row per Ring event id, indexed by (created_at) and (kind, created_at)
+    ring_event_daily   per local day × kind counts, maintained in the same transaction
+
+The poller hands every /history response to record_events(); ids already seen
+are skipped in memory, so a steady-state poll does no writes. Reads use keyset
+pagination on (created_at, id) — any page is an index range scan.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+log = logging.getLogger("jarvis.ring")
+
+DB_PATH = Path(__file__).parent / "ring_history.db"
+KINDS = ("ding", "motion", "on_demand")
+MAX_PAGE = 500
+MAX_DAYS = 365
+_RECENT_IDS = 500        # ids remembered in memory to skip re-inserting the same page
+
+_write_lock = threading.Lock()
+_known_ids: dict = {}     # event id → recording_ready (recent events only)
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def init_db():
+    """Create the event log schema if needed and load recent ids."""
+    with _write_lock:
+        conn = _connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ring_events (
+                id TEXT PRIMARY KEY,       -- Ring event id
+                created_at INTEGER,        -- Unix epoch seconds
+                created_iso TEXT,          -- as reported by Ring
+                kind TEXT,                 -- ding / motion / on_demand
+                device TEXT,
+                answered BOOLEAN,
+                duration REAL,
+                recording_ready BOOLEAN,
+                raw TEXT                   -- original event JSON
+            );
+            CREATE INDEX IF NOT EXISTS idx_ring_events_time ON ring_events(created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_ring_events_kind_time ON ring_events(kind, created_at, id);
+
+            CREATE TABLE IF NOT EXISTS ring_event_daily (
+                day TEXT,                  -- local date YYYY-MM-DD
+                kind TEXT,
+                count INTEGER,
+                PRIMARY KEY (day, kind)
+            );
+        """)
+        rows = conn.execute(
+            "SELECT id, recording_ready FROM ring_events ORDER BY created_at DESC LIMIT ?", (_RECENT_IDS,)
+        ).fetchall()
+        conn.close()
+        _known_ids.clear()
+        _known_ids.update((r[0], bool(r[1])) for r in reversed(rows))
+    log.info("Ring history database initialized: %s (%d recent events)", DB_PATH, len(rows))
+
+
+def _parse_ts(created):
+    try:
+        return int(datetime.fromisoformat(str(created).replace("Z", "+00:00")).timestamp())
+    except (TypeError, ValueError):
+        return int(time.time())
+
+
+def _row(evt):
+    created_at = _parse_ts(evt.get("created_at"))
+    return (
+        str(evt.get("id", "")),
+        created_at,
+        evt.get("created_at") or datetime.fromtimestamp(created_at).isoformat(),
+        evt.get("kind", ""),
+        (evt.get("doorbot") or {}).get("description") or "",
+        bool(evt.get("answered", False)),
+        float(evt.get("duration") or 0),
+        (evt.get("recording") or {}).get("status") == "ready",
+        json.dumps(evt, separators=(",", ":"), default=str),
+    )
+
+
+def record_events(events):
+    """
+    Append new events from a Ring /history response (newest first).
+    Returns the number of rows inserted. Recording status is updated in place
+    for known events whose clip became ready since they were logged.
+    """
+    new_rows, ready_ids = [], []
+    for evt in events or ():
+        eid = str(evt.get("id", ""))
+        if not eid:
+            continue
+        ready = (evt.get("recording") or {}).get("status") == "ready"
+        if eid in _known_ids:
+            if ready and not _known_ids[eid]:
+                ready_ids.append(eid)
+            continue
+        new_rows.append(_row(evt))
+    if not new_rows and not ready_ids:
+        return 0
+
+    inserted = 0
+    with _write_lock:
+        conn = _connect()
+        try:
+            with conn:
+                for row in new_rows:
+                    cur = conn.execute(
+                        "INSERT OR IGNORE INTO ring_events (id, created_at, created_iso, kind, device, answered, "
+                        "duration, recording_ready, raw) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                    if cur.rowcount:
+                        inserted += 1
+                        conn.execute(
+                            "INSERT INTO ring_event_daily (day, kind, count) VALUES (?, ?, 1) "
+                            "ON CONFLICT(day, kind) DO UPDATE SET count = count + 1",
+                            (datetime.fromtimestamp(row[1]).strftime("%Y-%m-%d"), row[3]))
+                if ready_ids:
+                    conn.executemany("UPDATE ring_events SET recording_ready = 1 WHERE id = ?",
+                                     [(i,) for i in ready_ids])
+        finally:
+            conn.close()
+        for row in new_rows:
+            _known_ids[row[0]] = row[7]
+        for eid in ready_ids:
+            _known_ids[eid] = True
+        while len(_known_ids) > _RECENT_IDS:
+            del _known_ids[next(iter(_known_ids))]
+    if inserted:
+        log.info("Ring history: logged %d new event(s)", inserted)
+    return inserted
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def encode_cursor(created_at, eid):
+    return f"{created_at}:{eid}"
+
+
+def _decode_cursor(before):
+    """`before` may be a cursor from a previous page, epoch seconds, or an ISO timestamp."""
+    if before is None or before == "":
+        return None
+    ts, sep, eid = str(before).partition(":")
+    if sep and ts.isdigit():
+        return int(ts), eid
+    try:
+        return int(float(before)), None
+    except ValueError:
+        return _parse_ts(before), None
+
+
+def query_events(before=None, kind=None, limit=30):
+    """
+    One page of events, newest first. Returns (events, next_cursor); pass
+    next_cursor back as `before` for the following page (None when exhausted).
+    """
+    limit = max(1, min(int(limit), MAX_PAGE))
+    where, args = [], []
+    if kind:
+        where.append("kind = ?")
+        args.append(kind)
+    cur = _decode_cursor(before)
+    if cur is not None:
+        ts, eid = cur
+        if eid is None:
+            where.append("created_at < ?")
+            args.append(ts)
+        else:
+            where.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            args += [ts, ts, eid]
+    sql = ("SELECT id, created_at, created_iso, kind, device, answered, duration, recording_ready "
+           "FROM ring_events" + (" WHERE " + " AND ".join(where) if where else "") +
+           " ORDER BY created_at DESC, id DESC LIMIT ?")
+    conn = _connect()
+    try:
+        rows = conn.execute(sql, args + [limit + 1]).fetchall()
+    finally:
+        conn.close()
+    events = [{
+        "id": r[0],
+        "kind": r[3],
+        "created_at": r[2],
+        "ts": r[1],
+        "device": r[4],
+        "answered": bool(r[5]),
+        "duration": r[6] or 0,
+        "recording_ready": bool(r[7]),
+    } for r in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+    return events, next_cursor
+
+
+def daily_counts(days=30, kind=None):
+    """Per-day event counts for the last `days` local days: [{date, ding, motion, on_demand, total}]."""
+    start = (datetime.now() - timedelta(days=max(1, min(int(days), MAX_DAYS)) - 1)).strftime("%Y-%m-%d")
+    sql = "SELECT day, kind, count FROM ring_event_daily WHERE day >= ?"
+    args = [start]
+    if kind:
+        sql += " AND kind = ?"
+        args.append(kind)
+    conn = _connect()
+    try:
+        rows = conn.execute(sql + " ORDER BY day", args).fetchall()
+    finally:
+        conn.close()
+    by_day = {}
+    for day, k, n in rows:
+        d = by_day.setdefault(day, {"date": day, **{kk: 0 for kk in KINDS}, "total": 0})
+        d[k] = d.get(k, 0) + n
+        d["total"] += n
+    return list(by_day.values())
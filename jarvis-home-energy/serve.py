@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Jarvis Home Energy — multi-worker launcher
+Runs one ingest process (all device pollers, publishes to the shared-memory
+state bus) plus N stateless web workers that accept on a shared listening
+socket and serve /api/*, SSE and camera frames from the bus. Devices are still
+polled exactly once; serving throughput scales with cores.
+
+Usage:
+    python serve.py                 # workers = CPU count
+    python serve.py --workers 4
+
+The single-process `python app.py` remains the default deployment.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from state_bus import StateBus  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                    datefmt="%Y-%m-%d %H:%M:%S")
+log = logging.getLogger("jarvis.serve")
+
+APP = str(Path(__file__).parent / "app.py")
+
+
+def _dashboard_port():
+    try:
+        from config import DASHBOARD_PORT
+        return DASHBOARD_PORT
+    except ImportError:
+        return 8793
+
+
+def _wait_for_bus(prefix, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            StateBus(prefix).close()
+            return True
+        except FileNotFoundError:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run Jarvis as ingest + N web workers")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--port", type=int, default=_dashboard_port())
+    ap.add_argument("--control-port", type=int, default=int(os.environ.get("JARVIS_CONTROL_PORT", "8794")))
+    ap.add_argument("--bus", default=os.environ.get("JARVIS_BUS_PREFIX", "jarvis"))
+    args = ap.parse_args()
+
+    env = dict(os.environ, JARVIS_CONTROL_PORT=str(args.control_port), JARVIS_BUS_PREFIX=args.bus)
+    ingest = subprocess.Popen([sys.executable, APP], env=dict(env, JARVIS_ROLE="ingest"))
+    if not _wait_for_bus(args.bus):
+        ingest.terminate()
+        sys.exit("ingest process did not create the state bus")
+    log.info("Ingest process %d up (bus=%s, control=127.0.0.1:%d)", ingest.pid, args.bus, args.control_port)
+
+    # Pre-fork style: one listening socket, every worker accept()s on it
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("0.0.0.0", args.port))
+    sock.listen(512)
+    sock.set_inheritable(True)
+    web_env = dict(env, JARVIS_ROLE="web", JARVIS_LISTEN_FD=str(sock.fileno()))
+
+    def _spawn_worker():
+        return subprocess.Popen([sys.executable, APP], env=web_env, pass_fds=(sock.fileno(),))
+
+    workers = [_spawn_worker() for _ in range(args.workers)]
+    log.info("%d web worker(s) on :%d", len(workers), args.port)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    try:
+        while not stopping:
+            time.sleep(1)
+            if ingest.poll() is not None:
+                log.error("Ingest process exited (%s) — shutting down", ingest.returncode)
+                break
+            for i, w in enumerate(workers):
+                if w.poll() is not None:
+                    log.warning("Web worker %d exited (%s) — respawning", w.pid, w.returncode)
+                    workers[i] = _spawn_worker()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in workers + [ingest]:
+            p.terminate()
+        for p in workers + [ingest]:
+            try:
+                p.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
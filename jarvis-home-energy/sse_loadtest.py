@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Jarvis Home Energy — SSE fan-out load test
+Opens hundreds of simulated tablets against /api/stream and measures how the
+one-queue-per-client broadcast in app.py holds up.
+
+The server runs in a child process (so its CPU/RSS can be read from /proc)
+with a synthetic _state and no device pollers. A broadcaster thread stamps
+_state["ts"] / _state["bench_seq"] and calls app._broadcast_sse() at a fixed
+rate, exactly like _poll_loop does after each tick. Client threads are spread
+over a few worker processes so the load generator's GIL isn't the bottleneck.
+
+Usage:
+    python sse_loadtest.py --clients 200 --duration 30
+    python sse_loadtest.py --clients 50,100,200,400 --interval 1 --slow-fraction 0.1
+    python sse_loadtest.py --clients 200 --compare bench_results/sse-20260301-120000.json
+
+Report (JSON) per client count:
+    latency_ms      p50 / p90 / p99 / max of broadcast → client receive
+    events          expected, delivered, dropped (seq gaps), evicted clients
+    server          RSS baseline / loaded, RSS per client, CPU % of one core
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "bench_results"
+POLL_INTERVAL_DEFAULT = 1.0
+_TS_RE = re.compile(rb'"ts":\s*([0-9.]+)')
+_SEQ_RE = re.compile(rb'"bench_seq":\s*(\d+)')
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# ── Synthetic server ──────────────────────────────────────────────────────────
+
+def _synthetic_state(n_circuits=32):
+    """A _state shaped like a busy house — sized so payloads match production (~10-20 KB)."""
+    rnd = random.Random(42)
+    circuits = []
+    for i in range(n_circuits):
+        pwr = -rnd.uniform(0, 2500)
+        circuits.append({
+            "id": f"circuit-{i:02d}-{rnd.getrandbits(64):016x}",
+            "name": f"Circuit {i}",
+            "power_w": round(pwr, 0),
+            "relay": "CLOSED",
+            "priority": "MUST_HAVE",
+            "sheddable": False,
+            "color": "green" if abs(pwr) < 200 else ("yellow" if abs(pwr) < 1500 else "red"),
+        })
+    now = time.time()
+    return {
+        "ts": now,
+        "span": {"status": "online", "door": "CLOSED", "uptime": 123456, "grid_power": 1850.0,
+                 "enphase_w": 3200.0, "solaredge_w": 2100.0, "circuits": circuits, "last_seen": now},
+        "enphase": {"status": "online", "production_w": 3200, "consumption_w": 0, "net_w": 0,
+                    "firmware": "D8.3.5167", "last_seen": now},
+        "pentair": {"status": "online", "pool": {"temp_f": 82, "setpoint_f": 84, "on": True},
+                    "spa": {"temp_f": 80, "setpoint_f": 102, "on": False},
+                    "pump": {"rpm": 2400, "power_w": 850, "on": True}, "heater": {"mode": "off"},
+                    "circuits": [{"objnam": f"C{i:04d}", "name": f"Aux {i}", "on": bool(i % 2)} for i in range(12)],
+                    "last_seen": now},
+        "tesla": {"status": "online", "soe": 87.5, "solar_w": 5300, "battery_w": -1200, "grid_w": 1850,
+                  "load_w": 5950, "last_seen": now},
+        "wall_connector": {"status": "online", "vehicle_connected": True, "charging_w": 7600,
+                           "session_energy_wh": 12400, "grid_v": 241, "pcba_temp_c": 41, "last_seen": now},
+        "summary": {"solar_w": 5300, "load_w": 4100, "battery_w": -1200, "grid_w": 1850, "net_savings_today": 0},
+        "cameras": [{"name": f"Cam {i}", "mac": f"2C:AA:8E:00:00:{i:02X}", "type": "wyze", "status": "online",
+                     "last_seen": now, "last_motion": now - 600, "snapshot_path": f"/api/camera/{i}/snapshot"}
+                    for i in range(4)],
+        "nest": {"status": "online", "temp_f": 76, "setpoint_f": 78, "mode": "COOL", "hvac_state": "cooling",
+                 "humidity": 31, "last_seen": now},
+        "bhyve": {"status": "online", "devices": [{"id": "bhyve-1", "name": "Front Yard"}],
+                  "zones": [{"station": i, "name": f"Zone {i}", "watering": False} for i in range(1, 9)],
+                  "last_seen": now},
+        "ge_appliances": {"status": "online", "appliances": [
+            {"id": f"ge-{i}", "name": n, "state": "idle", "services": {"cycle": "none", "remaining": ""}}
+            for i, n in enumerate(("Washer", "Dryer", "Dishwasher", "Oven", "Fridge"))], "last_seen": now},
+        "myq": {"status": "online", "doors": [{"serial": "CG0000000001", "name": "Garage", "state": "closed"}],
+                "last_seen": now},
+        "roku": [{"ip": f"192.168.68.{100 + i}", "name": f"Roku {i}", "active_app": "Home"} for i in range(3)],
+    }
+
+
+def _serve(port, interval, n_circuits):
+    """Child-process entry point: app.py's Flask app + synthetic broadcaster, no pollers."""
+    sys.path.insert(0, str(Path(__file__).parent))
+    import logging
+    import app as jarvis
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    with jarvis._state_lock:
+        jarvis._state.clear()
+        jarvis._state.update(_synthetic_state(n_circuits))
+        jarvis._state["bench_seq"] = 0
+
+    stats = {"seq": 0, "broadcasts": 0, "evicted": 0, "subscribers": 0, "max_subscribers": 0,
+             "payload_bytes": 0, "broadcast_ms_total": 0.0, "broadcast_ms_max": 0.0}
+
+    def _broadcaster():
+        rnd = random.Random(7)
+        while True:
+            time.sleep(interval)
+            with jarvis._state_lock:
+                for c in jarvis._state["span"]["circuits"]:
+                    c["power_w"] = round(-rnd.uniform(0, 2500), 0)
+                stats["seq"] += 1
+                jarvis._state["bench_seq"] = stats["seq"]
+                jarvis._state["ts"] = time.time()
+            with jarvis._sse_lock:
+                before = len(jarvis._sse_subscribers)
+            t0 = time.perf_counter()
+            jarvis._broadcast_sse()
+            dt = (time.perf_counter() - t0) * 1000
+            with jarvis._sse_lock:
+                after = len(jarvis._sse_subscribers)
+            stats["broadcasts"] += 1
+            stats["evicted"] += max(0, before - after)
+            stats["subscribers"] = after
+            stats["max_subscribers"] = max(stats["max_subscribers"], after)
+            stats["broadcast_ms_total"] += dt
+            stats["broadcast_ms_max"] = max(stats["broadcast_ms_max"], dt)
+
+    @jarvis.app.route("/_bench/stats")
+    def _bench_stats():
+        with jarvis._state_lock:
+            stats["payload_bytes"] = len(json.dumps(jarvis._state))
+        with jarvis._sse_lock:
+            stats["subscribers"] = len(jarvis._sse_subscribers)
+        return jarvis.jsonify(stats)
+
+    threading.Thread(target=_broadcaster, daemon=True, name="bench-broadcast").start()
+    server = make_server("127.0.0.1", port, jarvis.app, threaded=True)
+    print("READY", flush=True)
+    server.serve_forever()
+
+
+# ── /proc sampling ────────────────────────────────────────────────────────────
+
+def _proc_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK  # utime + stime
+
+
+def _proc_rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _proc_threads(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("Threads:"):
+                return int(line.split()[1])
+    return 0
+
+
+# ── Simulated tablets ─────────────────────────────────────────────────────────
+
+def _client(port, stop_at, slow_s, out):
+    """One tablet: raw-socket SSE reader recording (seq, latency) for every event."""
+    rec = {"latencies": [], "seqs": [], "error": None, "connect_ms": None}
+    out.append(rec)
+    t0 = time.perf_counter()
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+        sock.sendall(b"GET /api/stream HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n")
+        sock.settimeout(1.0)
+        buf = b""
+        while time.time() < stop_at:
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                rec["error"] = "closed"
+                break
+            buf += chunk
+            while b"\n\n" in buf:
+                event, buf = buf.split(b"\n\n", 1)
+                recv_ts = time.time()
+                if rec["connect_ms"] is None:
+                    rec["connect_ms"] = (time.perf_counter() - t0) * 1000
+                idx = event.find(b"data: ")
+                if idx < 0:
+                    continue  # keepalive / headers
+                seq_m = _SEQ_RE.search(event)
+                ts_m = _TS_RE.search(event)
+                if not seq_m or not ts_m:
+                    continue
+                seq = int(seq_m.group(1))
+                if seq == 0 or (rec["seqs"] and seq <= rec["seqs"][-1]):
+                    continue  # initial snapshot / replayed state
+                rec["seqs"].append(seq)
+                rec["latencies"].append((recv_ts - float(ts_m.group(1))) * 1000)
+                if slow_s:
+                    time.sleep(slow_s)
+        sock.close()
+    except Exception as e:
+        rec["error"] = type(e).__name__
+
+
+def _client_worker(port, n_clients, slow_clients, slow_s, ramp_s, stop_at, result_q):
+    """Worker process: runs n_clients tablet threads and ships their records back."""
+    records, threads = [], []
+    for i in range(n_clients):
+        t = threading.Thread(target=_client, daemon=True,
+                             args=(port, stop_at, slow_s if i < slow_clients else 0, records))
+        t.start()
+        threads.append(t)
+        if ramp_s:
+            time.sleep(ramp_s / max(n_clients, 1))
+    for t in threads:
+        t.join(timeout=max(0.0, stop_at - time.time()) + 5)
+    result_q.put(records)
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def _percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return None
+    k = min(len(sorted_vals) - 1, max(0, int(round(pct / 100.0 * (len(sorted_vals) - 1)))))
+    return round(sorted_vals[k], 2)
+
+
+def _fetch_stats(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_bench/stats", timeout=10) as r:
+        return json.loads(r.read())
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_scenario(n_clients, args):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(port),
+         "--interval", str(args.interval), "--circuits", str(args.circuits)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        if server.stdout.readline().strip() != "READY":
+            raise RuntimeError("benchmark server failed to start")
+        time.sleep(0.5)
+        rss_base = _proc_rss_kb(server.pid)
+
+        procs = max(1, min(args.client_procs, n_clients))
+        per_proc = [n_clients // procs + (1 if i < n_clients % procs else 0) for i in range(procs)]
+        n_slow = int(round(n_clients * args.slow_fraction))
+        slow_per_proc = [n_slow // procs + (1 if i < n_slow % procs else 0) for i in range(procs)]
+
+        stop_at = time.time() + args.ramp + args.duration
+        result_q = mp.Queue()
+        workers = [
+            mp.Process(target=_client_worker,
+                       args=(port, per_proc[i], slow_per_proc[i], args.slow_ms / 1000.0,
+                             args.ramp, stop_at, result_q), daemon=True)
+            for i in range(procs)
+        ]
+        for w in workers:
+            w.start()
+
+        # Measure only the steady-state window, once every client is connected
+        time.sleep(args.ramp)
+        seq_start = _fetch_stats(port)["seq"]
+        cpu_start, wall_start = _proc_cpu_seconds(server.pid), time.time()
+        rss_peak = _proc_rss_kb(server.pid)
+        threads_peak = _proc_threads(server.pid)
+        while time.time() < stop_at:
+            time.sleep(min(1.0, max(0.0, stop_at - time.time())))
+            rss_peak = max(rss_peak, _proc_rss_kb(server.pid))
+            threads_peak = max(threads_peak, _proc_threads(server.pid))
+        cpu_end, wall_end = _proc_cpu_seconds(server.pid), time.time()
+        srv = _fetch_stats(port)
+
+        records = []
+        for _ in workers:
+            records.extend(result_q.get(timeout=args.duration + 60))
+        for w in workers:
+            w.join(timeout=5)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    seq_end = srv["seq"]
+    expected_per_client = max(0, seq_end - seq_start)
+    latencies, delivered, dropped, evicted_clients, errors = [], 0, 0, 0, {}
+    for rec in records:
+        window = [(s, l) for s, l in zip(rec["seqs"], rec["latencies"]) if seq_start < s <= seq_end]
+        latencies.extend(l for _, l in window)
+        delivered += len(window)
+        dropped += expected_per_client - len(window)
+        if not window or window[-1][0] < seq_end - 2:
+            evicted_clients += 1  # stopped receiving — queue overflowed and server unsubscribed it
+        if rec["error"]:
+            errors[rec["error"]] = errors.get(rec["error"], 0) + 1
+    latencies.sort()
+    expected = expected_per_client * n_clients
+    connect = sorted(r["connect_ms"] for r in records if r["connect_ms"] is not None)
+    wall = max(wall_end - wall_start, 1e-9)
+
+    return {
+        "clients": n_clients,
+        "slow_clients": n_slow,
+        "connected": len(connect),
+        "connect_ms": {"p50": _percentile(connect, 50), "p99": _percentile(connect, 99)},
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": round(latencies[-1], 2) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        },
+        "events": {
+            "broadcasts": expected_per_client,
+            "expected": expected,
+            "delivered": delivered,
+            "dropped": dropped,
+            "drop_pct": round(dropped / expected * 100, 3) if expected else 0.0,
+            "evicted_clients": evicted_clients,
+            "server_evictions": srv["evicted"],
+        },
+        "server": {
+            "payload_bytes": srv["payload_bytes"],
+            "rss_base_kb": rss_base,
+            "rss_peak_kb": rss_peak,
+            "rss_per_client_kb": round((rss_peak - rss_base) / max(n_clients, 1), 1),
+            "threads_peak": threads_peak,
+            "cpu_pct": round((cpu_end - cpu_start) / wall * 100, 1),
+            "broadcast_ms_avg": round(srv["broadcast_ms_total"] / max(srv["broadcasts"], 1), 3),
+            "broadcast_ms_max": round(srv["broadcast_ms_max"], 3),
+        },
+        "client_errors": errors,
+    }
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _compare(report, baseline_path):
+    """Print a side-by-side of key metrics against a previous report."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    prev = {s["clients"]: s for s in baseline.get("scenarios", [])}
+    print(f"\nvs {baseline_path} (rev {baseline.get('git_rev')})")
+    print(f"{'clients':>8} {'p99 ms':>16} {'drop %':>14} {'RSS/client KB':>18} {'CPU %':>14}")
+    for s in report["scenarios"]:
+        p = prev.get(s["clients"])
+        if not p:
+            continue
+        print(f"{s['clients']:>8} "
+              f"{str(p['latency_ms']['p99']) + '→' + str(s['latency_ms']['p99']):>16} "
+              f"{str(p['events']['drop_pct']) + '→' + str(s['events']['drop_pct']):>14} "
+              f"{str(p['server']['rss_per_client_kb']) + '→' + str(s['server']['rss_per_client_kb']):>18} "
+              f"{str(p['server']['cpu_pct']) + '→' + str(s['server']['cpu_pct']):>14}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SSE fan-out load test for /api/stream")
+    ap.add_argument("--clients", default="50,100,200", help="comma-separated client counts (one scenario each)")
+    ap.add_argument("--duration", type=float, default=20.0, help="steady-state seconds per scenario")
+    ap.add_argument("--ramp", type=float, default=3.0, help="seconds to connect all clients before measuring")
+    ap.add_argument("--interval", type=float, default=POLL_INTERVAL_DEFAULT,
+                    help="seconds between broadcasts (app.py polls every 5s; lower = stress)")
+    ap.add_argument("--circuits", type=int, default=32, help="SPAN circuits in the synthetic state")
+    ap.add_argument("--slow-fraction", type=float, default=0.0, help="fraction of clients that read slowly")
+    ap.add_argument("--slow-ms", type=float, default=2000.0, help="per-event stall for slow clients")
+    ap.add_argument("--client-procs", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)))
+    ap.add_argument("--out", help="report path (default bench_results/sse-<timestamp>.json)")
+    ap.add_argument("--compare", help="previous report to diff against")
+    ap.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.serve:
+        _serve(args.port, args.interval, args.circuits)
+        return
+
+    report = {
+        "benchmark": "sse_fanout",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "host": {"python": sys.version.split()[0], "cpus": os.cpu_count(), "platform": sys.platform},
+        "config": {k: v for k, v in vars(args).items() if k not in ("serve", "port", "out", "compare")},
+        "scenarios": [],
+    }
+    for n in (int(x) for x in args.clients.split(",") if x.strip()):
+        print(f"── {n} clients ({args.duration:.0f}s, every {args.interval}s) ...", flush=True)
+        s = run_scenario(n, args)
+        report["scenarios"].append(s)
+        print(f"   latency p50={s['latency_ms']['p50']}ms p99={s['latency_ms']['p99']}ms  "
+              f"dropped={s['events']['dropped']} ({s['events']['drop_pct']}%)  "
+              f"evicted={s['events']['evicted_clients']}  "
+              f"rss/client={s['server']['rss_per_client_kb']}KB  cpu={s['server']['cpu_pct']}%", flush=True)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"sse-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nReport written: {out}")
+    if args.compare:
+        _compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
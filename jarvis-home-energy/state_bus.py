@@ -0,0 +1,177 @@
+"""
+Jarvis Home Energy — Shared-memory state bus
+One ingest process publishes versioned _state snapshots and camera frames;
+any number of stateless web workers read them without touching the devices.
+
+Each slot is a POSIX shared-memory segment guarded by a seqlock:
+
+    [ seq u64 | length u64 | published_at f64 | payload ... ]
+
+The single writer bumps seq to odd, copies the payload, then bumps it to even.
+Readers copy the payload and retry if seq was odd or moved underneath them, so
+there is no cross-process lock and a slow reader can never stall the poller.
+Snapshot version = seq // 2.
+
+A zero-length "aggregates" slot works as a counter the same way: the ingest
+process writes it after each analytics aggregation commit, and web workers
+compare its version to drop cached analytics results.
+"""
+
+import logging
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+log = logging.getLogger("jarvis.bus")
+
+_HDR = struct.Struct("<QQd")  # seq, payload length, published_at
+
+STATE_CAPACITY = 4 * 1024 * 1024   # JSON _state is ~20-60 KB; leave lots of headroom
+FRAME_CAPACITY = 1024 * 1024       # 640px MJPEG frames are ~40-80 KB
+
+
+class BusPayloadTooLarge(ValueError):
+    pass
+
+
+class _Slot:
+    """A single seqlock-protected shared-memory buffer."""
+
+    def __init__(self, name, capacity, create):
+        self.name = name
+        if create:
+            try:
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()  # left behind by a crashed ingest process
+            except FileNotFoundError:
+                pass
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_HDR.size + capacity)
+            _HDR.pack_into(self._shm.buf, 0, 0, 0, 0.0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the segment with this process's resource tracker,
+            # which would unlink it when a web worker exits — only the owner may.
+            try:
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+            except Exception:
+                pass
+        self.capacity = self._shm.size - _HDR.size
+        self._owner = create
+
+    def write(self, payload, ts):
+        n = len(payload)
+        if n > self.capacity:
+            raise BusPayloadTooLarge(f"{self.name}: {n} bytes > capacity {self.capacity}")
+        buf = self._shm.buf
+        seq = _HDR.unpack_from(buf, 0)[0] | 1
+        _HDR.pack_into(buf, 0, seq, n, ts)          # odd → write in progress
+        buf[_HDR.size:_HDR.size + n] = payload
+        _HDR.pack_into(buf, 0, seq + 1, n, ts)      # even → consistent
+        return (seq + 1) // 2
+
+    def version(self):
+        return _HDR.unpack_from(self._shm.buf, 0)[0] // 2
+
+    def read(self, retries=50):
+        """Return (version, payload bytes, published_at), or None if nothing published yet."""
+        buf = self._shm.buf
+        for _ in range(retries):
+            seq1, n, ts = _HDR.unpack_from(buf, 0)
+            if seq1 == 0:
+                return None
+            if seq1 & 1:
+                time.sleep(0.0005)
+                continue
+            payload = bytes(buf[_HDR.size:_HDR.size + n])
+            if _HDR.unpack_from(buf, 0)[0] == seq1:
+                return seq1 // 2, payload, ts
+        return None
+
+    def close(self):
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except Exception:
+            pass
+
+
+class StateBus:
+    """
+    Versioned state + camera frame bus.
+
+    Ingest side:  bus = StateBus(create=True, cameras=[...]); bus.publish_state(b"{...}")
+    Worker side:  bus = StateBus(cameras=[...]); version, payload, ts = bus.read_state()
+    """
+
+    def __init__(self, prefix="jarvis", cameras=(), create=False,
+                 state_capacity=STATE_CAPACITY, frame_capacity=FRAME_CAPACITY):
+        self.prefix = prefix
+        self._state = _Slot(f"{prefix}-state", state_capacity, create)
+        self._aggregates = _Slot(f"{prefix}-aggregates", 8, create)
+        self._frames = {}
+        for cam in cameras:
+            try:
+                self._frames[cam] = _Slot(f"{prefix}-frame-{cam}", frame_capacity, create)
+            except FileNotFoundError:
+                log.warning("No frame slot for camera %s on bus %s", cam, prefix)
+
+    # ── Ingest side ──────────────────────────────────────────────────────────
+
+    def publish_state(self, payload, ts=None):
+        """Publish a serialized _state snapshot. Returns the new version number."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return self._state.write(payload, ts or time.time())
+
+    def publish_aggregates(self):
+        """Announce an analytics aggregation commit. Returns the new aggregates version."""
+        return self._aggregates.write(b"", time.time())
+
+    def publish_frame(self, cam_id, jpeg, captured_at):
+        slot = self._frames.get(cam_id)
+        if slot is None:
+            return
+        try:
+            slot.write(jpeg, captured_at)
+        except BusPayloadTooLarge as e:
+            log.warning("Frame dropped: %s", e)
+
+    # ── Worker side ──────────────────────────────────────────────────────────
+
+    def state_version(self):
+        return self._state.version()
+
+    def read_state(self):
+        return self._state.read()
+
+    def aggregates_version(self):
+        return self._aggregates.version()
+
+    def wait_state(self, since, timeout=30.0, poll_s=0.05):
+        """Block until a version newer than `since` is published; returns read_state() or None."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._state.version() > since:
+                snap = self._state.read()
+                if snap and snap[0] > since:
+                    return snap
+            time.sleep(poll_s)
+        return None
+
+    def read_frame(self, cam_id):
+        """Return (jpeg_bytes, captured_at) like _rtsp_frame_cache, or None."""
+        slot = self._frames.get(cam_id)
+        if slot is None:
+            return None
+        snap = slot.read()
+        if not snap:
+            return None
+        return snap[1], snap[2]
+
+    def close(self):
+        self._state.close()
+        self._aggregates.close()
+        for slot in self._frames.values():
+            slot.close()
@@ -0,0 +1,229 @@
+"""
+Jarvis Home Energy — Slot-based records for the hot _state sections
+SPAN circuits, Tesla energy flows and the computed summary change every 5s
+tick. Instead of allocating a fresh dict per circuit/section each poll, they
+live in __slots__ records that are updated in place under _state_lock.
+
+Records keep a small mapping interface (get / [] / keys / items / in) so code
+that reads _state as nested dicts — log_telemetry, route handlers, a web
+worker's bus-decoded copy — works unchanged. Field order is the declared
+_fields order and is stable across ticks.
+
+dumps() is the one serializer for _state: compact JSON, with each record's
+encoding spliced in (Circuit caches its own, so idle circuits cost nothing).
+Measure with bench_state_alloc.py.
+"""
+
+import json
+from operator import attrgetter
+
+
+class _Record:
+    __slots__ = ()
+    _fields = ()
+    _defaults = {}
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        cls._getter = attrgetter(*cls._fields)
+        cls._field_set = frozenset(cls._fields)
+
+    def __init__(self, **values):
+        for f in self._fields:
+            setattr(self, f, self._defaults.get(f))
+        self.update(values)
+
+    # ── Mapping interface (dict-compatible reads) ────────────────────────────
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._field_set:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._field_set
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def keys(self):
+        return self._fields
+
+    def items(self):
+        return zip(self._fields, self._getter(self))
+
+    def update(self, values=(), **kw):
+        for k, v in (values.items() if hasattr(values, "items") else values):
+            self[k] = v
+        for k, v in kw.items():
+            self[k] = v
+
+    def to_dict(self):
+        return dict(zip(self._fields, self._getter(self)))
+
+    def json(self):
+        """This record as a compact JSON object (declared field order)."""
+        return _encoder.encode(dict(zip(self._fields, self._getter(self))))
+
+    def __eq__(self, other):
+        if isinstance(other, _Record):
+            return type(self) is type(other) and self._getter(self) == other._getter(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Circuit(_Record):
+    """
+    One SPAN circuit (/api/v1/circuits entry). Most circuits sit idle between
+    ticks, so the encoded JSON is cached and only rebuilt when a value changes —
+    write through set_from_span() or rec[key] = value, not plain attributes.
+    """
+    _fields = ("id", "name", "power_w", "relay", "priority", "sheddable", "color")
+    __slots__ = _fields + ("_json",)
+    _defaults = {"name": "?", "power_w": 0, "relay": "?", "priority": "?", "sheddable": False, "color": "green"}
+
+    def __init__(self, **values):
+        self._json = None
+        super().__init__(**values)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._json = None
+
+    def set_from_span(self, c):
+        pwr = c.get("instantPowerW", 0)
+        power_w = round(pwr, 0)
+        a = abs(pwr)
+        color = "green" if a < 200 else ("yellow" if a < 1500 else "red")
+        name = c.get("name", "?")
+        relay = c.get("relayState", "?")
+        priority = c.get("priority", "?")
+        sheddable = c.get("is_sheddable", False)
+        if (power_w != self.power_w or color != self.color or name != self.name or relay != self.relay
+                or priority != self.priority or sheddable != self.sheddable):
+            self.power_w, self.color, self.name = power_w, color, name
+            self.relay, self.priority, self.sheddable = relay, priority, sheddable
+            self._json = None
+
+    def json(self):
+        if self._json is None:
+            self._json = _encoder.encode(dict(zip(self._fields, self._getter(self))))
+        return self._json
+
+
+class CircuitTable:
+    """Circuits keyed by SPAN id, updated in place; `.circuits` is the list stored in _state."""
+
+    def __init__(self):
+        self._by_id = {}
+        self.circuits = []
+
+    def update_from_span(self, circuits_raw):
+        """Apply a /circuits response. Returns the (same) list, reordered/trimmed only if membership changed."""
+        seen = []
+        for c in circuits_raw:
+            cid = c.get("id", "")
+            rec = self._by_id.get(cid)
+            if rec is None:
+                rec = self._by_id[cid] = Circuit(id=cid)
+            rec.set_from_span(c)
+            seen.append(rec)
+        if len(seen) != len(self.circuits) or any(a is not b for a, b in zip(seen, self.circuits)):
+            self.circuits[:] = seen
+            live = {r.id for r in seen}
+            for cid in [k for k in self._by_id if k not in live]:
+                del self._by_id[cid]
+        return self.circuits
+
+    def restore(self, rows):
+        """Rebuild from serialized circuit dicts (a warm-state snapshot)."""
+        self._by_id = {}
+        recs = []
+        for row in rows:
+            rec = Circuit(**{k: v for k, v in row.items() if k in Circuit._field_set})
+            self._by_id[rec.id] = rec
+            recs.append(rec)
+        self.circuits[:] = recs
+        return self.circuits
+
+
+class EnergyFlows(_Record):
+    """Tesla gateway live status (_state["tesla"])."""
+    __slots__ = _fields = ("status", "soe", "solar_w", "battery_w", "grid_w", "load_w", "grid_state",
+                           "islanded", "backup_reserve_percent", "site_name", "storm_mode_active", "last_seen")
+    _defaults = {"status": "unconfigured", "soe": 0, "solar_w": 0, "battery_w": 0, "grid_w": 0, "load_w": 0,
+                 "grid_state": "Unknown", "islanded": False, "backup_reserve_percent": 0, "site_name": "",
+                 "storm_mode_active": False, "last_seen": 0}
+
+
+class Summary(_Record):
+    """Computed energy summary (_state["summary"]) — see _update_summary()."""
+    __slots__ = _fields = ("solar_w", "enphase_solar_w", "solaredge_solar_w", "span_solar_w", "load_w",
+                           "battery_w", "grid_w", "span_grid_w", "srp_grid_w", "pool_w", "ct_charging_w",
+                           "ct_v2h", "ct_v2h_w", "total_load_w", "self_powered_pct", "net_savings_today")
+    _defaults = {f: 0 for f in _fields} | {"ct_v2h": False}
+
+
+def _default(o):
+    if isinstance(o, _Record):
+        return dict(zip(o._fields, o._getter(o)))
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default, separators=(",", ":"), allow_nan=True)
+_encode_key = json.encoder.encode_basestring_ascii
+
+
+def _has_records(d):
+    for v in d.values():
+        if isinstance(v, _Record) or (type(v) is list and v and isinstance(v[0], _Record)):
+            return True
+    return False
+
+
+def _encode_value(v, depth):
+    if isinstance(v, _Record):
+        return v.json()
+    if type(v) is list and v and isinstance(v[0], _Record):
+        return "[" + ",".join([r.json() for r in v]) + "]"
+    if depth and type(v) is dict and _has_records(v):
+        return _encode_dict(v, depth - 1)
+    return _encoder.encode(v)
+
+
+def _encode_dict(d, depth):
+    return "{" + ",".join([_encode_key(str(k)) + ":" + _encode_value(v, depth) for k, v in d.items()]) + "}"
+
+
+def dumps(obj):
+    """
+    Serialize _state (or any part of it) to compact JSON. Records are spliced in
+    from their (cached) encodings; everything else goes through the C encoder.
+    """
+    if type(obj) is dict:
+        return _encode_dict(obj, 1)
+    return _encode_value(obj, 1)
+
+
+def dumps_bytes(obj):
+    return dumps(obj).encode()
+
+
+def json_default(o):
+    """`default=` hook for other JSON encoders (Flask's provider)."""
+    return _default(o)
@@ -0,0 +1,255 @@
+"""
+Jarvis Home Energy — Time-of-use tariff engine
+Costs grid import/export series against SRP price plans with NumPy.
+
+A plan spec (seasons, weekday on-peak hours, energy / export / tiered demand
+rates) is compiled once into small lookup arrays:
+
+    season_of_month[13]        month → season index
+    is_peak[season, 24]        weekday hour → on-peak?
+    energy_rate[season, 2]     $/kWh   [off-peak, on-peak]
+    export_credit[season, 2]   $/kWh
+    demand_tiers[season]       [(kW upper bound, $/kW), ...] on the monthly on-peak max
+
+so costing any series is a handful of fancy-index gathers — a year of hourly
+history takes a few ms, a year of 60s telemetry well under a second.
+
+Schedule per SRP_PLAN.md: MST (UTC-7, no DST), weekends and SRP holidays are
+off-peak all day, demand = highest 30-min average kW during on-peak in the
+month. Prices are approximate 2025-26 published SRP figures — check
+srpnet.com/prices before relying on absolute dollars.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+MST_OFFSET_S = -7 * 3600
+
+WINTER, SUMMER, SUMMER_PEAK = 0, 1, 2
+SEASON_NAMES = ("winter", "summer", "summer_peak")
+_SRP_SEASONS = {  # month → season (SRP_PLAN.md)
+    1: WINTER, 2: WINTER, 3: WINTER, 4: WINTER, 5: SUMMER, 6: SUMMER,
+    7: SUMMER_PEAK, 8: SUMMER_PEAK, 9: SUMMER, 10: SUMMER, 11: WINTER, 12: WINTER,
+}
+_SRP_PEAK_HOURS = {
+    WINTER: list(range(5, 9)) + list(range(17, 21)),   # 05:00–09:00, 17:00–21:00
+    SUMMER: list(range(14, 20)),                        # 14:00–20:00
+    SUMMER_PEAK: list(range(14, 20)),
+}
+
+PLANS = {
+    "srp_e27": {
+        "name": "SRP E-27 Customer Generation (demand)",
+        "seasons": _SRP_SEASONS,
+        "peak_hours": _SRP_PEAK_HOURS,
+        # season: (off-peak, on-peak) $/kWh
+        "energy": {WINTER: (0.0423, 0.0633), SUMMER: (0.0498, 0.0796), SUMMER_PEAK: (0.0535, 0.0965)},
+        "export": {WINTER: (0.0281, 0.0281), SUMMER: (0.0281, 0.0281), SUMMER_PEAK: (0.0281, 0.0281)},
+        # season: [(upper kW, $/kW)] applied to the month's on-peak 30-min max
+        "demand": {
+            WINTER: [(3, 3.55), (10, 5.68), (None, 9.60)],
+            SUMMER: [(3, 8.03), (10, 14.63), (None, 27.77)],
+            SUMMER_PEAK: [(3, 9.59), (10, 17.82), (None, 33.84)],
+        },
+        "monthly_fixed": 32.44,
+    },
+    "srp_e26": {
+        "name": "SRP E-26 Time-of-Use (no demand)",
+        "seasons": _SRP_SEASONS,
+        "peak_hours": _SRP_PEAK_HOURS,
+        "energy": {WINTER: (0.0881, 0.1166), SUMMER: (0.0729, 0.2490), SUMMER_PEAK: (0.0752, 0.2948)},
+        "export": {WINTER: (0.0281, 0.0281), SUMMER: (0.0281, 0.0281), SUMMER_PEAK: (0.0281, 0.0281)},
+        "demand": {},
+        "monthly_fixed": 20.00,
+    },
+    "flat": {
+        "name": "Flat blended $0.18/kWh (legacy estimate)",
+        "seasons": _SRP_SEASONS,
+        "peak_hours": {},
+        "energy": {s: (0.18, 0.18) for s in (WINTER, SUMMER, SUMMER_PEAK)},
+        "export": {s: (0.18, 0.18) for s in (WINTER, SUMMER, SUMMER_PEAK)},
+        "demand": {},
+        "monthly_fixed": 0.0,
+    },
+}
+DEFAULT_PLAN = "srp_e27"
+
+
+def srp_holidays(year):
+    """SRP holidays (on-peak disabled) for one year."""
+    def nth_weekday(month, weekday, n):
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+
+    last_may = date(year, 5, 31)
+    return [
+        date(year, 1, 1),                                        # New Year's Day
+        last_may - timedelta(days=last_may.weekday()),           # Memorial Day (last Mon May)
+        date(year, 7, 4),                                        # Independence Day
+        nth_weekday(9, 0, 1),                                    # Labor Day (1st Mon Sep)
+        nth_weekday(11, 3, 4),                                   # Thanksgiving (4th Thu Nov)
+        date(year, 12, 25),                                      # Christmas Day
+    ]
+
+
+class Tariff:
+    """A compiled price plan. Build with get_tariff(plan_id)."""
+
+    def __init__(self, plan_id, spec):
+        self.plan_id = plan_id
+        self.name = spec["name"]
+        self.monthly_fixed = float(spec.get("monthly_fixed", 0.0))
+
+        self.season_of_month = np.zeros(13, dtype=np.int8)
+        for m, s in spec["seasons"].items():
+            self.season_of_month[m] = s
+        self.is_peak = np.zeros((3, 24), dtype=np.int8)
+        for s, hours in spec["peak_hours"].items():
+            self.is_peak[s, hours] = 1
+        self.energy_rate = np.zeros((3, 2))
+        self.export_credit = np.zeros((3, 2))
+        for s, (off, on) in spec["energy"].items():
+            self.energy_rate[s] = (off, on)
+        for s, (off, on) in spec.get("export", {}).items():
+            self.export_credit[s] = (off, on)
+        self.demand_tiers = {s: list(tiers) for s, tiers in spec.get("demand", {}).items()}
+        self._holidays = {}
+
+    # ── Period lookup ────────────────────────────────────────────────────────
+
+    def _holiday_days(self, years):
+        days = []
+        for y in years:
+            if y not in self._holidays:
+                self._holidays[y] = np.array(srp_holidays(y), dtype="datetime64[D]")
+            days.append(self._holidays[y])
+        return np.concatenate(days) if days else np.array([], dtype="datetime64[D]")
+
+    def classify(self, ts):
+        """
+        Vectorized period lookup for epoch seconds.
+        Returns (season, peak, month_key): season index, 1 if on-peak, and a
+        per-billing-month integer (months since 1970) for grouping.
+        """
+        local = np.asarray(ts, dtype=np.int64) + MST_OFFSET_S
+        days = local // 86400
+        hour = (local - days * 86400) // 3600
+        d64 = days.astype("datetime64[D]")
+        month_key = d64.astype("datetime64[M]").astype(np.int64)
+        season = self.season_of_month[month_key % 12 + 1]
+        weekday = (days + 3) % 7 < 5                      # 1970-01-01 was a Thursday
+        peak = self.is_peak[season, hour].astype(bool) & weekday
+        if peak.any():
+            years = np.unique(month_key // 12 + 1970)
+            peak &= ~np.isin(d64, self._holiday_days(int(y) for y in years))
+        return season, peak.astype(np.int8), month_key
+
+    # ── Costing ──────────────────────────────────────────────────────────────
+
+    def energy_cost(self, ts, import_kwh, export_kwh=None):
+        """Per-interval net energy cost ($): import × rate − export × credit."""
+        season, peak, _ = self.classify(ts)
+        cost = np.asarray(import_kwh, dtype=np.float64) * self.energy_rate[season, peak]
+        if export_kwh is not None:
+            cost = cost - np.asarray(export_kwh, dtype=np.float64) * self.export_credit[season, peak]
+        return cost
+
+    def _demand_charge(self, season, kw):
+        charge, floor = 0.0, 0.0
+        for upper, rate in self.demand_tiers.get(int(season), ()):
+            top = kw if upper is None else min(kw, upper)
+            if top > floor:
+                charge += (top - floor) * rate
+            if upper is None or kw <= upper:
+                break
+            floor = upper
+        return charge
+
+    def monthly_demand(self, ts, grid_w, window_s=1800):
+        """
+        On-peak demand per billing month from an import power series (W).
+        Samples are averaged into `window_s` buckets (30 min per E-27); hourly
+        series can pass window_s=3600 as a proxy. Returns {month_key: (kW, $)}.
+        """
+        if not self.demand_tiers:
+            return {}
+        ts = np.asarray(ts, dtype=np.int64)
+        kw = np.clip(np.asarray(grid_w, dtype=np.float64), 0, None) / 1000.0
+        season, peak, month_key = self.classify(ts)
+        sel = peak.astype(bool)
+        if not sel.any():
+            return {}
+        bucket = ts[sel] // window_s
+        _, first, inv = np.unique(bucket, return_index=True, return_inverse=True)
+        avg_kw = np.bincount(inv, weights=kw[sel]) / np.bincount(inv)
+        b_month, b_season = month_key[sel][first], season[sel][first]
+        out = {}
+        for m in np.unique(b_month):
+            mk = b_month == m
+            peak_kw = float(avg_kw[mk].max())
+            out[int(m)] = (peak_kw, self._demand_charge(b_season[mk][0], peak_kw))
+        return out
+
+    def bill(self, ts, import_kwh, export_kwh=None, demand_ts=None, demand_grid_w=None, demand_window_s=1800):
+        """
+        Full cost of an interval series under this plan.
+        `demand_ts`/`demand_grid_w` default to deriving kW from the energy series
+        (import_kwh per interval ÷ interval hours) when not given.
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        imp = np.asarray(import_kwh, dtype=np.float64)
+        exp = np.zeros_like(imp) if export_kwh is None else np.asarray(export_kwh, dtype=np.float64)
+        season, peak, month_key = self.classify(ts)
+        energy = imp * self.energy_rate[season, peak]
+        credit = exp * self.export_credit[season, peak]
+
+        if demand_ts is None and len(ts) > 1:
+            interval_h = max(float(np.median(np.diff(ts))), 1.0) / 3600.0
+            demand_ts, demand_grid_w = ts, imp / interval_h * 1000.0
+            demand_window_s = max(demand_window_s, int(interval_h * 3600))
+        demand = self.monthly_demand(demand_ts, demand_grid_w, demand_window_s) if demand_ts is not None else {}
+
+        months = np.unique(month_key)
+        by_month = []
+        for m in months:
+            mk = month_key == m
+            kw, d_cost = demand.get(int(m), (0.0, 0.0))
+            e, c = float(energy[mk].sum()), float(credit[mk].sum())
+            by_month.append({
+                "month": f"{1970 + int(m) // 12}-{int(m) % 12 + 1:02d}",
+                "season": SEASON_NAMES[int(season[mk][0])],
+                "import_kwh": round(float(imp[mk].sum()), 2),
+                "export_kwh": round(float(exp[mk].sum()), 2),
+                "on_peak_import_kwh": round(float(imp[mk & (peak == 1)].sum()), 2),
+                "energy_usd": round(e, 2),
+                "export_credit_usd": round(c, 2),
+                "demand_kw": round(kw, 2),
+                "demand_usd": round(d_cost, 2),
+                "fixed_usd": self.monthly_fixed,
+                "total_usd": round(e - c + d_cost + self.monthly_fixed, 2),
+            })
+        return {
+            "plan": self.plan_id,
+            "name": self.name,
+            "energy_usd": round(float(energy.sum()), 2),
+            "export_credit_usd": round(float(credit.sum()), 2),
+            "demand_usd": round(sum(v[1] for v in demand.values()), 2),
+            "fixed_usd": round(self.monthly_fixed * len(months), 2),
+            "total_usd": round(sum(b["total_usd"] for b in by_month), 2),
+            "by_month": by_month,
+        }
+
+
+_compiled = {}
+
+
+def get_tariff(plan_id=DEFAULT_PLAN):
+    """Compiled Tariff for a plan id in PLANS (compiled once, then cached)."""
+    t = _compiled.get(plan_id)
+    if t is None:
+        if plan_id not in PLANS:
+            raise KeyError(f"unknown tariff plan {plan_id!r} (known: {', '.join(PLANS)})")
+        t = _compiled[plan_id] = Tariff(plan_id, PLANS[plan_id])
+    return t
@@ -0,0 +1,60 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import energy_analytics
+
+
+def test_concurrent_cold_misses_compute_once(monkeypatch):
+    monkeypatch.setattr(energy_analytics, "_cache", energy_analytics.OrderedDict())
+    monkeypatch.setattr(energy_analytics, "_cache_stats", {})
+    calls = []
+
+    def slow(days):
+        calls.append(days)
+        time.sleep(0.2)
+        return {"days": days}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(energy_analytics.cached_analytics("slow", slow, 90)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [90]
+    assert results == [{"days": 90}] * 8
+    st = energy_analytics.analytics_cache_stats()
+    assert st["inflight"] == 0
+    assert st["endpoints"]["slow"]["misses"] == 1 and st["endpoints"]["slow"]["coalesced"] == 7
+
+
+def test_failed_computation_lets_waiters_retry(monkeypatch):
+    monkeypatch.setattr(energy_analytics, "_cache", energy_analytics.OrderedDict())
+    outcomes = iter([RuntimeError("db locked"), "ok"])
+
+    def flaky():
+        time.sleep(0.1)
+        out = next(outcomes)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(energy_analytics.cached_analytics("flaky", flaky))
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for t in threads:
+        t.start()
+        time.sleep(0.02)
+    for t in threads:
+        t.join()
+    assert errors == ["db locked"] and results == ["ok"]
@@ -0,0 +1,46 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import energy_forecast
+
+HOUR0 = 1_780_000_000 // 3600 * 3600
+
+
+@pytest.fixture
+def hourly(tmp_path, monkeypatch):
+    path = tmp_path / "energy.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE energy_hourly (hour_start INTEGER PRIMARY KEY, solar_kwh REAL, load_kwh REAL)")
+    monkeypatch.setattr(energy_forecast, "DB_PATH", path)
+    monkeypatch.setattr(energy_forecast, "_history", {k: v[:0] for k, v in energy_forecast._history.items()})
+    yield conn
+    conn.close()
+
+
+def _upsert(conn, rows):
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO energy_hourly VALUES (?, ?, ?)", rows)
+
+
+def _table(conn):
+    return conn.execute("SELECT hour_start, solar_kwh, load_kwh FROM energy_hourly ORDER BY hour_start").fetchall()
+
+
+def test_history_is_appended_then_reloaded_after_a_backfill(hourly):
+    _upsert(hourly, [(HOUR0 + 3600 * i, 1.0, 2.0) for i in range(48) if i != 10])
+    assert energy_forecast._load_new_history() == 47
+    _upsert(hourly, [(HOUR0 + 3600 * 48, 1.5, 2.5)])
+    assert energy_forecast._load_new_history() == 1
+    # a backfill fills the gap and corrects an older hour
+    _upsert(hourly, [(HOUR0 + 3600 * 10, 0.5, 1.0), (HOUR0 + 3600 * 3, 4.0, 2.0)])
+    assert energy_forecast._load_new_history() == 49
+    h = energy_forecast._history
+    assert list(zip(h["ts"].tolist(), h["solar"].tolist(), h["load"].tolist())) == _table(hourly)
+    assert np.all(np.diff(h["ts"]) > 0)
+    assert energy_forecast._load_new_history() == 0
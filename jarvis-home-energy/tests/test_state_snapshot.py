@@ -0,0 +1,46 @@
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    for key in ("myq", "bhyve", "stale", "ts"):
+        monkeypatch.setitem(app._state, key, app._state[key])
+    monkeypatch.setattr(app, "STATE_SNAPSHOT_FILE", tmp_path / "state_snapshot.json.gz")
+    monkeypatch.setattr(app, "MYQ_EMAIL", "")
+
+    def write(state):
+        now = time.time()
+        doc = {"saved_at": now, "state": dict(state, ts=now), "buffers": {}}
+        app.STATE_SNAPSHOT_FILE.write_bytes(gzip.compress(json.dumps(doc).encode()))
+        assert app._restore_state_snapshot()
+    return write
+
+
+def test_unconfigured_sections_are_not_restored_stale(snapshot):
+    snapshot({"bhyve": {"status": "unconfigured", "devices": [], "zones": [], "last_seen": 0},
+              "myq": {"status": "online", "doors": [], "last_seen": 1}})
+    assert set(app._state["stale"]) == {"myq"}
+
+
+def test_unconfigured_poller_clears_its_stale_marker(snapshot):
+    # configured when the snapshot was taken, credentials removed since
+    snapshot({"myq": {"status": "online", "doors": [{"name": "Garage"}], "last_seen": 1}})
+    assert "myq" in app._state["stale"]
+    app._mark_fresh("poll_myq", app.poll_myq())
+    assert app._state["myq"]["status"] == "unconfigured"
+    assert "myq" not in app._state["stale"]
+    # a poller that failed for another reason leaves the marker alone
+    snapshot({"myq": {"status": "online", "doors": [], "last_seen": 1}})
+    app._state["myq"]["status"] = "error"
+    app._mark_fresh("poll_myq", False)
+    assert "myq" in app._state["stale"]
@@ -0,0 +1,65 @@
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tariff import SUMMER, SUMMER_PEAK, WINTER, get_tariff, srp_holidays
+
+MST = timezone(timedelta(hours=-7))
+
+
+def _ts(*args):
+    """Epoch seconds of an MST wall-clock time."""
+    return int(datetime(*args, tzinfo=MST).timestamp())
+
+
+def _period(plan, ts):
+    season, peak, _ = get_tariff(plan).classify([ts])
+    return int(season[0]), int(peak[0])
+
+
+def test_summer_peak_weekday_on_peak_rate():
+    ts = _ts(2026, 7, 15, 15, 0)                       # Wednesday 15:00 MST
+    assert _period("srp_e27", ts) == (SUMMER_PEAK, 1)
+    assert get_tariff("srp_e27").energy_cost([ts], [1.0])[0] == pytest.approx(0.0965)
+    assert get_tariff("srp_e26").energy_cost([ts], [2.0], [1.0])[0] == pytest.approx(2 * 0.2948 - 0.0281)
+
+
+def test_mst_boundaries_ignore_dst():
+    # 14:00 MST is 21:00 UTC all year; Arizona never shifts to UTC-6
+    assert _period("srp_e27", _ts(2026, 7, 15, 13, 59, 59)) == (SUMMER_PEAK, 0)
+    assert _period("srp_e27", _ts(2026, 7, 15, 14, 0)) == (SUMMER_PEAK, 1)
+    assert _ts(2026, 7, 15, 14, 0) == int(datetime(2026, 7, 15, 21, 0, tzinfo=timezone.utc).timestamp())
+    assert _period("srp_e27", _ts(2026, 7, 15, 19, 59, 59)) == (SUMMER_PEAK, 1)
+    assert _period("srp_e27", _ts(2026, 7, 15, 20, 0)) == (SUMMER_PEAK, 0)
+    # 23:30 MST on June 30 is already July in UTC, but bills as June (summer, not summer peak)
+    assert _period("srp_e27", _ts(2026, 6, 30, 23, 30)) == (SUMMER, 0)
+    # winter has a morning and an evening peak
+    assert _period("srp_e27", _ts(2026, 1, 14, 6, 0)) == (WINTER, 1)
+    assert _period("srp_e27", _ts(2026, 1, 14, 12, 0)) == (WINTER, 0)
+
+
+def test_holidays_and_weekends_are_off_peak():
+    assert srp_holidays(2026) == [date(2026, 1, 1), date(2026, 5, 25), date(2026, 7, 4),
+                                  date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25)]
+    assert _period("srp_e27", _ts(2026, 9, 7, 15, 0)) == (SUMMER, 0)     # Labor Day (Monday)
+    assert _period("srp_e27", _ts(2026, 9, 8, 15, 0)) == (SUMMER, 1)     # the Tuesday after
+    assert _period("srp_e27", _ts(2026, 9, 12, 15, 0)) == (SUMMER, 0)    # Saturday
+    assert get_tariff("srp_e27").energy_cost([_ts(2026, 9, 7, 15, 0)], [1.0])[0] == pytest.approx(0.0498)
+
+
+def test_tiered_demand_on_30_min_on_peak_average():
+    t = get_tariff("srp_e27")
+    start = _ts(2026, 7, 15, 15, 0)
+    # 10 kW and 14 kW in one window average to 12 kW; a 20 kW spike off-peak doesn't count
+    ts = [start, start + 600, _ts(2026, 7, 15, 22, 0)]
+    demand = t.monthly_demand(ts, [10000.0, 14000.0, 20000.0])
+    (kw, usd), = demand.values()
+    assert kw == pytest.approx(12.0)
+    assert usd == pytest.approx(3 * 9.59 + 7 * 17.82 + 2 * 33.84)
+    bill = t.bill([start], [1.0], demand_ts=ts, demand_grid_w=[10000.0, 14000.0, 20000.0])
+    assert bill["total_usd"] == pytest.approx(round(0.0965 + usd + 32.44, 2))
+    assert get_tariff("srp_e26").monthly_demand(ts, [10000.0, 14000.0, 20000.0]) == {}